@@ -1,9 +1,10 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+from app.replica import RoutingSession, configure_replica
 
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 
 def create_app(config_object=None):
@@ -17,17 +18,40 @@ def create_app(config_object=None):
 
     app.secret_key = app.config.get('SECRET_KEY', "your_secret_key_here")
 
+    # Queued JSON logging; replaces the old import-time basicConfig(level=DEBUG)
+    from app.logging_setup import configure_logging
+    configure_logging(app)
+
     # Apply CORS before registering any routes
     CORS(app, resources={r"/api/*": {"origins": "*"}},
          supports_credentials=True)
 
-    # Initialize extensions
+    # Initialize extensions (the optional read replica is a separate engine, deliberately not a bind)
+    configure_replica(app)
     db.init_app(app)
 
+    from app.cache import init_cache
+    init_cache(app)
+
+    from app.admission import init_admission
+    init_admission(app)
+
+    from app.response_cache import init_response_cache
+    init_response_cache(app)
+
+    from app.ingest import init_ingest
+    init_ingest(app)
+
     # Register blueprints
     from app.routes import api
     from app.auth_routes import auth_bp
+    from app.rule_routes import rules_bp
     app.register_blueprint(api, url_prefix='/api')
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(rules_bp, url_prefix='/api/rules')
+
+    # Register CLI commands
+    from app.database import register_commands
+    register_commands(app)
 
     return app
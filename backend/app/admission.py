@@ -0,0 +1,184 @@
+import math
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify
+
+
+# Used for any ADMISSION_LIMITS entry (or key) that the configuration leaves out
+DEFAULT_LIMITS = {
+    'max_concurrent': 2,      # requests running at once, per process
+    'max_waiting': 4,         # requests allowed to queue for a slot; beyond that, 503 at once
+    'wait_timeout': 10.0,     # seconds a queued request waits before giving up with 503
+    'rate': 0.5,              # per-user tokens added per second
+    'burst': 5,               # per-user bucket size
+    'retry_after': 5,         # Retry-After (seconds) sent with 503s
+}
+# Full buckets are forgotten once this many users are tracked (a full bucket is the same as a new one)
+MAX_TRACKED_USERS = 10000
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now):
+        """Spend a token. Returns 0 on success, else the seconds until one is available."""
+        self.refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+
+class AdmissionGate:
+    """
+    Admission control for one expensive endpoint.
+
+    Each user has a token bucket (rate per second, up to burst), so no single
+    user can keep the endpoint busy. Past that, at most max_concurrent requests
+    run at once; up to max_waiting more wait up to wait_timeout seconds for a
+    slot and anything else is turned away immediately. Limits are per process,
+    so the effective total scales with the number of server workers.
+    """
+
+    def __init__(self, name, max_concurrent, max_waiting, wait_timeout, rate, burst, retry_after):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.rate = rate
+        self.burst = burst
+        self.retry_after = retry_after
+        self.admitted = 0
+        self.rate_limited = 0
+        self.overloaded = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self._slots = threading.Semaphore(max_concurrent)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def check_rate(self, user_id):
+        """Spend one of the user's tokens. Returns None, or the seconds to wait if they have none left."""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._buckets) >= MAX_TRACKED_USERS:
+                for bucket in self._buckets.values():
+                    bucket.refill(now)
+                self._buckets = {uid: b for uid, b in self._buckets.items() if b.tokens < b.burst}
+            bucket = self._buckets.setdefault(user_id, TokenBucket(self.rate, self.burst))
+            wait = bucket.take(now)
+            if wait:
+                self.rate_limited += 1
+                return wait
+            return None
+
+    def acquire(self):
+        """Take a slot, queueing if there is room in the queue. Returns False if the request is turned away."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self.waiting >= self.max_waiting:
+                    self.overloaded += 1
+                    return False
+                self.waiting += 1
+            acquired = self._slots.acquire(timeout=self.wait_timeout)
+            with self._lock:
+                self.waiting -= 1
+                if not acquired:
+                    self.overloaded += 1
+                    return False
+
+        with self._lock:
+            self.admitted += 1
+            self.in_flight += 1
+        return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'admitted': self.admitted,
+                'rejected_rate_limited': self.rate_limited,
+                'rejected_overloaded': self.overloaded,
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'max_concurrent': self.max_concurrent,
+                'max_waiting': self.max_waiting,
+            }
+
+
+def init_admission(app):
+    """Create a gate for each endpoint named in ADMISSION_LIMITS (missing keys use DEFAULT_LIMITS)."""
+    app.extensions['admission'] = {
+        name: AdmissionGate(name, **{**DEFAULT_LIMITS, **limits})
+        for name, limits in app.config.get('ADMISSION_LIMITS', {}).items()
+    }
+
+
+def admission_gate(app, name):
+    """The app's gate for the named endpoint, created with DEFAULT_LIMITS if not configured."""
+    gates = app.extensions['admission']
+    if name not in gates:
+        gates.setdefault(name, AdmissionGate(name, **DEFAULT_LIMITS))
+    return gates[name]
+
+
+def _gate(name):
+    return admission_gate(current_app, name)
+
+
+def rejection(gate, wait=None):
+    """
+    (status, body, Retry-After seconds) for a turned-away request.
+
+    429 if the user is over their rate ('wait' seconds from check_rate), else 503.
+    """
+    if wait is not None:
+        return 429, {"error": "Too many requests",
+                     "message": f"Rate limit for {gate.name} exceeded; retry in {math.ceil(wait)}s"}, math.ceil(wait)
+    return 503, {"error": "Server busy",
+                 "message": f"Too many {gate.name} requests in progress; retry shortly"}, gate.retry_after
+
+
+def admission_metrics():
+    return {name: gate.metrics() for name, gate in current_app.extensions['admission'].items()}
+
+
+def admission_controlled(name):
+    """
+    Apply the named AdmissionGate to an endpoint (below @token_required).
+
+    Rejections are cheap and fast: 429 when the user is over their rate, 503
+    when the endpoint is saturated, both with Retry-After.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            gate = _gate(name)
+            wait = gate.check_rate(current_user.id)
+            if wait is not None or not gate.acquire():
+                status, body, retry_after = rejection(gate, wait)
+                response = jsonify(body)
+                response.headers['Retry-After'] = str(retry_after)
+                return response, status
+
+            try:
+                return f(current_user, *args, **kwargs)
+            finally:
+                gate.release()
+
+        return decorated
+
+    return decorator
@@ -0,0 +1,221 @@
+from datetime import date
+import numpy as np
+from app.cache import user_columns
+
+
+INCOME_CATEGORY = 'Inntekt'
+MONTHS = list(range(1, 13))
+UNCATEGORIZED = 'Uncategorized'
+
+
+def is_income_category(category):
+    return (category or '').lower() == INCOME_CATEGORY.lower()
+
+
+def _income_mask(columns):
+    income_codes = [code for code, name in enumerate(columns.categories) if is_income_category(name)]
+    return np.isin(columns.category_codes, income_codes)
+
+
+def _kroner(minor_units):
+    """Integer øre sums (any shape) to a list of floats in kroner."""
+    return (np.asarray(minor_units) / 100).tolist()
+
+
+def monthly_comparison(user_id, category=None, subcategory=None, income_only=False, today=None):
+    """
+    Month x year totals for the chart views, with per-month averages across years.
+
+    Computed from the user's cached columns (income rows only when income_only
+    is set). The category/subcategory selection zeroes amounts instead of
+    dropping rows, so years with no matching rows still appear as zero rows,
+    matching how the charts pick their year axis.
+    """
+    today = today or date.today()
+    columns = user_columns(user_id)
+
+    rows = _income_mask(columns) if income_only else np.ones(len(columns), dtype=bool)
+    selected = np.ones(len(columns), dtype=bool)
+    if category:
+        selected &= columns.category_mask(category)
+    if subcategory:
+        selected &= columns.subcategory_mask(subcategory)
+
+    years = sorted(np.unique(columns.years[rows]).tolist())
+    matrix = {}
+    if years:
+        # One bin per month from January of the first year to December of the last
+        cells = columns.month_index[rows] - years[0] * 12
+        totals = np.bincount(cells, weights=np.where(selected[rows], columns.amounts[rows], 0),
+                             minlength=(years[-1] - years[0] + 1) * 12).astype(np.int64)
+        for y in years:
+            offset = (y - years[0]) * 12
+            matrix[y] = _kroner(totals[offset:offset + 12])
+
+    # Average each month over the years it has happened in, counting missing months as 0
+    averages = []
+    for month_number in MONTHS:
+        elapsed = [y for y in years if y < today.year or (y == today.year and month_number <= today.month)]
+        values = [matrix[y][month_number - 1] for y in elapsed]
+        averages.append(sum(values) / len(values) if values else 0.0)
+
+    return {
+        'months': MONTHS,
+        'years': years,
+        'matrix': {str(y): matrix[y] for y in years},
+        'averages': averages,
+    }
+
+
+def _pivot_table(label, totals_by_key):
+    """Turn {key: [12 monthly sums]} into rows with row totals plus column and grand totals."""
+    rows = [
+        {label: key, 'values': values, 'total': sum(values)}
+        for key, values in sorted(totals_by_key.items())
+    ]
+    column_totals = [sum(row['values'][i] for row in rows) for i in range(12)]
+    return {'rows': rows, 'totals': column_totals, 'grand_total': sum(column_totals)}
+
+
+def _monthly_totals_by_code(codes, months, amounts, size):
+    """(size x 12) matrix of summed minor units per code and month."""
+    return np.bincount(codes * 12 + months - 1, weights=amounts, minlength=size * 12).astype(np.int64).reshape(size, 12)
+
+
+def category_pivot(user_id, year, breakdown=None):
+    """
+    Category x month pivot for one year, as shown on the Categories page.
+
+    Folded from the user's cached columns with one bincount per table over the
+    year's rows. Rows without a subcategory go to the "Uncategorized" breakdown row.
+    """
+    columns = user_columns(user_id)
+    in_year = columns.years == year
+    codes = columns.category_codes[in_year]
+    months = columns.months[in_year]
+    amounts = columns.amounts[in_year]
+
+    by_category = _monthly_totals_by_code(codes, months, amounts, len(columns.categories))
+    present = np.bincount(codes, minlength=len(columns.categories)) > 0
+
+    expenses = {}
+    income = [0.0] * 12
+    for code, name in enumerate(columns.categories):
+        if not present[code]:
+            continue
+        if is_income_category(name):
+            income = [a + b for a, b in zip(income, _kroner(by_category[code]))]
+        else:
+            expenses[name] = _kroner(by_category[code])
+
+    result = {
+        'year': year,
+        'years': sorted(np.unique(columns.years).tolist()),
+        'months': MONTHS,
+        'expenses': _pivot_table('category', expenses),
+        'income': {'values': income, 'total': sum(income)},
+        'breakdown': None,
+    }
+    if breakdown is not None:
+        in_breakdown = columns.category_mask(breakdown)[in_year]
+        # Shift subcategory codes by one so "no subcategory" (-1) gets bin 0
+        sub_codes = columns.subcategory_codes[in_year][in_breakdown] + 1
+        by_subcategory = _monthly_totals_by_code(
+            sub_codes, months[in_breakdown], amounts[in_breakdown], len(columns.subcategories) + 1)
+        sub_present = np.bincount(sub_codes, minlength=len(columns.subcategories) + 1) > 0
+
+        subcategories = {UNCATEGORIZED: _kroner(by_subcategory[0])}
+        for code, name in enumerate(columns.subcategories, start=1):
+            if sub_present[code]:
+                subcategories[name] = _kroner(by_subcategory[code])
+        result['breakdown'] = dict(category=breakdown, **_pivot_table('subcategory', subcategories))
+
+    return result
+
+
+def category_tree(user_id):
+    """{category: sorted subcategories} for the user, from the cached columns."""
+    columns = user_columns(user_id)
+    # Each (category, subcategory) pair as one integer; subcategory -1 ("none") shifts to 0
+    width = len(columns.subcategories) + 1
+    pairs = np.unique(columns.category_codes.astype(np.int64) * width + columns.subcategory_codes + 1)
+    tree = {}
+    for pair in pairs.tolist():
+        category_code, subcategory_code = divmod(pair, width)
+        subcategories = tree.setdefault(columns.categories[category_code], [])
+        if subcategory_code:
+            subcategories.append(columns.subcategories[subcategory_code - 1])
+    return tree
+
+
+def monthly_series(user_id, category, columns=None):
+    """
+    Monthly sums of absolute amounts for one category, as (month_starts, values).
+
+    Months without transactions are omitted, like the groupby the projections used.
+    Returns the number of transactions in the category as well. Pass columns to
+    use already loaded data instead of the cache.
+    """
+    if columns is None:
+        columns = user_columns(user_id)
+    mask = columns.category_mask(category)
+    month_index = columns.month_index[mask]
+    month_keys, positions = np.unique(month_index, return_inverse=True)
+    sums = np.bincount(positions, weights=np.abs(columns.amounts[mask]), minlength=len(month_keys))
+    month_starts = (month_keys - 1970 * 12).astype('datetime64[M]')
+    return month_starts, sums / 100, int(mask.sum())
+
+
+def monthly_hierarchy(user_id, category):
+    """
+    Monthly sums of absolute amounts for each subcategory of a category, as a stacked matrix.
+
+    Returns (month_starts, subcategory names, matrix, transaction count). The
+    matrix has one row per subcategory ("Uncategorized" for rows without one)
+    and one column per month from the category's first to last month, empty
+    months included, so the rows sum to the category's own series.
+    """
+    columns = user_columns(user_id)
+    mask = columns.category_mask(category)
+    if not mask.any():
+        return np.array([], dtype='datetime64[M]'), [], np.zeros((0, 0)), 0
+
+    month_index = columns.month_index[mask]
+    first = int(month_index.min())
+    span = int(month_index.max()) - first + 1
+    # Shift subcategory codes by one so "no subcategory" (-1) gets row 0
+    sub_codes, rows = np.unique(columns.subcategory_codes[mask] + 1, return_inverse=True)
+    sums = np.bincount(rows * span + (month_index - first), weights=np.abs(columns.amounts[mask]),
+                       minlength=len(sub_codes) * span).reshape(len(sub_codes), span)
+
+    names = [UNCATEGORIZED if code == 0 else columns.subcategories[code - 1] for code in sub_codes.tolist()]
+    month_starts = (np.arange(first, first + span) - 1970 * 12).astype('datetime64[M]')
+    return month_starts, names, sums / 100, int(mask.sum())
+
+
+def monthly_category_matrix(user_id, before=None):
+    """
+    Monthly sums of absolute amounts for every category, as a stacked matrix.
+
+    Returns (month_starts, category names, matrix) with one row per category
+    and one column per month from the user's first month up to, but not
+    including, the month of 'before' (default: all months). Empty months are 0.
+    """
+    columns = user_columns(user_id)
+    month_index = columns.month_index
+    keep = np.ones(len(columns), dtype=bool)
+    if before is not None:
+        keep = month_index < before.year * 12 + before.month - 1
+    if not keep.any():
+        return np.array([], dtype='datetime64[M]'), [], np.zeros((0, 0))
+
+    first = int(month_index[keep].min())
+    span = int(month_index[keep].max()) - first + 1
+    codes = columns.category_codes[keep]
+    size = len(columns.categories)
+    sums = np.bincount(codes * span + (month_index[keep] - first), weights=np.abs(columns.amounts[keep]),
+                       minlength=size * span).reshape(size, span)
+
+    present = np.bincount(codes, minlength=size) > 0
+    month_starts = (np.arange(first, first + span) - 1970 * 12).astype('datetime64[M]')
+    return month_starts, [name for name, p in zip(columns.categories, present) if p], sums[present] / 100
@@ -0,0 +1,258 @@
+"""
+ASGI variant of the API.
+
+The hottest read endpoints are served natively with an async driver (asyncpg
+on PostgreSQL, aiosqlite on SQLite) from one connection pool per worker, so a
+request waiting on the database holds no thread. Every other /api route is
+served by the regular Flask app, mounted through a WSGI bridge, so the two
+variants expose the same API. Forecasting is CPU-bound and runs in a process
+pool instead of on the event loop.
+
+Run with: uvicorn asgi:app --workers 4
+"""
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import wraps
+import jwt
+import numpy as np
+from sqlalchemy import BigInteger, extract, func, select, type_coerce
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.datastructures import MultiDict
+from app import create_app
+from app.admission import admission_gate, rejection
+from app.filters import (
+    apply_filters, apply_sort, load_fields, month_range, parse_fields, parse_flag, parse_pagination,
+    wants_pagination
+)
+from app.forecasting import InsufficientData, holt_winters_projection
+from app.models import Projection, Transaction, User
+from app.precompute import current_period
+
+try:
+    from a2wsgi import WSGIMiddleware
+    from starlette.applications import Starlette
+    from starlette.middleware import Middleware
+    from starlette.middleware.cors import CORSMiddleware
+    from starlette.responses import JSONResponse
+    from starlette.routing import Mount, Route
+except ImportError:  # optional: pip install .[async]
+    Starlette = None
+
+logger = logging.getLogger(__name__)
+
+# Synchronous drivers and their async counterparts
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def async_database_uri(uri):
+    """Swap the driver in a SQLAlchemy URI for its async counterpart."""
+    scheme, sep, rest = uri.partition('://')
+    if scheme not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{scheme}'; set ASYNC_DATABASE_URL")
+    return ASYNC_DRIVERS[scheme] + sep + rest
+
+
+def _json_error(status, **body):
+    return JSONResponse(body, status_code=status)
+
+
+def authenticated(handler):
+    """Async counterpart of token_required: resolves the bearer token to a User."""
+    @wraps(handler)
+    async def decorated(request):
+        config = request.app.state.config
+        auth_header = request.headers.get('Authorization')
+        token = None
+        if auth_header:
+            parts = auth_header.split(' ')
+            if len(parts) < 2:
+                return _json_error(401, message='Invalid token format')
+            token = parts[1]
+        if not token:
+            return _json_error(401, message='Token is missing')
+
+        try:
+            payload = jwt.decode(token, config['JWT_SECRET_KEY'], algorithms=[config['JWT_ALGORITHM']])
+        except jwt.InvalidTokenError:
+            return _json_error(401, message='Token is invalid or expired')
+
+        async with request.app.state.sessions() as session:
+            user = await session.get(User, payload['user_id'])
+            if user is None:
+                return _json_error(401, message='User not found')
+            return await handler(request, session, user)
+
+    return decorated
+
+
+async def health_check(_request):
+    return JSONResponse({'status': 'healthy', 'service': 'finance-tracker-api'})
+
+
+@authenticated
+async def get_categories(_request, session, user):
+    """Same response as GET /api/categories: {category: sorted subcategories}."""
+    rows = await session.execute(
+        select(Transaction.category, Transaction.subcategory).where(Transaction.user_id == user.id).distinct())
+    categories = {}
+    for category, subcategory in rows:
+        subcategories = categories.setdefault(category, [])
+        if subcategory and subcategory not in subcategories:
+            subcategories.append(subcategory)
+    for subcategories in categories.values():
+        subcategories.sort()
+    return JSONResponse(categories)
+
+
+@authenticated
+async def get_transactions(request, session, user):
+    """Same parameters and responses as GET /api/transactions."""
+    args = MultiDict(list(request.query_params.multi_items()))
+    year = args.get('year', type=int)
+    month = args.get('month', type=int)
+    paginated = wants_pagination(args)
+
+    query = select(Transaction).where(Transaction.user_id == user.id)
+    try:
+        if year and month and args.get('category'):
+            first_day, last_day = month_range(year, month)
+            query = query.where(Transaction.transaction_date.between(first_day, last_day))
+        query = apply_sort(apply_filters(query, args), args.get('sort'))
+        # Deferred columns are never touched: to_dict() only reads the selected fields
+        fields = parse_fields(args)
+        query = load_fields(query, fields)
+        if paginated:
+            page, per_page = parse_pagination(args)
+    except ValueError as e:
+        return _json_error(400, error='Invalid query parameters', message=str(e))
+
+    if not paginated:
+        transactions = (await session.scalars(query)).all()
+        return JSONResponse([t.to_dict(fields) for t in transactions])
+
+    total = await session.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+    transactions = (await session.scalars(query.limit(per_page).offset((page - 1) * per_page))).all()
+    return JSONResponse({
+        'items': [t.to_dict(fields) for t in transactions],
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'seq': user.change_seq,
+    })
+
+
+@authenticated
+async def get_projections(request, session, user):
+    """
+    Same response as GET /api/projections/<category>: the stored result if fresh,
+    else fitted in the process pool and stored.
+    """
+    if parse_flag(request.query_params, 'hierarchical'):
+        # Hierarchical mode is only implemented in Flask; the bridge is itself an ASGI response
+        return request.app.state.flask_asgi
+    category = request.path_params['category']
+    projection = await session.scalar(
+        select(Projection).where(Projection.user_id == user.id, Projection.category == category))
+    if projection is not None and projection.is_fresh(user.change_seq, current_period()):
+        return JSONResponse(projection.result, status_code=projection.status)
+
+    year = extract('year', Transaction.transaction_date)
+    month = extract('month', Transaction.transaction_date)
+    rows = (await session.execute(
+        select(year, month, func.sum(func.abs(type_coerce(Transaction.amount, BigInteger))), func.count())
+        .where(Transaction.user_id == user.id, Transaction.category == category)
+        .group_by(year, month).order_by(year, month)
+    )).all()
+
+    month_starts = np.array([f'{int(y):04d}-{int(m):02d}' for y, m, _, _ in rows], dtype='datetime64[M]')
+    monthly_amounts = np.array([int(total) / 100 for _, _, total, _ in rows], dtype=float)
+    transaction_count = sum(count for _, _, _, count in rows)
+
+    # Live fits share the Flask route's 'projections' gate, so the same limits apply under ASGI
+    gate = admission_gate(request.app.state.flask_app, 'projections')
+    loop = asyncio.get_running_loop()
+    wait = gate.check_rate(user.id)
+    # acquire() may wait for a slot, so it waits on a thread rather than the event loop
+    if wait is not None or not await loop.run_in_executor(None, gate.acquire):
+        status, body, retry_after = rejection(gate, wait)
+        return JSONResponse(body, status_code=status, headers={'Retry-After': str(retry_after)})
+    try:
+        status, body = 200, await loop.run_in_executor(
+            request.app.state.executor, holt_winters_projection, month_starts, monthly_amounts, transaction_count)
+    except InsufficientData as e:
+        status, body = 400, {'error': e.title, 'message': str(e)}
+    except Exception as e:
+        return _json_error(500, error=f'Failed to generate projections: {str(e)}')
+    finally:
+        gate.release()
+    await _store_projection(session, user, category, projection, status, body)
+    return JSONResponse(body, status_code=status)
+
+
+async def _store_projection(session, user, category, projection, status, body):
+    """Async counterpart of precompute.store_projection, reusing the row the request already read."""
+    period = current_period()
+    if projection is not None and projection.period == period and projection.data_version > user.change_seq:
+        return
+    try:
+        if projection is None:
+            projection = Projection(user_id=user.id, category=category)
+            session.add(projection)
+        projection.record(user.change_seq, period, status, body)
+        await session.commit()
+    except Exception as e:
+        # Includes losing an insert race to a concurrent request for the same category
+        await session.rollback()
+        logger.error(f"Error storing projections for user {user.id}, {category}: {str(e)}")
+
+
+def create_async_app(config_object=None):
+    """Build the ASGI app around a regular Flask app created with the same configuration."""
+    if Starlette is None:
+        raise RuntimeError("The async app needs the optional 'async' dependencies (pip install '.[async]')")
+
+    flask_app = create_app(config_object)
+    config = flask_app.config
+    uri = config.get('ASYNC_DATABASE_URL') or async_database_uri(config['SQLALCHEMY_DATABASE_URI'])
+    engine_options = {}
+    if not uri.startswith('sqlite'):
+        engine_options = {'pool_size': config.get('ASYNC_POOL_SIZE', 20),
+                          'max_overflow': config.get('ASYNC_MAX_OVERFLOW', 10),
+                          'pool_pre_ping': True}
+
+    @asynccontextmanager
+    async def lifespan(app):
+        engine = create_async_engine(uri, **engine_options)
+        app.state.config = config
+        app.state.sessions = async_sessionmaker(engine, expire_on_commit=False)
+        app.state.executor = ProcessPoolExecutor(max_workers=config.get('FORECAST_WORKERS'))
+        try:
+            yield
+        finally:
+            app.state.executor.shutdown(cancel_futures=True)
+            await engine.dispose()
+
+    flask_asgi = WSGIMiddleware(flask_app)
+    app = Starlette(
+        routes=[
+            Route('/api/health', health_check, methods=['GET']),
+            Route('/api/categories', get_categories, methods=['GET']),
+            Route('/api/transactions', get_transactions, methods=['GET']),
+            Route('/api/projections/{category}', get_projections, methods=['GET']),
+            # Everything else (writes, analytics, rules, auth, ...) is served by Flask
+            Mount('/', app=flask_asgi),
+        ],
+        # Same policy as the Flask app; header values set here replace Flask's rather than duplicating them
+        middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_credentials=True,
+                               allow_methods=['*'], allow_headers=['*'])],
+        lifespan=lifespan,
+    )
+    app.state.flask_app = flask_app
+    app.state.flask_asgi = flask_asgi
+    return app
@@ -1,7 +1,7 @@
 import jwt
 from datetime import datetime
 from functools import wraps
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, g
 from app.models import User
 
 
@@ -39,6 +39,11 @@ def token_required(f):
     """Decorator to protect routes with JWT authentication"""
     @wraps(f)
     def decorated(*args, **kwargs):
+        # Sub-requests of /api/batch reuse the batch's authentication
+        batch_user = g.get('batch_user')
+        if batch_user is not None:
+            return f(batch_user, *args, **kwargs)
+
         token = None
 
         # Get token from Authorization header
@@ -63,6 +68,7 @@ def token_required(f):
             return jsonify({'message': 'User not found'}), 401
 
         # Pass current_user to the route
+        g.current_user = current_user
         return f(current_user, *args, **kwargs)
 
     return decorated
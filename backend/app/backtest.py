@@ -0,0 +1,146 @@
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from flask import current_app
+from app.analytics import monthly_series
+from app.cache import user_columns
+from app.forecasting import MIN_TRAINING_MONTHS, MIN_TRANSACTIONS, SEASON, fit_holt_winters
+from app.models import ForecastBacktest
+
+
+DEFAULT_FOLDS = 12
+MAX_FOLDS = 36
+DEFAULT_HORIZON = 12
+
+_executor_lock = threading.Lock()
+
+
+def parse_backtest_args(args):
+    """Validate /backtest query parameters. Returns (folds, horizon)."""
+    folds = args.get('folds', DEFAULT_FOLDS, type=int)
+    horizon = args.get('horizon', DEFAULT_HORIZON, type=int)
+    if not 1 <= folds <= MAX_FOLDS:
+        raise ValueError(f"'folds' must be between 1 and {MAX_FOLDS}")
+    if not 1 <= horizon <= SEASON:
+        raise ValueError(f"'horizon' must be between 1 and {SEASON}")
+    return folds, horizon
+
+
+def backtest_fold(month_starts, amounts, origin, horizon):
+    """
+    Fit on the first 'origin' months and compare the next 'horizon' months (or fewer) with the actuals.
+
+    Returns (model errors, seasonal-naive errors, actuals) as arrays. Runs in
+    a worker process, so it only takes and returns plain arrays.
+    """
+    actual = amounts[origin:origin + horizon]
+    ts = pd.Series(amounts[:origin], index=pd.to_datetime(month_starts[:origin]))
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        forecast = np.asarray(fit_holt_winters(ts).forecast(len(actual)))
+    # Same month last year
+    naive = amounts[origin - SEASON:origin - SEASON + len(actual)]
+    return forecast - actual, naive - actual, actual
+
+
+def fold_origins(series_length, transaction_count, folds):
+    """Training lengths for the expanding-window folds: the last 'folds' months, each used as a forecast origin."""
+    if transaction_count < MIN_TRANSACTIONS or series_length <= MIN_TRAINING_MONTHS:
+        return []
+    return list(range(max(MIN_TRAINING_MONTHS, series_length - folds), series_length))
+
+
+def _json_floats(values):
+    return [None if np.isnan(v) else float(v) for v in values]
+
+
+def score_folds(fold_results, horizon):
+    """Error curves by months ahead (1..horizon) over the folds that reach that far."""
+    errors = np.full((len(fold_results), horizon), np.nan)
+    naive_errors = np.full_like(errors, np.nan)
+    actuals = np.full_like(errors, np.nan)
+    for i, (error, naive_error, actual) in enumerate(fold_results):
+        errors[i, :len(error)] = error
+        naive_errors[i, :len(naive_error)] = naive_error
+        actuals[i, :len(actual)] = actual
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns and zero actuals
+        mae = np.nanmean(np.abs(errors), axis=0)
+        naive_mae = np.nanmean(np.abs(naive_errors), axis=0)
+        percentage = np.where(actuals > 0, np.abs(errors) / actuals, np.nan)
+        return {
+            'horizons': list(range(1, horizon + 1)),
+            'folds': np.count_nonzero(~np.isnan(errors), axis=0).tolist(),
+            'mae': _json_floats(mae),
+            'rmse': _json_floats(np.sqrt(np.nanmean(np.square(errors), axis=0))),
+            'mape': _json_floats(np.nanmean(percentage, axis=0) * 100),
+            'bias': _json_floats(np.nanmean(errors, axis=0)),
+            'seasonal_naive_mae': _json_floats(naive_mae),
+            # Above 0 means the model beats repeating last year's value
+            'skill': _json_floats(np.where(naive_mae > 0, 1 - mae / naive_mae, np.nan)),
+        }
+
+
+def run_backtests(series, folds=DEFAULT_FOLDS, horizon=DEFAULT_HORIZON, executor=None):
+    """
+    Rolling-origin backtest of the projections model for several categories.
+
+    series maps category -> (month_starts, amounts, transaction_count), as
+    returned by analytics.monthly_series. Every (category, fold) pair is an
+    independent fit, and all of them are spread over the executor's worker
+    processes (inline without an executor). Categories with too little history
+    for even one fold are listed under 'skipped'.
+    """
+    tasks = []
+    skipped = []
+    for category, (month_starts, amounts, transaction_count) in series.items():
+        origins = fold_origins(len(amounts), transaction_count, folds)
+        if not origins:
+            skipped.append(category)
+        tasks += [(category, month_starts, amounts, origin) for origin in origins]
+
+    mapper = executor.map if executor is not None else map
+    outcomes = mapper(backtest_fold, *zip(*[task[1:] for task in tasks]), [horizon] * len(tasks)) if tasks else []
+
+    by_category = {}
+    for (category, *_), outcome in zip(tasks, outcomes):
+        by_category.setdefault(category, []).append(outcome)
+
+    return {
+        'folds': folds,
+        'horizon': horizon,
+        'categories': {category: score_folds(results, horizon) for category, results in by_category.items()},
+        'skipped': sorted(skipped),
+    }
+
+
+def user_backtest(user_id, categories=None, folds=DEFAULT_FOLDS, horizon=DEFAULT_HORIZON, executor=None,
+                  columns=None):
+    """Backtest the user's categories (all of them by default) on the same series get_projections fits."""
+    if columns is None:
+        columns = user_columns(user_id)
+    names = columns.categories if categories is None else [c for c in categories if c in columns.categories]
+    series = {name: monthly_series(user_id, name, columns=columns) for name in names}
+    return run_backtests(series, folds, horizon, executor)
+
+
+def forecast_executor():
+    """The app's process pool for forecasting work, created on first use (FORECAST_WORKERS processes)."""
+    with _executor_lock:
+        executor = current_app.extensions.get('forecast_executor')
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=current_app.config.get('FORECAST_WORKERS'))
+            current_app.extensions['forecast_executor'] = executor
+        return executor
+
+
+def fresh_backtest(user, period=None):
+    """The stored default backtest for the user if it reflects their current data and month."""
+    backtest = ForecastBacktest.query.filter_by(user_id=user.id).first()
+    if backtest is not None and backtest.is_fresh(user.change_seq, period or datetime.now().strftime('%Y-%m')):
+        return backtest
+    return None
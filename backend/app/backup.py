@@ -0,0 +1,183 @@
+from collections import Counter
+from app import db
+from app.changes import next_change_seq
+from app.duplicates import existing_fingerprint_counts
+from app.models import Transaction, transaction_fingerprint
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: pip install .[backup]
+    pa = pq = None
+
+
+EXPORT_FORMATS = ('parquet', 'arrow')
+# Rows per Parquet row group / Arrow record batch
+BATCH_SIZE = 50000
+PARQUET_MAGIC = b'PAR1'
+
+EXPORT_COLUMNS = ('user_id', 'transaction_date', 'category', 'subcategory', 'description', 'amount')
+
+
+def _schema():
+    # Categories repeat heavily, so they are dictionary-encoded
+    return pa.schema([
+        ('user_id', pa.int32()),
+        ('transaction_date', pa.date32()),
+        ('category', pa.dictionary(pa.int32(), pa.string())),
+        ('subcategory', pa.dictionary(pa.int32(), pa.string())),
+        ('description', pa.string()),
+        ('amount', pa.decimal128(10, 2)),
+    ])
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Parquet/Arrow backups need pyarrow (pip install '.[backup]')")
+
+
+def iter_record_batches(user_id=None, batch_size=BATCH_SIZE):
+    """Yield transactions as Arrow record batches, paging by id so memory stays flat."""
+    require_pyarrow()
+    schema = _schema()
+    columns = [getattr(Transaction, name) for name in EXPORT_COLUMNS]
+    last_id = 0
+    while True:
+        query = db.session.query(Transaction.id, *columns).filter(Transaction.id > last_id)
+        if user_id is not None:
+            query = query.filter(Transaction.user_id == user_id)
+        rows = query.order_by(Transaction.id).limit(batch_size).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        values = list(zip(*rows))[1:]
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(values, schema)], schema=schema)
+
+
+class _ChunkSink:
+    """Write-only file object that buffers writer output until it is drained."""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _open_writer(sink, fmt):
+    if fmt == 'parquet':
+        return pq.ParquetWriter(sink, _schema(), compression='zstd', use_dictionary=['category', 'subcategory'])
+    return pa.ipc.new_stream(sink, _schema(), options=pa.ipc.IpcWriteOptions(compression='zstd'))
+
+
+def stream_export(user_id=None, fmt='parquet', batch_size=BATCH_SIZE):
+    """
+    Generate an export as byte chunks, one per row group, for streaming responses.
+
+    Parquet files get one row group per batch. Arrow exports use the IPC
+    stream format, which (unlike the file format) allows each batch to carry
+    its own category dictionary.
+    """
+    require_pyarrow()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"'format' must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    sink = _ChunkSink()
+    writer = _open_writer(sink, fmt)
+    for batch in iter_record_batches(user_id, batch_size):
+        if fmt == 'parquet':
+            writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            writer.write_batch(batch)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def export_to_file(path, user_id=None, fmt='parquet'):
+    """Write an export to path. Returns the number of bytes written."""
+    written = 0
+    with open(path, 'wb') as f:
+        for chunk in stream_export(user_id, fmt):
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def _read_batches(source):
+    """Yield record batches from a Parquet file or Arrow IPC stream (path or file object)."""
+    if isinstance(source, str) or hasattr(source, '__fspath__'):
+        source = open(source, 'rb')
+    with source:
+        magic = source.read(len(PARQUET_MAGIC))
+        source.seek(0)
+        if magic == PARQUET_MAGIC:
+            yield from pq.ParquetFile(source).iter_batches(batch_size=BATCH_SIZE)
+        else:
+            yield from pa.ipc.open_stream(source)
+
+
+def restore_transactions(source, user_id=None):
+    """
+    Bulk-load an export produced by stream_export().
+
+    With user_id, every row is restored for that user; otherwise rows keep the
+    user_id stored in the file. Rows already present (by fingerprint, counted
+    as multisets) are skipped, so restoring the same file twice is harmless.
+    Each batch is inserted with one executemany and committed.
+    """
+    require_pyarrow()
+    restored = 0
+    skipped = 0
+    # Fingerprints inserted by this restore, so later batches do not mistake them for pre-existing rows
+    inserted = Counter()
+
+    for batch in _read_batches(source):
+        rows = batch.to_pylist()
+        by_user = {}
+        for row in rows:
+            if user_id is not None:
+                row['user_id'] = user_id
+            row['fingerprint'] = transaction_fingerprint(
+                row['user_id'], row['transaction_date'], row['amount'], row['description'])
+            by_user.setdefault(row['user_id'], []).append(row)
+
+        new_rows = []
+        for owner, owner_rows in by_user.items():
+            change_seq = None
+            remaining = existing_fingerprint_counts(owner, [row['fingerprint'] for row in owner_rows])
+            remaining.subtract({fp: inserted[(owner, fp)] for fp in remaining})
+            for row in owner_rows:
+                if remaining[row['fingerprint']] > 0:
+                    remaining[row['fingerprint']] -= 1
+                    skipped += 1
+                else:
+                    if change_seq is None:
+                        change_seq = next_change_seq(owner)
+                    row['change_seq'] = change_seq
+                    inserted[(owner, row['fingerprint'])] += 1
+                    new_rows.append(row)
+
+        if new_rows:
+            db.session.execute(db.insert(Transaction), new_rows)
+            db.session.commit()
+        restored += len(new_rows)
+
+    return {'restored': restored, 'skipped': skipped}
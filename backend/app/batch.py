@@ -0,0 +1,104 @@
+import json
+import logging
+from flask import current_app, g, make_response, request
+from werkzeug.exceptions import HTTPException
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_REQUESTS = 20
+# Headers passed on from the batch request to every sub-request
+FORWARDED_HEADERS = ('X-Read-Consistency',)
+
+
+def parse_batch(data, max_requests=DEFAULT_MAX_REQUESTS):
+    """
+    Validate a /batch body: {"requests": ["/api/categories", {"id": "food", "path": "/api/projections/Food"}]}.
+
+    Returns a list of (id, path). Ids default to the position in the list.
+    Only GET sub-requests to /api/ routes are allowed (and not /api/batch itself).
+    """
+    if not isinstance(data, dict) or not isinstance(data.get('requests'), list):
+        raise ValueError("Body must be an object with a 'requests' list")
+    items = data['requests']
+    if not 1 <= len(items) <= max_requests:
+        raise ValueError(f"'requests' must have between 1 and {max_requests} entries")
+
+    parsed = []
+    for position, item in enumerate(items):
+        if isinstance(item, str):
+            item = {'path': item}
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            raise ValueError(f"Request {position} must be a path or an object with a 'path'")
+        if item.get('method', 'GET').upper() != 'GET':
+            raise ValueError(f"Request {position}: only GET requests can be batched")
+        path = item['path']
+        if not path.startswith('/api/') or path.split('?', 1)[0].rstrip('/') == '/api/batch':
+            raise ValueError(f"Request {position}: '{path}' is not a batchable API path")
+        parsed.append((item.get('id', position), path))
+    return parsed
+
+
+def _body(response):
+    data = response.get_data(as_text=True)
+    if response.is_json:
+        return json.loads(data) if data else None
+    return data
+
+
+def _restore_globals(saved):
+    for name in [name for name in g if name not in saved]:
+        g.pop(name)
+    for name, value in saved.items():
+        setattr(g, name, value)
+
+
+def run_sub_request(path, headers):
+    """
+    Dispatch one GET sub-request through the normal view function and return (status, headers, body).
+
+    It runs inside the batch's app context, so it shares the batch's DB session,
+    and @token_required takes the batch's user instead of decoding the token again.
+    That context's g is shared too, so whatever the view sets on it (such as
+    @replica_read's g.read_replica) is undone before the next sub-request runs.
+    """
+    path, _, query_string = path.partition('?')
+    saved = {name: g.get(name) for name in g}
+    with current_app.test_request_context(path, method='GET', query_string=query_string, headers=headers):
+        try:
+            if request.routing_exception is not None:
+                raise request.routing_exception
+            response = make_response(current_app.dispatch_request())
+        except HTTPException as e:
+            response = make_response({'error': e.name, 'message': e.description}, e.code)
+        except Exception as e:
+            logger.error(f"Error in batched request {path}: {str(e)}")
+            response = make_response({'error': f'Failed to process request: {str(e)}'}, 500)
+        finally:
+            _restore_globals(saved)
+
+    kept = {name: response.headers[name] for name in ('Retry-After', 'X-Cache') if name in response.headers}
+    return response.status_code, kept, _body(response)
+
+
+def run_batch(current_user, requests):
+    """
+    Run the parsed sub-requests one after another for the (already authenticated) user.
+
+    Each sub-request keeps its own status, so one failing (404, 429, ...) does
+    not fail the others. They run sequentially: they share one DB session, and
+    SQLAlchemy sessions must not be used from several threads.
+    """
+    headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+    g.batch_user = current_user
+    try:
+        results = []
+        for request_id, path in requests:
+            status, response_headers, body = run_sub_request(path, headers)
+            result = {'id': request_id, 'path': path, 'status': status, 'body': body}
+            if response_headers:
+                result['headers'] = response_headers
+            results.append(result)
+        return results
+    finally:
+        g.pop('batch_user', None)
@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, g, request
+import numpy as np
+from app import db
+from app.models import Transaction, User
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+class UserColumns:
+    """
+    One user's transactions as parallel NumPy arrays.
+
+    Dates are day ordinals (days since 1970-01-01) plus a month index
+    (year * 12 + month - 1). Amounts are integer minor units (øre), so sums are
+    exact. Category and subcategory are integer codes into sorted name tuples.
+    Subcategory code -1 means no subcategory.
+    """
+
+    def __init__(self, days, amounts, category_codes, categories, subcategory_codes, subcategories):
+        self.days = days
+        months_since_epoch = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int32)
+        self.month_index = months_since_epoch + 1970 * 12
+        self.amounts = amounts
+        self.category_codes = category_codes
+        self.categories = categories
+        self.subcategory_codes = subcategory_codes
+        self.subcategories = subcategories
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from (transaction_date, amount in øre, category, subcategory) rows."""
+        if rows:
+            dates, amounts, categories, subcategories = zip(*rows)
+        else:
+            dates = amounts = categories = subcategories = ()
+
+        days = (np.array(dates, dtype='datetime64[D]') - EPOCH).astype(np.int32)
+        minor = np.array(amounts, dtype=np.int64)
+        category_names = tuple(sorted(set(categories)))
+        subcategory_names = tuple(sorted(set(subcategories) - {None}))
+        category_lookup = {name: code for code, name in enumerate(category_names)}
+        subcategory_lookup = {name: code for code, name in enumerate(subcategory_names)}
+        subcategory_lookup[None] = -1
+
+        return cls(
+            days, minor,
+            np.array([category_lookup[name] for name in categories], dtype=np.int32), category_names,
+            np.array([subcategory_lookup[name] for name in subcategories], dtype=np.int32), subcategory_names,
+        )
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def nbytes(self):
+        arrays = (self.days, self.month_index, self.amounts, self.category_codes, self.subcategory_codes)
+        names = sum(len(name) for name in self.categories + self.subcategories)
+        return sum(array.nbytes for array in arrays) + names
+
+    @property
+    def years(self):
+        return self.month_index // 12
+
+    @property
+    def months(self):
+        return self.month_index % 12 + 1
+
+    def category_mask(self, category):
+        """Rows in the named category (all False if the user has no such category)."""
+        if category not in self.categories:
+            return np.zeros(len(self), dtype=bool)
+        return self.category_codes == self.categories.index(category)
+
+    def subcategory_mask(self, subcategory):
+        if subcategory not in self.subcategories:
+            return np.zeros(len(self), dtype=bool)
+        return self.subcategory_codes == self.subcategories.index(subcategory)
+
+
+def load_user_columns(user_id):
+    """Load a user's transactions straight into arrays (no ORM objects, amounts as raw øre)."""
+    rows = db.session.query(
+        Transaction.transaction_date, db.type_coerce(Transaction.amount, db.BigInteger),
+        Transaction.category, Transaction.subcategory
+    ).filter(Transaction.user_id == user_id).all()
+    return UserColumns.from_rows(rows)
+
+
+def current_change_seq(user_id):
+    """The user's change sequence: one primary-key lookup, bumped by every write to their transactions."""
+    return db.session.scalar(db.select(User.change_seq).where(User.id == user_id))
+
+
+class ColumnarCache:
+    """
+    Per-user UserColumns kept in memory under a byte budget, evicting the least recently used.
+
+    With version_of (e.g. current_change_seq), every get() checks the entry
+    against the user's current version in the database and reloads it if any
+    process (another worker, the ingest flusher, a CLI command) wrote since.
+    invalidate() drops an entry straight after this process's own writes, and
+    ttl bounds how long an entry lives regardless. A generation counter stops
+    a load that raced with an invalidation from storing stale data.
+    """
+
+    def __init__(self, max_bytes, ttl, version_of=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version_of = version_of
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # user_id -> (loaded_at, version, UserColumns)
+        self._generations = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id, loader=load_user_columns):
+        # Read before loading, so an entry is never tagged newer than its rows
+        version = self.version_of(user_id) if self.version_of else None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] == version and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            generation = self._generations.get(user_id, 0)
+
+        columns = loader(user_id)
+
+        with self._lock:
+            if self._generations.get(user_id, 0) == generation and columns.nbytes <= self.max_bytes:
+                self._discard(user_id)
+                self._entries[user_id] = (time.monotonic(), version, columns)
+                self._bytes += columns.nbytes
+                while self._bytes > self.max_bytes:
+                    self._discard(next(iter(self._entries)))
+        return columns
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self._discard(user_id)
+
+    def _discard(self, user_id):
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            self._bytes -= entry[2].nbytes
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+
+def init_cache(app):
+    """Attach the analytics cache and drop a user's entry after each of their successful writes."""
+    app.extensions['analytics_cache'] = ColumnarCache(
+        max_bytes=app.config.get('ANALYTICS_CACHE_MAX_BYTES', 64 * 1024 * 1024),
+        ttl=app.config.get('ANALYTICS_CACHE_TTL_SECONDS', 300),
+        version_of=current_change_seq,
+    )
+
+    @app.after_request
+    def invalidate_after_write(response):
+        user = g.get('current_user')
+        if user is not None and request.method not in SAFE_METHODS and response.status_code < 400:
+            app.extensions['analytics_cache'].invalidate(user.id)
+        return response
+
+
+def user_columns(user_id):
+    """The user's cached columns, loading them on a miss."""
+    return current_app.extensions['analytics_cache'].get(user_id)
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.filters import load_fields
+from app.models import Transaction, TransactionTombstone, User
+
+
+def bump_change_seq(connection, user_id):
+    """
+    Hand out the user's next change sequence number.
+
+    The UPDATE locks the user's row until commit, so one user's writes commit
+    in sequence order and a client can never skip a change that commits late.
+    """
+    return connection.execute(
+        db.update(User).where(User.id == user_id).values(change_seq=User.change_seq + 1).returning(User.change_seq)
+    ).scalar_one()
+
+
+def next_change_seq(user_id):
+    """bump_change_seq() on the current session's connection, for bulk (Core) writes."""
+    return bump_change_seq(db.session.connection(bind_arguments={'mapper': User}), user_id)
+
+
+def record_tombstones(user_id, transaction_ids, change_seq):
+    if transaction_ids:
+        db.session.execute(db.insert(TransactionTombstone), [
+            {'user_id': user_id, 'transaction_id': transaction_id, 'change_seq': change_seq}
+            for transaction_id in transaction_ids
+        ])
+
+
+@event.listens_for(Session, 'before_flush')
+def _stamp_transaction_changes(session, _flush_context, _instances):
+    """
+    Give ORM inserts/updates a change sequence and leave tombstones for ORM deletes (one bump per user).
+
+    ORM updates also bump the row's version, as the Core write paths do.
+    """
+    touched = [obj for obj in session.new if isinstance(obj, Transaction)]
+    updated = [obj for obj in session.dirty if isinstance(obj, Transaction) and session.is_modified(obj)]
+    touched += updated
+    deleted = [obj for obj in session.deleted if isinstance(obj, Transaction)]
+    if not touched and not deleted:
+        return
+
+    connection = session.connection(bind_arguments={'mapper': User})
+    seqs = {user_id: bump_change_seq(connection, user_id)
+            for user_id in sorted({obj.user_id for obj in touched + deleted})}
+    for obj in touched:
+        obj.change_seq = seqs[obj.user_id]
+    for obj in updated:
+        obj.version = Transaction.version + 1
+    for obj in deleted:
+        session.add(TransactionTombstone(user_id=obj.user_id, transaction_id=obj.id,
+                                         change_seq=seqs[obj.user_id]))
+
+
+def changes_since(user_id, since, fields=None):
+    """
+    Transactions inserted or updated, and ids deleted, after sequence 'since'.
+
+    Only changes up to the user's current sequence are returned, so the
+    returned 'seq' is a consistent point to resume from. A client that is
+    behind the compaction horizon (or ahead of the server, e.g. after a
+    restore) gets 'reset': true and the full current set instead. 'fields'
+    limits the upserts to those to_dict() fields (and their columns).
+    """
+    seq, compacted_seq = db.session.query(User.change_seq, User.compacted_seq).filter(User.id == user_id).one()
+    reset = since == 0 or since < compacted_seq or since > seq
+
+    query = Transaction.query.filter(Transaction.user_id == user_id, Transaction.change_seq <= seq)
+    if fields is not None:
+        query = load_fields(query, fields)
+    deletes = []
+    if not reset:
+        query = query.filter(Transaction.change_seq > since)
+        deletes = [transaction_id for (transaction_id,) in db.session.query(TransactionTombstone.transaction_id).filter(
+            TransactionTombstone.user_id == user_id,
+            TransactionTombstone.change_seq > since,
+            TransactionTombstone.change_seq <= seq
+        ).order_by(TransactionTombstone.change_seq, TransactionTombstone.id)]
+
+    return {
+        'since': since,
+        'seq': seq,
+        'reset': reset,
+        'upserts': [t.to_dict(fields) for t in query.order_by(Transaction.change_seq, Transaction.id)],
+        'deletes': deletes,
+    }
+
+
+def compact_tombstones(retention_days, now=None):
+    """
+    Delete tombstones older than retention_days. Returns the number removed.
+
+    Each user's compacted_seq moves up to the newest sequence removed, so
+    clients last synced before it are told to reset instead of missing deletes.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    horizons = db.session.query(TransactionTombstone.user_id, db.func.max(TransactionTombstone.change_seq)).filter(
+        TransactionTombstone.deleted_at < cutoff).group_by(TransactionTombstone.user_id).all()
+
+    removed = 0
+    for user_id, horizon in horizons:
+        removed += db.session.execute(db.delete(TransactionTombstone).where(
+            TransactionTombstone.user_id == user_id, TransactionTombstone.change_seq <= horizon
+        )).rowcount
+        db.session.execute(db.update(User).where(User.id == user_id, User.compacted_seq < horizon).values(
+            compacted_seq=horizon))
+    db.session.commit()
+    return removed
@@ -1,5 +1,12 @@
+import click
+from sqlalchemy import text
 from app import db
+from app.backup import EXPORT_FORMATS, export_to_file, restore_transactions
+from app.changes import compact_tombstones
+from app.duplicates import backfill_fingerprints
 from app.models import User
+from app.precompute import precompute_projections
+from app.response_cache import invalidate_tags, user_tag
 
 
 def init_db(app):
@@ -12,3 +19,74 @@ def init_db(app):
             admin.set_password('password')  # Replace with a secure password
             db.session.add(admin)
             db.session.commit()
+
+
+def ensure_partitions(app):
+    """Create the yearly transaction partitions up to TRANSACTION_PARTITION_YEARS_AHEAD (PostgreSQL only)."""
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            return 0
+
+        # ensure_transaction_partitions() is defined in database/init/partitions.sql
+        created = db.session.execute(
+            text('SELECT ensure_transaction_partitions(:years_ahead)'),
+            {'years_ahead': app.config.get('TRANSACTION_PARTITION_YEARS_AHEAD', 2)}
+        ).scalar()
+        db.session.commit()
+        return created
+
+
+def register_commands(app):
+    """Register database maintenance commands on the Flask CLI."""
+    @app.cli.command('ensure-partitions')
+    def ensure_partitions_command():
+        """Create missing yearly partitions for the transactions table."""
+        created = ensure_partitions(app)
+        click.echo(f'Created {created} transaction partition(s)')
+
+    @app.cli.command('backfill-fingerprints')
+    def backfill_fingerprints_command():
+        """Compute duplicate-detection fingerprints for transactions that lack one."""
+        with app.app_context():
+            updated = backfill_fingerprints()
+        click.echo(f'Fingerprinted {updated} transaction(s)')
+
+    @app.cli.command('export-transactions')
+    @click.argument('path')
+    @click.option('--user-id', type=int, help='Export only this user (default: everyone)')
+    @click.option('--format', 'fmt', type=click.Choice(EXPORT_FORMATS), default='parquet')
+    def export_transactions_command(path, user_id, fmt):
+        """Export transactions to a Parquet file or Arrow IPC stream."""
+        with app.app_context():
+            written = export_to_file(path, user_id=user_id, fmt=fmt)
+        click.echo(f'Wrote {written} bytes to {path}')
+
+    @app.cli.command('restore-transactions')
+    @click.argument('path')
+    @click.option('--user-id', type=int, help='Restore every row for this user (default: the user_id in the file)')
+    def restore_transactions_command(path, user_id):
+        """Bulk-load a Parquet/Arrow export, skipping rows that already exist."""
+        with app.app_context():
+            result = restore_transactions(path, user_id=user_id)
+            user_ids = [user_id] if user_id is not None else [uid for (uid,) in db.session.query(User.id)]
+            invalidate_tags(*[user_tag(uid) for uid in user_ids])
+        click.echo(f"Restored {result['restored']} transaction(s), skipped {result['skipped']} duplicate(s)")
+
+    @app.cli.command('compact-tombstones')
+    @click.option('--days', type=int, default=None, help='Retention in days (default: TOMBSTONE_RETENTION_DAYS)')
+    def compact_tombstones_command(days):
+        """Delete old delta-sync tombstones."""
+        with app.app_context():
+            removed = compact_tombstones(days if days is not None else app.config.get('TOMBSTONE_RETENTION_DAYS', 90))
+        click.echo(f'Removed {removed} tombstone(s)')
+
+    @app.cli.command('precompute-projections')
+    def precompute_projections_command():
+        """Refresh stored projections and backtests for every user (safe to run from several hosts)."""
+        with app.app_context():
+            totals = precompute_projections()
+        if totals is None:
+            click.echo('Projection precompute already running elsewhere; skipped')
+        else:
+            click.echo(f"Computed {totals['computed']} projection(s) and {totals['backtested']} backtest(s) "
+                       f"for {totals['users']} user(s), removed {totals['removed']}")
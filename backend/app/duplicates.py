@@ -0,0 +1,95 @@
+from collections import Counter
+from app import db
+from app.models import Transaction, transaction_fingerprint
+
+
+# Fingerprints per IN (...) lookup
+LOOKUP_CHUNK_SIZE = 1000
+
+
+def existing_fingerprint_counts(user_id, fingerprints):
+    """Count stored transactions per fingerprint with indexed IN lookups."""
+    fingerprints = list(set(fingerprints))
+    counts = Counter()
+    for start in range(0, len(fingerprints), LOOKUP_CHUNK_SIZE):
+        rows = db.session.query(Transaction.fingerprint, db.func.count()).filter(
+            Transaction.user_id == user_id,
+            Transaction.fingerprint.in_(fingerprints[start:start + LOOKUP_CHUNK_SIZE])
+        ).group_by(Transaction.fingerprint).all()
+        counts.update(dict(rows))
+    return counts
+
+
+def find_import_duplicates(user_id, rows):
+    """
+    Fingerprint import rows (dicts) and return the indices that are already stored.
+
+    Counts are compared as multisets: if the database holds two identical rows
+    and the import has three, only the third is new. Genuine repeats (two
+    identical purchases on the same day) therefore survive a re-import of an
+    overlapping export.
+    """
+    for row in rows:
+        row['fingerprint'] = transaction_fingerprint(
+            user_id, row['transaction_date'], row['amount'], row.get('description'))
+
+    remaining = existing_fingerprint_counts(user_id, [row['fingerprint'] for row in rows])
+    duplicates = []
+    for index, row in enumerate(rows):
+        if remaining[row['fingerprint']] > 0:
+            remaining[row['fingerprint']] -= 1
+            duplicates.append(index)
+    return duplicates
+
+
+def find_duplicate_groups(user_id, limit=100):
+    """
+    Report groups of the user's transactions sharing a fingerprint.
+
+    One GROUP BY over the fingerprint column finds the groups, and one indexed
+    lookup loads their rows. Nothing is ever compared pairwise.
+    """
+    groups = db.session.query(Transaction.fingerprint, db.func.count().label('count')).filter(
+        Transaction.user_id == user_id,
+        Transaction.fingerprint.isnot(None)
+    ).group_by(Transaction.fingerprint).having(db.func.count() > 1).order_by(
+        db.desc('count'), Transaction.fingerprint).all()
+
+    selected = groups[:limit]
+    members = {}
+    if selected:
+        transactions = Transaction.query.filter(
+            Transaction.user_id == user_id,
+            Transaction.fingerprint.in_([fingerprint for fingerprint, _ in selected])
+        ).order_by(Transaction.id).all()
+        for transaction in transactions:
+            members.setdefault(transaction.fingerprint, []).append(transaction.to_dict())
+
+    return {
+        'total_groups': len(groups),
+        'duplicate_rows': sum(count - 1 for _, count in groups),
+        'groups': [
+            {'fingerprint': fingerprint, 'count': count, 'transactions': members.get(fingerprint, [])}
+            for fingerprint, count in selected
+        ],
+    }
+
+
+def backfill_fingerprints(batch_size=5000):
+    """Compute fingerprints for rows stored before the column existed. Returns the number updated."""
+    updated = 0
+    while True:
+        rows = db.session.query(
+            Transaction.id, Transaction.user_id, Transaction.transaction_date,
+            Transaction.amount, Transaction.description
+        ).filter(Transaction.fingerprint.is_(None)).limit(batch_size).all()
+        if not rows:
+            return updated
+
+        db.session.execute(
+            db.update(Transaction),
+            [{'id': row.id, 'fingerprint': transaction_fingerprint(
+                row.user_id, row.transaction_date, row.amount, row.description)} for row in rows]
+        )
+        db.session.commit()
+        updated += len(rows)
@@ -0,0 +1,179 @@
+from calendar import monthrange
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy.orm import load_only
+from werkzeug.datastructures import MultiDict
+from app.models import MAX_MINOR_UNITS, TRANSACTION_FIELDS, Transaction, from_minor_units, to_minor_units
+
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 500
+
+# Columns the list endpoints may sort on; 'id' is always appended as the tie-breaker
+SORTABLE_COLUMNS = {
+    'id': Transaction.id,
+    'transaction_date': Transaction.transaction_date,
+    'category': Transaction.category,
+    'subcategory': Transaction.subcategory,
+    'description': Transaction.description,
+    'amount': Transaction.amount,
+}
+
+PAGINATION_ARGS = ('page', 'per_page')
+
+
+def parse_date(value, name):
+    """Parse a YYYY-MM-DD query parameter, raising ValueError with the parameter name."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be a date in YYYY-MM-DD format")
+
+
+def parse_amount(value, name):
+    """Parse a decimal amount; NaN, infinities and amounts the øre column cannot hold are rejected."""
+    try:
+        amount = Decimal(str(value))
+    except (TypeError, InvalidOperation):
+        raise ValueError(f"'{name}' must be a number")
+    if not amount.is_finite():
+        raise ValueError(f"'{name}' must be a number")
+    # adjusted() first, so huge exponents never reach the conversion
+    if amount.adjusted() >= 10 or abs(to_minor_units(amount)) > MAX_MINOR_UNITS:
+        limit = from_minor_units(MAX_MINOR_UNITS)
+        raise ValueError(f"'{name}' must be between -{limit} and {limit}")
+    return amount
+
+
+def month_range(year, month):
+    """Return the first and last day of a month (sargable replacement for extract())."""
+    return date(year, month, 1), date(year, month, monthrange(year, month)[1])
+
+
+def parse_pagination(args):
+    """Return (page, per_page) from request args, clamped to sane bounds."""
+    page = args.get('page', 1, type=int)
+    per_page = args.get('per_page', DEFAULT_PER_PAGE, type=int)
+    if page < 1:
+        raise ValueError("'page' must be 1 or greater")
+    if per_page < 1:
+        raise ValueError("'per_page' must be 1 or greater")
+    return page, min(per_page, MAX_PER_PAGE)
+
+
+def wants_pagination(args):
+    return any(name in args for name in PAGINATION_ARGS)
+
+
+def parse_flag(args, name):
+    """True if a boolean query parameter is 1, true or yes (any case); absent means False."""
+    return args.get(name, 'false').lower() in ('1', 'true', 'yes')
+
+
+def parse_fields(args):
+    """
+    Fields selected with ?fields=transaction_date,category,amount, in to_dict() order.
+
+    'id' is always included. Returns every field when the parameter is absent.
+    """
+    requested = {part.strip() for part in (args.get('fields') or '').split(',') if part.strip()}
+    unknown = requested - set(TRANSACTION_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Available fields: {', '.join(TRANSACTION_FIELDS)}")
+    return [name for name in TRANSACTION_FIELDS if not requested or name in requested or name == 'id']
+
+
+def load_fields(query, fields):
+    """
+    Select only the columns behind the given to_dict() fields.
+
+    The other columns (the description TEXT, the fingerprint, ...) are
+    deferred, so they are never read from disk or hydrated.
+    """
+    return query.options(load_only(*(getattr(Transaction, name) for name in fields)))
+
+
+def filter_conditions(args):
+    """
+    Build the filter conditions shared by the list and bulk endpoints.
+
+    Supports start_date/end_date, min_amount/max_amount and repeated
+    category/subcategory parameters. Every filter is a plain range or IN
+    comparison on a column so the composite (user_id, ...) indexes apply.
+    """
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    min_amount = args.get('min_amount')
+    max_amount = args.get('max_amount')
+    categories = args.getlist('category')
+    subcategories = args.getlist('subcategory')
+
+    conditions = []
+    if start_date:
+        conditions.append(Transaction.transaction_date >= parse_date(start_date, 'start_date'))
+    if end_date:
+        conditions.append(Transaction.transaction_date <= parse_date(end_date, 'end_date'))
+    if min_amount not in (None, ''):
+        conditions.append(Transaction.amount >= parse_amount(min_amount, 'min_amount'))
+    if max_amount not in (None, ''):
+        conditions.append(Transaction.amount <= parse_amount(max_amount, 'max_amount'))
+    if categories:
+        conditions.append(Transaction.category.in_(categories))
+    if subcategories:
+        conditions.append(Transaction.subcategory.in_(subcategories))
+
+    return conditions
+
+
+def apply_filters(query, args):
+    """Apply filter_conditions() to a query."""
+    return query.filter(*filter_conditions(args))
+
+
+def args_from_json(filters):
+    """Wrap a JSON filter object so it reads like request args (lists become repeated values)."""
+    if not isinstance(filters, dict):
+        raise ValueError("'filter' must be an object")
+    return MultiDict({
+        key: [str(v) for v in value] if isinstance(value, list) else [str(value)]
+        for key, value in filters.items()
+        if value is not None
+    })
+
+
+def apply_sort(query, sort):
+    """
+    Order by a comma-separated list of columns, '-' prefix for descending.
+
+    Example: 'sort=-transaction_date,amount'. The primary key is appended in
+    the direction of the first key so pages never overlap or skip rows.
+    """
+    order_by = []
+    tie_breaker_desc = False
+    seen = set()
+
+    for index, key in enumerate(part.strip() for part in (sort or '').split(',') if part.strip()):
+        descending = key.startswith('-')
+        name = key.lstrip('-')
+        if name not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort by '{name}'. Sortable columns: {', '.join(sorted(SORTABLE_COLUMNS))}")
+        if name in seen:
+            continue
+        seen.add(name)
+        if index == 0:
+            tie_breaker_desc = descending
+        column = SORTABLE_COLUMNS[name]
+        order_by.append(column.desc() if descending else column.asc())
+
+    if 'id' not in seen:
+        order_by.append(Transaction.id.desc() if tie_breaker_desc else Transaction.id.asc())
+
+    return query.order_by(*order_by)
+
+
+def paginate(query, page, per_page):
+    """Return (rows, total) for one page of the query."""
+    total = query.order_by(None).count()
+    rows = query.limit(per_page).offset((page - 1) * per_page).all()
+    return rows, total
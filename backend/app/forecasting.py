@@ -0,0 +1,291 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+
+MIN_TRANSACTIONS = 24
+MIN_MONTHS = 12
+CONFIDENCE_MULTIPLIER = 1.28  # 80% confidence interval
+
+
+class InsufficientData(ValueError):
+    """Not enough history to fit the model; 'title' is the API error string."""
+
+    def __init__(self, title, message):
+        super().__init__(message)
+        self.title = title
+
+    def __reduce__(self):
+        # Raised inside forecasting worker processes, so it must survive pickling
+        return type(self), (self.title, str(self))
+
+
+def fit_holt_winters(ts):
+    """Fit the projections' Holt-Winters model to a monthly series (needs two full years)."""
+    # seasonal_periods=12 for yearly seasonality
+    model = ExponentialSmoothing(
+        ts,
+        seasonal_periods=12,
+        trend='add',
+        seasonal='add',
+        initialization_method='estimated'
+    )
+    return model.fit()
+
+
+def holt_winters_projection(month_starts, monthly_amounts, transaction_count, now=None):
+    """
+    Fit Holt-Winters to monthly totals and project the next 12 months.
+
+    Takes plain arrays (month start dates and totals) so it can run in a worker
+    process. If the last month is the current, incomplete one, it is left out
+    of training and projected as a full month instead.
+    """
+    if transaction_count < MIN_TRANSACTIONS:
+        raise InsufficientData(
+            "Insufficient data",
+            f"Need at least {MIN_TRANSACTIONS} transactions. Found {transaction_count} transactions.")
+
+    df = pd.DataFrame({'date': pd.to_datetime(month_starts), 'amount': monthly_amounts})
+
+    # Check if we have enough monthly data
+    if len(df) < MIN_MONTHS:
+        raise InsufficientData(
+            "Insufficient monthly data",
+            f"Need at least {MIN_MONTHS} months of data. Found {len(df)} months.")
+
+    # Create time series and ensure it's float type
+    ts = df.set_index('date')['amount'].astype(float)
+
+    # Determine if current month is incomplete
+    now = now or datetime.now()
+    current_month_start = pd.Timestamp(
+        year=now.year, month=now.month, day=1)
+    last_data_month = ts.index[-1]
+
+    # Check if the last data point is the current month (incomplete)
+    is_current_month_incomplete = (
+        last_data_month.year == now.year
+        and last_data_month.month == now.month
+    )
+
+    # If current month is incomplete, exclude it from training data
+    if is_current_month_incomplete:
+        ts_for_training = ts.iloc[:-1]  # Exclude last (incomplete) month
+        # Store the partial amount
+        current_month_actual = float(ts.iloc[-1])
+    else:
+        ts_for_training = ts
+        current_month_actual = None
+
+    fitted_model = fit_holt_winters(ts_for_training)
+
+    # Forecast ahead
+    # If current month is incomplete, we need 13 forecasts (current month + 12 future)
+    # Otherwise, we need 12 forecasts
+    forecast_steps = 13 if is_current_month_incomplete else 12
+    forecast = fitted_model.forecast(steps=forecast_steps)
+
+    # Calculate confidence intervals using residuals from training data
+    residuals = fitted_model.resid
+    std_error = np.std(residuals)
+
+    # Prepare response
+    result = {
+        'historical': [],
+        'projected': [],
+        'current_month_actual': None  # Actual spending so far this month
+    }
+
+    # Historical data - only include complete months (training data)
+    for date, value in ts_for_training.items():
+        result['historical'].append({
+            'date': date.strftime('%Y-%m'),
+            'value': float(value)
+        })
+
+    # Projected data with confidence intervals
+    if is_current_month_incomplete:
+        # First forecast is for current month (full month projection)
+        # Store the actual partial spending
+        result['current_month_actual'] = current_month_actual
+
+        # Start projections from current month
+        forecast_dates = pd.date_range(
+            start=current_month_start, periods=13, freq='MS')
+    else:
+        # Start projections from next month
+        forecast_dates = pd.date_range(
+            start=ts.index[-1] + pd.DateOffset(months=1), periods=12, freq='MS')
+
+    for date, value in zip(forecast_dates, forecast):
+        result['projected'].append({
+            'date': date.strftime('%Y-%m'),
+            'value': float(value),
+            'lower': float(max(0, value - CONFIDENCE_MULTIPLIER * std_error)),
+            'upper': float(value + CONFIDENCE_MULTIPLIER * std_error)
+        })
+
+    return result
+
+
+RECONCILIATION_METHODS = ('mint', 'bottom_up')
+SEASON = 12
+# The first season initializes the seasonal state and the second is the first one-step-ahead fit
+MIN_TRAINING_MONTHS = 2 * SEASON
+# Smoothing parameter grid searched for every series at once (level, trend, season)
+ALPHAS = np.array([0.1, 0.3, 0.5, 0.7, 0.9])
+BETAS = np.array([0.01, 0.05, 0.1, 0.2])
+GAMMAS = np.array([0.05, 0.1, 0.2, 0.4])
+
+
+def fit_holt_winters_batch(series, steps):
+    """
+    Additive Holt-Winters for many monthly series in one vectorized pass.
+
+    series is an (n, T) array with T >= MIN_TRAINING_MONTHS. Every series is
+    run under every (alpha, beta, gamma) on the grid at once, each keeps the
+    parameters with the lowest one-step-ahead squared error, and is forecast
+    'steps' months ahead. The first season initializes the seasonal state, so
+    its "residuals" are close to zero by construction; it is left out of the
+    error and of the returned residuals.
+    Returns (forecasts (n, steps), one-step-ahead residuals (n, T - SEASON)).
+    """
+    series = np.asarray(series, dtype=float)
+    n, length = series.shape
+    if length < MIN_TRAINING_MONTHS:
+        raise ValueError(f"Need at least {MIN_TRAINING_MONTHS} months per series, got {length}")
+    alpha, beta, gamma = (p.reshape(-1, 1) for p in np.meshgrid(ALPHAS, BETAS, GAMMAS, indexing='ij'))
+
+    # Initial state from the first two seasons, shared by every grid point: (grid, n[, SEASON])
+    first_season = series[:, :SEASON].mean(axis=1)
+    trend = (series[:, SEASON:2 * SEASON].mean(axis=1) - first_season) / SEASON
+    grid = (len(alpha), n)
+    level = np.broadcast_to(first_season, grid).copy()
+    trend = np.broadcast_to(trend, grid).copy()
+    seasonal = np.broadcast_to(series[:, :SEASON] - first_season[:, None], grid + (SEASON,)).copy()
+
+    residuals = np.empty(grid + (length,))
+    for t in range(length):
+        observed = series[:, t]
+        season_t = seasonal[..., t % SEASON]
+        residuals[..., t] = observed - (level + trend + season_t)
+        new_level = alpha * (observed - season_t) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        seasonal[..., t % SEASON] = gamma * (observed - new_level) + (1 - gamma) * season_t
+        level = new_level
+
+    residuals = residuals[..., SEASON:]
+    best = np.square(residuals).sum(axis=2).argmin(axis=0)
+    rows = np.arange(n)
+    level, trend = level[best, rows], trend[best, rows]
+    seasonal, residuals = seasonal[best, rows], residuals[best, rows]
+
+    horizon = np.arange(1, steps + 1)
+    season_positions = (length + horizon - 1) % SEASON
+    forecasts = level[:, None] + trend[:, None] * horizon + seasonal[:, season_positions]
+    return forecasts, residuals
+
+
+def _shrunk_covariance(residuals):
+    """Residual covariance shrunk towards its diagonal (Schäfer-Strimmer intensity), as used by MinT."""
+    length = residuals.shape[1]
+    covariance = residuals @ residuals.T / length
+    variances = np.maximum(np.diag(covariance), 1e-9 * max(1.0, float(np.diag(covariance).mean())))
+    scaled = residuals / np.sqrt(variances)[:, None]
+    correlation = scaled @ scaled.T / length
+    correlation_variance = (np.square(scaled) @ np.square(scaled).T / length - np.square(correlation)) / (length - 1)
+    off_diagonal = ~np.eye(len(variances), dtype=bool)
+    denominator = np.square(correlation)[off_diagonal].sum()
+    shrinkage = 1.0
+    if denominator > 0:
+        shrinkage = min(1.0, max(0.0, correlation_variance[off_diagonal].sum() / denominator))
+    return shrinkage * np.diag(variances) + (1 - shrinkage) * covariance + 1e-9 * np.eye(len(variances))
+
+
+def reconcile(base_forecasts, residuals, method='mint'):
+    """
+    Make forecasts coherent: row 0 (the category) equals the sum of the other rows (its subcategories).
+
+    'bottom_up' sums the subcategory forecasts. 'mint' combines all base
+    forecasts by minimum trace (Wickramasuriya et al.) weighted by the shrunk
+    residual covariance, so the parent's own model informs its children too.
+    """
+    if method not in RECONCILIATION_METHODS:
+        raise ValueError(f"'reconciliation' must be one of: {', '.join(RECONCILIATION_METHODS)}")
+    children = base_forecasts.shape[0] - 1
+    summing = np.vstack([np.ones((1, children)), np.eye(children)])
+    if method == 'bottom_up':
+        return summing @ base_forecasts[1:]
+
+    weights = np.linalg.inv(_shrunk_covariance(residuals))
+    projection = np.linalg.solve(summing.T @ weights @ summing, summing.T @ weights)
+    return summing @ projection @ base_forecasts
+
+
+def _node(name, dates, history, forecast_dates, forecast, std_error, current_month_actual):
+    return {
+        'name': name,
+        'historical': [{'date': d.strftime('%Y-%m'), 'value': float(v)} for d, v in zip(dates, history)],
+        'projected': [{
+            'date': d.strftime('%Y-%m'),
+            'value': float(v),
+            'lower': float(max(0, v - CONFIDENCE_MULTIPLIER * std_error)),
+            'upper': float(v + CONFIDENCE_MULTIPLIER * std_error)
+        } for d, v in zip(forecast_dates, forecast)],
+        'current_month_actual': current_month_actual,
+    }
+
+
+def hierarchical_projection(category, month_starts, subcategories, matrix, transaction_count,
+                            method='mint', now=None):
+    """
+    Project a category and all its subcategories for the next 12 months, coherently.
+
+    matrix holds one row of monthly totals per subcategory (see
+    analytics.monthly_hierarchy). The category and subcategory series are fitted
+    together with fit_holt_winters_batch() and reconciled so the subcategory
+    projections sum to the category's. The incomplete-month handling is that
+    of holt_winters_projection(), but the batch fit needs two full seasons of
+    complete months (MIN_TRAINING_MONTHS): with one, the fitted seasonal pattern
+    is the data itself and there are no residuals to size the intervals from.
+    """
+    if method not in RECONCILIATION_METHODS:
+        raise ValueError(f"'reconciliation' must be one of: {', '.join(RECONCILIATION_METHODS)}")
+    if transaction_count < MIN_TRANSACTIONS:
+        raise InsufficientData(
+            "Insufficient data",
+            f"Need at least {MIN_TRANSACTIONS} transactions. Found {transaction_count} transactions.")
+
+    matrix = np.asarray(matrix, dtype=float)
+    series = np.vstack([matrix.sum(axis=0, keepdims=True), matrix])
+    months_with_data = int(np.count_nonzero(series[0]))
+    if months_with_data < MIN_MONTHS:
+        raise InsufficientData(
+            "Insufficient monthly data",
+            f"Need at least {MIN_MONTHS} months of data. Found {months_with_data} months.")
+
+    dates = pd.to_datetime(month_starts)
+    now = now or datetime.now()
+    is_current_month_incomplete = dates[-1].year == now.year and dates[-1].month == now.month
+    current_month_actual = [None] * len(series)
+    if is_current_month_incomplete:
+        current_month_actual = series[:, -1].tolist()
+        series, dates = series[:, :-1], dates[:-1]
+    if series.shape[1] < MIN_TRAINING_MONTHS:
+        raise InsufficientData(
+            "Insufficient monthly data",
+            f"Need at least {MIN_TRAINING_MONTHS} complete months of data. Found {series.shape[1]} months.")
+
+    steps = 13 if is_current_month_incomplete else 12
+    base, residuals = fit_holt_winters_batch(series, steps)
+    coherent = reconcile(base, residuals, method)
+    # One-step-ahead errors after the initialization season (see fit_holt_winters_batch)
+    std_errors = residuals.std(axis=1)
+    forecast_dates = pd.date_range(start=dates[-1] + pd.DateOffset(months=1), periods=steps, freq='MS')
+
+    names = [category] + list(subcategories)
+    nodes = [_node(name, dates, series[i], forecast_dates, coherent[i], std_errors[i], current_month_actual[i])
+             for i, name in enumerate(names)]
+    return dict(nodes[0], reconciliation=method, subcategories=nodes[1:])
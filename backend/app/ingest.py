@@ -0,0 +1,290 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask import current_app
+from app import db
+from app.changes import next_change_seq
+from app.models import IngestBatch, Transaction, transaction_fingerprint
+from app.response_cache import invalidate_tags, user_tag
+from app.sqlite_file import SQLiteFile
+
+
+logger = logging.getLogger(__name__)
+
+PENDING, FLUSHING, COMMITTED, FAILED = 'pending', 'flushing', 'committed', 'failed'
+MAX_WAIT_SECONDS = 30
+# How long IngestBatch rows are kept for recovering interrupted flushes
+BATCH_RETENTION = timedelta(days=1)
+
+
+class IngestQueue(SQLiteFile):
+    """
+    Durable queue of validated transactions waiting to be inserted, in an on-disk SQLite file.
+
+    Every worker process on the host shares the file. Claiming a batch is one
+    IMMEDIATE transaction, so two flushers never take the same entries.
+    synchronous=FULL means an acknowledged entry survives a crash or power loss.
+    """
+
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY AUTOINCREMENT, token TEXT NOT NULL, "
+        "user_id INTEGER NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL, batch TEXT, "
+        "attempts INTEGER NOT NULL DEFAULT 0, transaction_id INTEGER, error TEXT, updated REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS idx_entries_status ON entries(status, id)",
+        "CREATE INDEX IF NOT EXISTS idx_entries_token ON entries(token)",
+        "CREATE INDEX IF NOT EXISTS idx_entries_batch ON entries(batch)",
+    ]
+
+    SYNCHRONOUS = 'FULL'
+
+    def enqueue(self, user_id, rows, now):
+        """Queue the rows (dicts of JSON-serializable values) under one new token, which is returned."""
+        token = uuid.uuid4().hex
+        with self._transaction() as connection:
+            connection.executemany(
+                'INSERT INTO entries (token, user_id, payload, status, updated) VALUES (?, ?, ?, ?, ?)',
+                [(token, user_id, json.dumps(row), PENDING, now) for row in rows])
+        return token
+
+    def claim(self, limit, now):
+        """Take up to 'limit' pending entries, oldest first. Returns (batch id, [(entry id, user id, row)])."""
+        batch = uuid.uuid4().hex
+        with self._transaction() as connection:
+            entries = connection.execute(
+                'SELECT id, user_id, payload FROM entries WHERE status = ? ORDER BY id LIMIT ?',
+                (PENDING, limit)).fetchall()
+            connection.executemany(
+                'UPDATE entries SET status = ?, batch = ?, updated = ? WHERE id = ?',
+                [(FLUSHING, batch, now, entry_id) for entry_id, _, _ in entries])
+        return batch, [(entry_id, user_id, json.loads(payload)) for entry_id, user_id, payload in entries]
+
+    def rebatch(self, entry_ids, now):
+        """Move claimed entries to a new batch of their own, so they commit or fail apart from the rest."""
+        batch = uuid.uuid4().hex
+        with self._transaction() as connection:
+            connection.executemany('UPDATE entries SET batch = ?, updated = ? WHERE id = ?',
+                                   [(batch, now, entry_id) for entry_id in entry_ids])
+        return batch
+
+    def complete(self, batch, entry_ids, transaction_ids, now):
+        """Mark a batch committed; transaction_ids may be None when they are no longer known."""
+        with self._transaction() as connection:
+            if transaction_ids is None:
+                connection.execute('UPDATE entries SET status = ?, updated = ? WHERE batch = ?',
+                                   (COMMITTED, now, batch))
+            else:
+                connection.executemany(
+                    'UPDATE entries SET status = ?, transaction_id = ?, updated = ? WHERE id = ?',
+                    [(COMMITTED, transaction_id, now, entry_id)
+                     for entry_id, transaction_id in zip(entry_ids, transaction_ids)])
+
+    def release(self, batch, error, max_attempts, now):
+        """Put a batch that failed to flush back in the queue, or fail entries out of attempts."""
+        with self._transaction() as connection:
+            connection.execute(
+                'UPDATE entries SET attempts = attempts + 1, error = ?, batch = NULL, updated = ?, '
+                'status = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END WHERE batch = ?',
+                (error, now, max_attempts, FAILED, PENDING, batch))
+
+    def stale_batches(self, before):
+        """Batches claimed before 'before' and never completed or released (their flusher died)."""
+        return [batch for (batch,) in self._connection().execute(
+            'SELECT DISTINCT batch FROM entries WHERE status = ? AND updated < ?', (FLUSHING, before))]
+
+    def prune(self, before):
+        """Forget committed and failed entries last updated before 'before'."""
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM entries WHERE status IN (?, ?) AND updated < ?',
+                               (COMMITTED, FAILED, before))
+
+    def status(self, token, user_id):
+        """The token's status ('pending' until every entry is committed or one failed), or None if unknown."""
+        rows = self._connection().execute(
+            'SELECT status, transaction_id, error FROM entries WHERE token = ? AND user_id = ? ORDER BY id',
+            (token, user_id)).fetchall()
+        if not rows:
+            return None
+        statuses = {status for status, _, _ in rows}
+        if FAILED in statuses:
+            error = next(error for status, _, error in rows if status == FAILED)
+            return {'token': token, 'status': FAILED, 'error': error}
+        if statuses == {COMMITTED}:
+            return {'token': token, 'status': COMMITTED, 'ids': [transaction_id for _, transaction_id, _ in rows]}
+        return {'token': token, 'status': PENDING, 'queued': len(rows)}
+
+    def stats(self):
+        counts = dict(self._connection().execute('SELECT status, COUNT(*) FROM entries GROUP BY status'))
+        return {status: counts.get(status, 0) for status in (PENDING, FLUSHING, COMMITTED, FAILED)}
+
+
+def init_ingest(app):
+    """Set up the write-behind queue if INGEST_WRITE_BEHIND is on; app.extensions['ingest_queue'] is None otherwise."""
+    if not app.config.get('INGEST_WRITE_BEHIND'):
+        app.extensions['ingest_queue'] = None
+        return
+    path = app.config.get('INGEST_QUEUE_PATH') or os.path.join(app.instance_path, 'ingest_queue.sqlite3')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    app.extensions['ingest_queue'] = IngestQueue(path)
+
+
+def ingest_queue():
+    return current_app.extensions.get('ingest_queue')
+
+
+def enqueue_transactions(user_id, rows):
+    """Queue validated rows (as from the import parser) for insertion. Returns the acknowledgement token."""
+    payload = [{
+        'transaction_date': row['transaction_date'].isoformat(),
+        'amount': str(row['amount']),
+        'category': row['category'],
+        'subcategory': row['subcategory'],
+        'description': row['description'],
+    } for row in rows]
+    return ingest_queue().enqueue(user_id, payload, time.time())
+
+
+def ingest_status(token, user_id, wait=0):
+    """The token's status, polling for up to 'wait' seconds while it is still pending."""
+    queue = ingest_queue()
+    deadline = time.monotonic() + min(max(wait, 0), MAX_WAIT_SECONDS)
+    while True:
+        status = queue.status(token, user_id)
+        if status is None or status['status'] != PENDING or time.monotonic() >= deadline:
+            return status
+        time.sleep(0.02)
+
+
+def _insert_batch(batch, entries):
+    """Insert the batch's rows in one multi-row INSERT, with change sequences and fingerprints. Returns their ids."""
+    seqs = {user_id: next_change_seq(user_id) for user_id in sorted({user_id for _, user_id, _ in entries})}
+    rows = []
+    for _, user_id, payload in entries:
+        row = dict(payload, user_id=user_id, change_seq=seqs[user_id],
+                   transaction_date=date.fromisoformat(payload['transaction_date']),
+                   amount=Decimal(payload['amount']))
+        row['fingerprint'] = transaction_fingerprint(
+            user_id, row['transaction_date'], row['amount'], row['description'])
+        rows.append(row)
+
+    ids = db.session.scalars(
+        db.insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True), rows).all()
+    db.session.add(IngestBatch(id=batch))
+    db.session.execute(db.delete(IngestBatch).where(IngestBatch.committed_at < datetime.utcnow() - BATCH_RETENTION))
+    db.session.commit()
+    return ids
+
+
+def _after_commit(user_ids):
+    """What the after_request hooks do for a synchronous write, for users whose rows were just flushed."""
+    for user_id in user_ids:
+        current_app.extensions['analytics_cache'].invalidate(user_id)
+    invalidate_tags(*(user_tag(user_id) for user_id in user_ids))
+
+
+def recover_stale_batches(now=None):
+    """Settle batches whose flusher died: committed if their IngestBatch row exists, otherwise queued again."""
+    queue = ingest_queue()
+    now = now or time.time()
+    max_attempts = current_app.config.get('INGEST_MAX_ATTEMPTS', 5)
+    for batch in queue.stale_batches(now - current_app.config.get('INGEST_STALE_SECONDS', 60)):
+        if db.session.get(IngestBatch, batch) is not None:
+            queue.complete(batch, None, None, now)
+        else:
+            queue.release(batch, 'Flush was interrupted', max_attempts, now)
+
+
+def _flush_batch(queue, batch, entries, max_attempts):
+    """
+    Insert a claimed batch. Returns (rows committed, first error or None).
+
+    If the multi-row INSERT fails, the batch is split in half, each half under
+    its own batch id, and each half is tried on its own, down to single
+    entries. Only the entries that fail alone go back in the queue, so one bad
+    row never fails the rest of the batch.
+    """
+    try:
+        ids = _insert_batch(batch, entries)
+    except Exception as e:
+        db.session.rollback()
+        if len(entries) == 1:
+            logger.error(f"Error flushing ingest entry {entries[0][0]}: {str(e)}")
+            queue.release(batch, str(e), max_attempts, time.time())
+            return 0, e
+        half = len(entries) // 2
+        committed, error = 0, None
+        for part in (entries[:half], entries[half:]):
+            part_batch = queue.rebatch([entry_id for entry_id, _, _ in part], time.time())
+            part_committed, part_error = _flush_batch(queue, part_batch, part, max_attempts)
+            committed += part_committed
+            error = error or part_error
+        return committed, error
+
+    queue.complete(batch, [entry_id for entry_id, _, _ in entries], ids, time.time())
+    _after_commit(sorted({user_id for _, user_id, _ in entries}))
+    return len(ids), None
+
+
+def flush_ingest_queue(now=None):
+    """
+    Insert up to INGEST_BATCH_ROWS queued transactions, in one database transaction when they all insert.
+
+    Returns the number of rows committed. Entries that cannot be inserted go
+    back in the queue, to be retried up to INGEST_MAX_ATTEMPTS times; if no
+    row could be committed at all, the error is raised.
+    """
+    queue = ingest_queue()
+    now = now or time.time()
+    recover_stale_batches(now)
+    batch, entries = queue.claim(current_app.config.get('INGEST_BATCH_ROWS', 500), now)
+    if not entries:
+        return 0
+
+    committed, error = _flush_batch(queue, batch, entries, current_app.config.get('INGEST_MAX_ATTEMPTS', 5))
+    if not committed:
+        raise error
+    queue.prune(now - current_app.config.get('INGEST_RETENTION_SECONDS', 3600))
+    return committed
+
+
+def ingest_stats():
+    queue = ingest_queue()
+    return None if queue is None else queue.stats()
+
+
+def start_ingest_flusher(app):
+    """
+    Flush the write-behind queue every INGEST_FLUSH_INTERVAL_MS in a daemon thread.
+
+    Does nothing when write-behind ingestion is off. A full batch is followed
+    straight away by the next one, so a backlog drains without waiting; after a
+    failure the flusher backs off (1s, 2s, ... up to 30s). Every server worker
+    may start one; claims keep them from taking the same rows.
+    """
+    if app.extensions.get('ingest_queue') is None:
+        return None
+    interval = app.config.get('INGEST_FLUSH_INTERVAL_MS', 50) / 1000
+    batch_rows = app.config.get('INGEST_BATCH_ROWS', 500)
+
+    def run():
+        failures = 0
+        while True:
+            try:
+                with app.app_context():
+                    flushed = flush_ingest_queue()
+                failures = 0
+            except Exception as e:
+                logger.error(f"Error in ingest flusher: {str(e)}")
+                time.sleep(min(2 ** failures, 30))
+                failures += 1
+                continue
+            if flushed < batch_rows:
+                time.sleep(interval)
+
+    thread = threading.Thread(target=run, name='ingest-flusher', daemon=True)
+    thread.start()
+    return thread
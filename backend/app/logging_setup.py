@@ -0,0 +1,151 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+
+
+# Attributes every LogRecord has; anything else was passed with extra={...} and is logged as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_lock = threading.Lock()
+_state = {'handler': None, 'listener': None}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request fields, extras and any traceback."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the request method, path and user id while still on the request thread."""
+
+    def filter(self, record):
+        if has_request_context():
+            record.method = request.method
+            record.path = request.path
+            user = g.get('current_user')
+            if user is not None:
+                record.user_id = user.id
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keep only a random fraction ('rate') of DEBUG records; other levels always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full instead of blocking or raising."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Merge the arguments and render any traceback now; the JSON itself is built on the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StderrHandler(logging.StreamHandler):
+    """Writes to whatever sys.stderr is at emit time (it may be replaced, e.g. by test capture)."""
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, _value):
+        pass
+
+
+def parse_levels(spec):
+    """'app.routes=DEBUG,sqlalchemy.engine=WARNING' -> {'app.routes': 'DEBUG', 'sqlalchemy.engine': 'WARNING'}."""
+    levels = {}
+    for item in (spec or '').split(','):
+        if item.strip():
+            name, _, level = item.partition('=')
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(app):
+    """
+    Route all logging through a queue to a background thread that writes JSON lines to stderr.
+
+    The request thread only formats the message arguments and enqueues the
+    record. When the queue is full, records are dropped and counted rather than
+    making the request wait. LOG_LEVEL sets the root level and LOG_LEVELS
+    overrides individual loggers. LOG_DEBUG_SAMPLE_RATE keeps that fraction of
+    DEBUG records. The queue and listener are set up once per process.
+    """
+    root = logging.getLogger()
+    with _lock:
+        if _state['handler'] is None:
+            log_queue = queue.Queue(maxsize=app.config.get('LOG_QUEUE_SIZE', 10000))
+            handler = DroppingQueueHandler(log_queue)
+            handler.addFilter(RequestContextFilter())
+            writer = StderrHandler()
+            writer.setFormatter(JsonFormatter())
+            listener = QueueListener(log_queue, writer, respect_handler_level=True)
+            listener.start()
+            atexit.register(listener.stop)
+            root.addHandler(handler)
+            _state.update(handler=handler, listener=listener)
+
+    handler = _state['handler']
+    for existing in list(handler.filters):
+        if isinstance(existing, DebugSamplingFilter):
+            handler.removeFilter(existing)
+    handler.addFilter(DebugSamplingFilter(app.config.get('LOG_DEBUG_SAMPLE_RATE', 1.0)))
+
+    root.setLevel(app.config.get('LOG_LEVEL', 'INFO'))
+    levels = app.config.get('LOG_LEVELS') or {}
+    if isinstance(levels, str):
+        levels = parse_levels(levels)
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+
+def logging_stats():
+    handler = _state['handler']
+    if handler is None:
+        return None
+    return {'queued': handler.queue.qsize(), 'dropped': handler.dropped}
@@ -1,6 +1,66 @@
+import hashlib
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
 from app import db
 from passlib.hash import scrypt
-from sqlalchemy import extract  # added import
+from sqlalchemy import DDL, event, extract, literal_column  # added import
+from sqlalchemy.types import BigInteger, TypeDecorator
+
+
+def description_tsvector(description):
+    """tsvector expression used by both the GIN index and search queries."""
+    # The planner only uses the index when the query repeats this exact expression
+    return db.func.to_tsvector(
+        literal_column("'simple'::regconfig"), db.func.coalesce(description, ''))
+
+
+def normalize_description(description):
+    """Lowercase and collapse whitespace so cosmetic differences between bank exports don't matter."""
+    return ' '.join((description or '').lower().split())
+
+
+# Largest amount magnitude in øre: what NUMERIC(10, 2) holds (the backup schema), well inside BIGINT
+MAX_MINOR_UNITS = 10 ** 10 - 1
+
+
+def to_minor_units(amount):
+    """Decimal kroner (Decimal, str, int or float) to an integer count of øre, rounding half away from zero."""
+    return int((Decimal(str(amount)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def from_minor_units(minor):
+    """Integer øre to Decimal kroner with exactly two decimals."""
+    return Decimal(int(minor)).scaleb(-2)
+
+
+class MinorUnits(TypeDecorator):
+    """
+    Money stored as a BIGINT count of øre and exposed to Python as Decimal kroner.
+
+    Comparisons and inserts take Decimal values as before; the database only
+    ever sees integers, so SUM and range scans use native integer arithmetic.
+    Wrap a column in type_coerce(column, BigInteger) to read raw øre.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, _dialect):
+        return None if value is None else to_minor_units(value)
+
+    def process_result_value(self, value, _dialect):
+        return None if value is None else from_minor_units(value)
+
+
+def transaction_fingerprint(user_id, transaction_date, amount, description):
+    """Duplicate-detection key over (user_id, date, amount, normalized description)."""
+    if isinstance(transaction_date, str):
+        date_key = transaction_date
+    else:
+        date_key = transaction_date.isoformat()
+    # Rounded exactly as the amount is stored, so a row's key matches before and after the round trip
+    amount_key = from_minor_units(to_minor_units(amount))
+    key = f"{user_id}|{date_key}|{amount_key}|{normalize_description(description)}"
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
 
 
 class Transaction(db.Model):
@@ -11,23 +71,44 @@ class Transaction(db.Model):
     category = db.Column(db.String(255), nullable=False)
     subcategory = db.Column(db.String(255))
     description = db.Column(db.Text)
-    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    amount = db.Column(MinorUnits, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey(
         'users.id', ondelete='CASCADE'), nullable=False)
+    # See transaction_fingerprint(); kept current on every write path
+    fingerprint = db.Column(db.String(32))
+    # The owner's change sequence at this row's last insert/update (see app/changes.py)
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+    # Bumped by every user-visible change; clients send it back for optimistic concurrency (If-Match)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
     # Relationship to User
     user = db.relationship('User', backref='transactions')
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "transaction_date": self.transaction_date.isoformat(),
-            "category": self.category,
-            "subcategory": self.subcategory,
-            "description": self.description,
-            "amount": float(self.amount),
-            "user_id": self.user_id,
-        }
+    __table_args__ = (
+        # Composite indexes backing the /transactions filters and sorts (see app/filters.py)
+        db.Index('idx_transactions_user_date', 'user_id', 'transaction_date', 'id'),
+        db.Index('idx_transactions_user_category_date', 'user_id', 'category', 'transaction_date'),
+        db.Index('idx_transactions_user_subcategory', 'user_id', 'subcategory'),
+        db.Index('idx_transactions_user_amount', 'user_id', 'amount'),
+        # Equality-only lookups for duplicate detection; a plain btree on SQLite
+        db.Index('idx_transactions_fingerprint', 'fingerprint', postgresql_using='hash'),
+        # Delta sync: rows changed since a given sequence number
+        db.Index('idx_transactions_user_change_seq', 'user_id', 'change_seq'),
+        # PostgreSQL only: full-text and trigram indexes for /transactions/search
+        db.Index('idx_transactions_description_fts', description_tsvector(description),
+                 postgresql_using='gin').ddl_if(dialect='postgresql'),
+        db.Index('idx_transactions_description_trgm', description,
+                 postgresql_using='gin',
+                 postgresql_ops={'description': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
+
+    def to_dict(self, fields=None):
+        """Serialize the transaction; with 'fields', only those keys (and only their columns are read)."""
+        return {name: serialize(self) for name, serialize in TRANSACTION_FIELDS.items()
+                if fields is None or name in fields}
+
+    def compute_fingerprint(self):
+        return transaction_fingerprint(self.user_id, self.transaction_date, self.amount, self.description)
 
     @classmethod
     def get_by_month_and_category(cls, year, month, category):
@@ -38,6 +119,161 @@ class Transaction(db.Model):
         ).all()
 
 
+# Transaction.to_dict() keys and how each is serialized; also the fields a client may select with ?fields=
+TRANSACTION_FIELDS = {
+    'id': lambda t: t.id,
+    'transaction_date': lambda t: t.transaction_date.isoformat(),
+    'category': lambda t: t.category,
+    'subcategory': lambda t: t.subcategory,
+    'description': lambda t: t.description,
+    'amount': lambda t: float(t.amount),
+    'user_id': lambda t: t.user_id,
+    'version': lambda t: t.version,
+}
+
+
+@event.listens_for(Transaction, 'before_insert')
+@event.listens_for(Transaction, 'before_update')
+def _set_fingerprint(_mapper, _connection, target):
+    target.fingerprint = target.compute_fingerprint()
+
+
+# SQLite (tests) has no tsvector/pg_trgm, so search falls back to an FTS5
+# table kept in sync with transactions.description by triggers.
+_SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts "
+    "USING fts5(description, content='transactions', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN "
+    "INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF description ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description); END",
+]
+
+event.listen(Transaction.__table__, 'before_create',
+             DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql'))
+for _statement in _SQLITE_FTS_DDL:
+    event.listen(Transaction.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+event.listen(Transaction.__table__, 'before_drop',
+             DDL('DROP TABLE IF EXISTS transactions_fts').execute_if(dialect='sqlite'))
+
+
+class TransactionTombstone(db.Model):
+    """Marker left by a deleted transaction so delta-sync clients can drop it."""
+    __tablename__ = 'transaction_tombstones'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey(
+        'users.id', ondelete='CASCADE'), nullable=False)
+    transaction_id = db.Column(db.Integer, nullable=False)
+    change_seq = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_transaction_tombstones_user_change_seq', 'user_id', 'change_seq'),
+    )
+
+
+class Projection(db.Model):
+    """A precomputed GET /api/projections/<category> response (see app/precompute.py)."""
+    __tablename__ = 'projections'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey(
+        'users.id', ondelete='CASCADE'), nullable=False)
+    category = db.Column(db.String(255), nullable=False)
+    # The user's change_seq and the month ('YYYY-MM') the result was computed from
+    data_version = db.Column(db.BigInteger, nullable=False)
+    period = db.Column(db.String(7), nullable=False)
+    # Response status and body (400 bodies are stored too, for categories without enough data)
+    status = db.Column(db.SmallInteger, nullable=False)
+    result = db.Column(db.JSON, nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'category', name='uq_projections_user_category'),
+    )
+
+    def is_fresh(self, change_seq, period):
+        return self.data_version == change_seq and self.period == period
+
+    def record(self, change_seq, period, status, result):
+        """Store a response computed from the user's data at change_seq during 'period'."""
+        self.data_version = change_seq
+        self.period = period
+        self.status = status
+        self.result = result
+        self.computed_at = datetime.utcnow()
+
+
+class ForecastBacktest(db.Model):
+    """The user's precomputed default GET /api/backtest response (see app/backtest.py)."""
+    __tablename__ = 'forecast_backtests'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey(
+        'users.id', ondelete='CASCADE'), nullable=False, unique=True)
+    data_version = db.Column(db.BigInteger, nullable=False)
+    period = db.Column(db.String(7), nullable=False)
+    result = db.Column(db.JSON, nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def is_fresh(self, change_seq, period):
+        return self.data_version == change_seq and self.period == period
+
+
+class IngestBatch(db.Model):
+    """
+    A write-behind batch committed to transactions (see app/ingest.py).
+
+    Written in the same transaction as the batch's rows, so a flusher that died
+    before marking its queue entries can tell whether the insert went through.
+    """
+    __tablename__ = 'ingest_batches'
+
+    id = db.Column(db.String(32), primary_key=True)
+    committed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+class CategoryRule(db.Model):
+    """User-defined rule mapping description/amount/date patterns to a category."""
+    __tablename__ = 'category_rules'
+
+    MATCH_TYPES = ('contains', 'regex')
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey(
+        'users.id', ondelete='CASCADE'), nullable=False, index=True)
+    # Lower priority wins when several rules match
+    priority = db.Column(db.Integer, nullable=False, default=100)
+    pattern = db.Column(db.String(255))
+    match_type = db.Column(db.String(16), nullable=False, default='contains')
+    min_amount = db.Column(db.Numeric(10, 2))
+    max_amount = db.Column(db.Numeric(10, 2))
+    start_date = db.Column(db.Date)
+    end_date = db.Column(db.Date)
+    category = db.Column(db.String(255), nullable=False)
+    subcategory = db.Column(db.String(255))
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "priority": self.priority,
+            "pattern": self.pattern,
+            "match_type": self.match_type,
+            "min_amount": float(self.min_amount) if self.min_amount is not None else None,
+            "max_amount": float(self.max_amount) if self.max_amount is not None else None,
+            "start_date": self.start_date.isoformat() if self.start_date else None,
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "category": self.category,
+            "subcategory": self.subcategory,
+        }
+
+
 class User(db.Model):
     __tablename__ = 'users'
 
@@ -45,6 +281,10 @@ class User(db.Model):
     username = db.Column(db.String(255), unique=True, nullable=False)
     email = db.Column(db.String(255), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
+    # Last change sequence handed out for this user's transactions
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+    # Tombstones up to this sequence have been compacted away
+    compacted_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
 
     def set_password(self, password):
         self.password_hash = scrypt.hash(password)
@@ -0,0 +1,241 @@
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, g, jsonify, request
+from sqlalchemy import text
+from app import db
+from app.analytics import monthly_series
+from app.backtest import user_backtest
+from app.cache import load_user_columns
+from app.filters import parse_flag
+from app.forecasting import InsufficientData, holt_winters_projection
+from app.models import ForecastBacktest, Projection, User
+
+logger = logging.getLogger(__name__)
+
+PRECOMPUTE_LOCK = 'precompute-projections'
+
+
+def current_period(now=None):
+    return (now or datetime.now()).strftime('%Y-%m')
+
+
+@contextmanager
+def job_lock(name):
+    """
+    Yield True if this process got the named job lock, False if another one holds it.
+
+    Uses a PostgreSQL session advisory lock, so any number of workers or cron
+    invocations can start the job and only one runs it. Other databases
+    (SQLite in tests and development) always get the lock.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        yield True
+        return
+
+    with db.engine.connect() as connection:
+        acquired = connection.execute(text('SELECT pg_try_advisory_lock(hashtext(:name))'), {'name': name}).scalar()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text('SELECT pg_advisory_unlock(hashtext(:name))'), {'name': name})
+
+
+def _projection_response(columns, category, now):
+    """(status, body) exactly as get_projections would answer for this category."""
+    month_starts, monthly_amounts, transaction_count = monthly_series(None, category, columns=columns)
+    try:
+        return 200, holt_winters_projection(month_starts, monthly_amounts, transaction_count, now=now)
+    except InsufficientData as e:
+        return 400, {"error": e.title, "message": str(e)}
+
+
+def precompute_user_projections(user_id, now=None, executor=None):
+    """
+    Bring one user's stored projections and backtest up to date. Returns (computed, removed, backtested).
+
+    The data version is read before the transactions, so a write that lands
+    during the fit leaves the result marked stale rather than wrongly fresh.
+    """
+    now = now or datetime.now()
+    period = current_period(now)
+    data_version = db.session.query(User.change_seq).filter(User.id == user_id).scalar()
+    stored = {p.category: p for p in Projection.query.filter_by(user_id=user_id)}
+    columns = load_user_columns(user_id)
+
+    computed = 0
+    for category in columns.categories:
+        projection = stored.pop(category, None)
+        if projection is not None and projection.is_fresh(data_version, period):
+            continue
+        try:
+            status, body = _projection_response(columns, category, now)
+        except Exception as e:
+            logger.error(f"Error precomputing projections for user {user_id}, {category}: {str(e)}")
+            continue
+        if projection is None:
+            projection = Projection(user_id=user_id, category=category)
+            db.session.add(projection)
+        projection.record(data_version, period, status, body)
+        computed += 1
+
+    # Categories the user no longer has
+    for projection in stored.values():
+        db.session.delete(projection)
+
+    backtest = ForecastBacktest.query.filter_by(user_id=user_id).first()
+    backtested = 0
+    if backtest is None or not backtest.is_fresh(data_version, period):
+        try:
+            result = user_backtest(user_id, executor=executor, columns=columns)
+        except Exception as e:
+            logger.error(f"Error backtesting projections for user {user_id}: {str(e)}")
+        else:
+            if backtest is None:
+                backtest = ForecastBacktest(user_id=user_id)
+                db.session.add(backtest)
+            backtest.data_version = data_version
+            backtest.period = period
+            backtest.result = result
+            backtest.computed_at = datetime.utcnow()
+            backtested = 1
+    db.session.commit()
+    return computed, len(stored), backtested
+
+
+def precompute_projections(now=None):
+    """
+    Precompute projections and backtests for every user and category, skipping results that are still fresh.
+
+    Backtest folds run on a process pool of FORECAST_WORKERS for the duration
+    of the job. Returns counts, or None if another process is already running it.
+    """
+    with job_lock(PRECOMPUTE_LOCK) as acquired:
+        if not acquired:
+            return None
+        totals = {'users': 0, 'computed': 0, 'removed': 0, 'backtested': 0}
+        with ProcessPoolExecutor(max_workers=current_app.config.get('FORECAST_WORKERS')) as executor:
+            for (user_id,) in db.session.query(User.id).order_by(User.id).all():
+                computed, removed, backtested = precompute_user_projections(user_id, now, executor)
+                totals['users'] += 1
+                totals['computed'] += computed
+                totals['removed'] += removed
+                totals['backtested'] += backtested
+        return totals
+
+
+def fresh_projection(user, category):
+    """The stored projection for the user's category if it reflects their current data and month."""
+    projection = Projection.query.filter_by(user_id=user.id, category=category).first()
+    if projection is not None and projection.is_fresh(user.change_seq, current_period()):
+        return projection
+    return None
+
+
+def store_projection(user, category, status, body):
+    """
+    Write a live GET /projections/<category> answer through to the projections table.
+
+    It is stored under the change_seq the request authenticated with, which was
+    read before the transactions, like the nightly job's data version. The next
+    request for the category is then served from the table until the user's
+    data changes again. A newer stored result is left alone. Failures are
+    logged and never fail the request.
+    """
+    period = current_period()
+    # The check and the write both go to the primary, even on a replica-routed request
+    g.pop('read_replica', None)
+    try:
+        projection = Projection.query.filter_by(user_id=user.id, category=category).first()
+        if projection is None:
+            projection = Projection(user_id=user.id, category=category)
+            db.session.add(projection)
+        elif projection.period == period and projection.data_version > user.change_seq:
+            return
+        projection.record(user.change_seq, period, status, body)
+        db.session.commit()
+    except Exception as e:
+        # Includes losing an insert race to a concurrent request for the same category
+        db.session.rollback()
+        logger.error(f"Error storing projections for user {user.id}, {category}: {str(e)}")
+
+
+def serve_precomputed(f):
+    """
+    Answer GET /projections/<category> from the projections table when the stored result is fresh.
+
+    Place above @admission_controlled so stored answers are not rate limited;
+    only stale or missing results fall through to a live fit, which the view
+    writes back with store_projection().
+    """
+    @wraps(f)
+    def decorated(current_user, category, *args, **kwargs):
+        if not parse_flag(request.args, 'hierarchical'):
+            projection = fresh_projection(current_user, category)
+            if projection is not None:
+                return jsonify(projection.result), projection.status
+        return f(current_user, category, *args, **kwargs)
+
+    return decorated
+
+
+def _seconds_until(at, now):
+    hour, minute = (int(part) for part in at.split(':'))
+    run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return (run_at - now).total_seconds()
+
+
+def run_nightly_jobs(app):
+    """
+    The scheduler's daily work: the partition check, then precompute_projections().
+
+    The partition check runs on its own first, so a server that is never
+    restarted still creates next year's partition after the year rolls over.
+    """
+    from app.database import ensure_partitions  # app.database imports this module
+
+    try:
+        created = ensure_partitions(app)
+        if created:
+            logger.info(f"Created {created} transaction partition(s)")
+    except Exception as e:
+        logger.error(f"Could not ensure transaction partitions: {str(e)}")
+
+    with app.app_context():
+        totals = precompute_projections()
+    if totals is not None:
+        logger.info(f"Precomputed projections: {totals}")
+    return totals
+
+
+def start_precompute_scheduler(app):
+    """
+    Run run_nightly_jobs() daily at PROJECTIONS_PRECOMPUTE_AT ('HH:MM', local time) in a daemon thread.
+
+    Does nothing when the setting is empty (run 'flask ensure-partitions' and
+    'flask precompute-projections' from cron instead). Every server worker may
+    start one; the job lock makes sure only one of them precomputes each night.
+    """
+    at = app.config.get('PROJECTIONS_PRECOMPUTE_AT')
+    if not at:
+        return None
+    _seconds_until(at, datetime.now())  # fail fast on a malformed setting
+
+    def run():
+        while True:
+            time.sleep(_seconds_until(at, datetime.now()))
+            try:
+                run_nightly_jobs(app)
+            except Exception as e:
+                logger.error(f"Error precomputing projections: {str(e)}")
+
+    thread = threading.Thread(target=run, name='projection-precompute', daemon=True)
+    thread.start()
+    return thread
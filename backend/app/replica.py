@@ -0,0 +1,72 @@
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, text
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the replica engine when the request allows it.
+
+    Only requests marked by @replica_read are routed, and flushes always go to
+    the primary, so a write can never land on the replica.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and g.get('read_replica'):
+            engine = current_app.extensions['replica_engine']
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def configure_replica(app):
+    """
+    Create the replica engine from SQLALCHEMY_REPLICA_URI, if set.
+
+    The engine is deliberately not a Flask-SQLAlchemy bind: create_all() and
+    drop_all() must never run against the replica, which only follows the primary.
+    """
+    replica_uri = app.config.get('SQLALCHEMY_REPLICA_URI')
+    app.extensions['replica_engine'] = (
+        create_engine(replica_uri, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})) if replica_uri else None
+    )
+
+
+def replica_caught_up(user):
+    """
+    True if the replica has replayed all of the user's writes.
+
+    Every write to a user's transactions bumps users.change_seq in the same
+    transaction (see app/changes.py). So the replica is current for the user
+    once its copy of the row reaches the value token_required loaded from the
+    primary. This is one primary-key read, and it holds whichever worker,
+    flusher or CLI command made the write.
+    """
+    engine = current_app.extensions['replica_engine']
+    if engine is None:
+        return False
+    with engine.connect() as connection:
+        replayed = connection.execute(
+            text('SELECT change_seq FROM users WHERE id = :user_id'), {'user_id': user.id}).scalar()
+    return replayed is not None and replayed >= user.change_seq
+
+
+def replica_read(f):
+    """
+    Route a read-only endpoint's queries to the replica (apply below @token_required).
+
+    A user whose latest write the replica has not replayed yet keeps reading
+    from the primary (see replica_caught_up), so they never see their own change
+    go missing while it catches up. Clients can also ask for the primary with
+    'X-Read-Consistency: primary'.
+    """
+    @wraps(f)
+    def decorated(current_user, *args, **kwargs):
+        g.read_replica = (
+            request.headers.get('X-Read-Consistency') != 'primary'
+            and replica_caught_up(current_user)
+        )
+        return f(current_user, *args, **kwargs)
+
+    return decorated
@@ -0,0 +1,294 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, g, make_response, request
+from app.sqlite_file import SQLiteFile
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def user_tag(user_id):
+    return f'user:{user_id}'
+
+
+class MemoryBackend:
+    """Per-process backend: an LRU OrderedDict under a byte budget. For tests and single-worker setups."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires, status, mimetype, body)
+        self._tags = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def tag_versions(self, tags):
+        with self._lock:
+            return [self._tags.get(tag, 0) for tag in tags]
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1:]
+
+    def set(self, key, status, mimetype, body, ttl, now):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (now + ttl, status, mimetype, body)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._tags[tag] = self._tags.get(tag, 0) + 1
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[3])
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'entries': len(self._entries), 'bytes': self._bytes}
+
+
+class SQLiteBackend(SQLiteFile):
+    """
+    Backend in an on-disk SQLite file, shared by every worker process on the host.
+
+    WAL mode lets workers read while one writes. Each thread keeps its own
+    connection. get() only reads: hit/miss counts and LRU touches are kept in
+    memory and written to the file by the next set() or bump(), which take the
+    write lock anyway. The counters in the file therefore cover all workers,
+    a little behind.
+    """
+
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, status INTEGER NOT NULL, mimetype TEXT, "
+        "body BLOB NOT NULL, size INTEGER NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed)",
+        "CREATE TABLE IF NOT EXISTS tags (tag TEXT PRIMARY KEY, version INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS stats (id INTEGER PRIMARY KEY CHECK (id = 1), hits INTEGER NOT NULL, "
+        "misses INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO stats (id, hits, misses) VALUES (1, 0, 0)",
+    ]
+
+    def __init__(self, path, max_bytes):
+        self.max_bytes = max_bytes
+        self._hits = 0
+        self._misses = 0
+        self._touched = {}  # key -> last access, not yet written to the file
+        self._pending_lock = threading.Lock()
+        super().__init__(path)
+
+    def tag_versions(self, tags):
+        placeholders = ', '.join('?' * len(tags))
+        rows = dict(self._connection().execute(
+            f'SELECT tag, version FROM tags WHERE tag IN ({placeholders})', list(tags)).fetchall())
+        return [rows.get(tag, 0) for tag in tags]
+
+    def get(self, key, now):
+        row = self._connection().execute(
+            'SELECT status, mimetype, body FROM entries WHERE key = ? AND expires > ?', (key, now)).fetchone()
+        with self._pending_lock:
+            if row is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._touched[key] = now
+        return row
+
+    def _flush_pending(self, connection):
+        """Write this process's counters and LRU touches inside the caller's write transaction."""
+        with self._pending_lock:
+            hits, misses, touched = self._hits, self._misses, self._touched
+            self._hits = self._misses = 0
+            self._touched = {}
+        if hits or misses:
+            connection.execute('UPDATE stats SET hits = hits + ?, misses = misses + ? WHERE id = 1', (hits, misses))
+        if touched:
+            connection.executemany('UPDATE entries SET accessed = MAX(accessed, ?) WHERE key = ?',
+                                   [(accessed, key) for key, accessed in touched.items()])
+
+    def set(self, key, status, mimetype, body, ttl, now):
+        if len(body) > self.max_bytes:
+            return
+        with self._transaction() as connection:
+            self._flush_pending(connection)
+            connection.execute(
+                'INSERT OR REPLACE INTO entries (key, status, mimetype, body, size, expires, accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', (key, status, mimetype, body, len(body), now + ttl, now))
+            excess = connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0] - self.max_bytes
+            if excess > 0:
+                connection.execute('DELETE FROM entries WHERE expires <= ?', (now,))
+                excess = connection.execute(
+                    'SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0] - self.max_bytes
+            if excess > 0:
+                # Least recently used first
+                evict = []
+                for old_key, size in connection.execute('SELECT key, size FROM entries ORDER BY accessed'):
+                    if excess <= 0:
+                        break
+                    evict.append((old_key,))
+                    excess -= size
+                connection.executemany('DELETE FROM entries WHERE key = ?', evict)
+
+    def bump(self, tags):
+        with self._transaction() as connection:
+            self._flush_pending(connection)
+            connection.executemany(
+                'INSERT INTO tags (tag, version) VALUES (?, 1) ON CONFLICT(tag) DO UPDATE SET version = version + 1',
+                [(tag,) for tag in tags])
+
+    def stats(self):
+        connection = self._connection()
+        hits, misses = connection.execute('SELECT hits, misses FROM stats WHERE id = 1').fetchone()
+        with self._pending_lock:
+            hits, misses = hits + self._hits, misses + self._misses
+        entries, size = connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        return {'hits': hits, 'misses': misses, 'entries': entries, 'bytes': size}
+
+
+class ResponseCache:
+    """
+    Read-through cache of GET responses, invalidated by tag.
+
+    Keys include the current version of every tag the response depends on.
+    Invalidating a tag bumps its version, so old entries are never served
+    again and simply age out. A response computed while a write was committing
+    is stored under the old version and is never served either.
+
+    Keys also include the user's change_seq as loaded when the request began.
+    A worker that computes a response from data older than another worker's
+    write would otherwise store it under the new tag version for everyone.
+    The data a response is computed from is at least as new as that
+    change_seq, because the analytics cache checks its entries against it.
+    """
+
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+
+    def key(self, route, user_id, args, tags, change_seq=None):
+        versions = self.backend.tag_versions(tags)
+        parts = [route, str(user_id), f'seq={change_seq}']
+        parts += [f'{name}={value}' for name, value in sorted(args)]
+        parts += [f'{tag}@{version}' for tag, version in zip(tags, versions)]
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    def invalidate(self, *tags):
+        self.backend.bump(tags)
+
+    def stats(self):
+        stats = self.backend.stats()
+        lookups = stats['hits'] + stats['misses']
+        return dict(stats, backend=type(self.backend).__name__, max_bytes=self.backend.max_bytes,
+                    hit_ratio=stats['hits'] / lookups if lookups else None)
+
+
+def init_response_cache(app):
+    """
+    Set up the response cache from RESPONSE_CACHE_BACKEND ('sqlite', 'memory', or empty to disable).
+
+    After every successful write by a signed-in user, the 'user:<id>' tag is
+    invalidated, so their cached reads are recomputed.
+    """
+    backend_name = app.config.get('RESPONSE_CACHE_BACKEND')
+    max_bytes = app.config.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+    if backend_name == 'sqlite':
+        path = app.config.get('RESPONSE_CACHE_PATH') or os.path.join(app.instance_path, 'response_cache.sqlite3')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        backend = SQLiteBackend(path, max_bytes)
+    elif backend_name == 'memory':
+        backend = MemoryBackend(max_bytes)
+    elif not backend_name:
+        app.extensions['response_cache'] = None
+        return
+    else:
+        raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND '{backend_name}'")
+    app.extensions['response_cache'] = ResponseCache(backend, app.config.get('RESPONSE_CACHE_TTL_SECONDS', 60))
+
+    @app.after_request
+    def invalidate_after_write(response):
+        user = g.get('current_user')
+        if user is not None and request.method not in SAFE_METHODS and response.status_code < 400:
+            invalidate_tags(user_tag(user.id))
+        return response
+
+
+def invalidate_tags(*tags):
+    """Invalidate cached responses carrying any of the tags (no-op when the cache is disabled)."""
+    cache = current_app.extensions.get('response_cache')
+    if cache is None:
+        return
+    try:
+        cache.invalidate(*tags)
+    except sqlite3.Error as e:
+        logger.error(f"Error invalidating response cache tags {tags}: {str(e)}")
+
+
+def response_cache_stats():
+    cache = current_app.extensions.get('response_cache')
+    return None if cache is None else cache.stats()
+
+
+def cached_response(tags=None):
+    """
+    Serve a GET endpoint from the response cache (apply below @token_required).
+
+    The key covers the user, the route and the query arguments. tags(user) gives
+    the tags to depend on, by default just 'user:<id>'. Only 200 responses are
+    stored. Cache errors never fail the request; it is computed as usual.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            cache = current_app.extensions.get('response_cache')
+            if cache is None or request.method != 'GET':
+                return f(current_user, *args, **kwargs)
+
+            now = time.time()
+            try:
+                entry_tags = tags(current_user) if tags else [user_tag(current_user.id)]
+                key = cache.key(request.path, current_user.id, request.args.items(multi=True), entry_tags,
+                                current_user.change_seq)
+                entry = cache.backend.get(key, now)
+            except sqlite3.Error as e:
+                logger.error(f"Error reading response cache: {str(e)}")
+                return f(current_user, *args, **kwargs)
+
+            if entry is not None:
+                status, mimetype, body = entry
+                response = Response(body, status=status, mimetype=mimetype)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = make_response(f(current_user, *args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                try:
+                    cache.backend.set(key, response.status_code, response.mimetype, response.get_data(), cache.ttl, now)
+                except sqlite3.Error as e:
+                    logger.error(f"Error writing response cache: {str(e)}")
+            response.headers['X-Cache'] = 'MISS'
+            return response
+
+        return decorated
+
+    return decorator
@@ -1,20 +1,47 @@
 import logging
-from flask import Blueprint, request, jsonify
-from app.models import Transaction
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from app.models import Transaction, transaction_fingerprint
 from app import db
+from app.admission import admission_controlled, admission_metrics
+from app.analytics import (
+    category_pivot, category_tree, is_income_category, monthly_category_matrix, monthly_comparison,
+    monthly_hierarchy, monthly_series
+)
 from app.auth_utils import token_required
-import pandas as pd
-import numpy as np
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
+from app.backtest import (
+    DEFAULT_FOLDS, DEFAULT_HORIZON, forecast_executor, fresh_backtest, parse_backtest_args, user_backtest
+)
+from app.batch import DEFAULT_MAX_REQUESTS, parse_batch, run_batch
+from app.backup import EXPORT_FORMATS, require_pyarrow, restore_transactions, stream_export
+from app.changes import changes_since, next_change_seq, record_tombstones
+from app.duplicates import find_duplicate_groups, find_import_duplicates
+from app.forecasting import InsufficientData, hierarchical_projection, holt_winters_projection
+from app.filters import (
+    apply_filters, apply_sort, args_from_json, filter_conditions, load_fields, month_range, paginate,
+    parse_amount, parse_date, parse_fields, parse_flag, parse_pagination, wants_pagination
+)
+from app.ingest import enqueue_transactions, ingest_queue, ingest_stats, ingest_status
+from app.logging_setup import logging_stats
+from app.precompute import serve_precomputed, store_projection
+from app.replica import replica_read
+from app.response_cache import cached_response, response_cache_stats
+from app.rules import categorize_rows, load_matcher
+from app.search import build_search_query
+from app.simulation import parse_simulation_args, simulate_cashflow
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 api = Blueprint('api', __name__)
 
+# Transaction fields a client may change
+EDITABLE_FIELDS = ('transaction_date', 'category', 'subcategory', 'description', 'amount')
+# Fields that make up the duplicate-detection fingerprint
+FINGERPRINT_FIELDS = ('transaction_date', 'amount', 'description')
+DUPLICATE_POLICIES = ('skip', 'flag', 'allow')
+
 
 @api.before_request
 def disable_csrf():
@@ -38,31 +65,25 @@ def health_check():
     }), 200
 
 
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    """Admission control, response cache, logging queue and ingest queue statistics, for monitoring."""
+    return jsonify({
+        'admission': admission_metrics(),
+        'response_cache': response_cache_stats(),
+        'logging': logging_stats(),
+        'ingest': ingest_stats(),
+    }), 200
+
+
 @api.route('/categories', methods=['GET'])
 @token_required
+@cached_response()
+@replica_read
 def get_categories(current_user):
     """Get all unique categories and their subcategories for the current user."""
     try:
-        # Query to get all unique category-subcategory pairs for the user
-        results = db.session.query(
-            Transaction.category,
-            Transaction.subcategory
-        ).filter_by(
-            user_id=current_user.id
-        ).distinct().all()
-
-        # Organize into a dictionary: {category: [subcategories]}
-        categories_dict = {}
-        for category, subcategory in results:
-            if category not in categories_dict:
-                categories_dict[category] = []
-            if subcategory and subcategory not in categories_dict[category]:
-                categories_dict[category].append(subcategory)
-
-        # Sort subcategories for each category
-        for category in categories_dict:
-            categories_dict[category].sort()
-
+        categories_dict = category_tree(current_user.id)
         return jsonify(categories_dict), 200
 
     except Exception as e:
@@ -72,35 +93,139 @@ def get_categories(current_user):
 
 @api.route('/transactions', methods=['GET'])
 @token_required
+@cached_response()
+@replica_read
 def get_transactions(current_user):
-    """Get all transactions for the current user or filter by year, month, and category."""
+    """
+    Get transactions for the current user, filtered and sorted in the database.
+
+    Accepts the filters from app.filters (date/amount ranges, category and
+    subcategory lists) plus 'sort'. Passing 'page' or 'per_page' returns one
+    page wrapped with the total count and the user's change sequence ('seq',
+    the 'since' for /transactions/changes to keep the page current); otherwise
+    a plain list is returned.
+    The legacy year + month + category combination is still supported.
+    'fields' (e.g. fields=transaction_date,category,amount) limits the
+    columns read and returned.
+    """
     year = request.args.get('year', type=int)
     month = request.args.get('month', type=int)
     category = request.args.get('category')
 
+    paginated = wants_pagination(request.args)
+
     # Base query filtered by user
     query = Transaction.query.filter_by(user_id=current_user.id)
 
-    if year and month and category:
-        transactions = query.filter(
-            db.extract('year', Transaction.transaction_date) == year,
-            db.extract('month', Transaction.transaction_date) == month,
-            Transaction.category == category
-        ).all()
-    else:
-        transactions = query.all()
+    try:
+        if year and month and category:
+            # Date range instead of extract() so the (user_id, category, date) index is usable
+            first_day, last_day = month_range(year, month)
+            query = query.filter(Transaction.transaction_date.between(first_day, last_day))
+        query = apply_sort(apply_filters(query, request.args), request.args.get('sort'))
+        fields = parse_fields(request.args)
+        query = load_fields(query, fields)
+        if paginated:
+            page, per_page = parse_pagination(request.args)
+    except ValueError as e:
+        return jsonify({"error": "Invalid query parameters", "message": str(e)}), 400
+
+    if not paginated:
+        return jsonify([t.to_dict(fields) for t in query.all()])
+
+    transactions, total = paginate(query, page, per_page)
+    return jsonify({
+        'items': [t.to_dict(fields) for t in transactions],
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'seq': current_user.change_seq
+    }), 200
 
-    return jsonify([t.to_dict() for t in transactions])
+
+@api.route('/transactions/search', methods=['GET'])
+@token_required
+@cached_response()
+@replica_read
+def search_transactions(current_user):
+    """Ranked full-text or fuzzy search over the current user's transaction descriptions (accepts 'fields')."""
+    q = request.args.get('q', '')
+    mode = request.args.get('mode', 'fts')
+
+    try:
+        page, per_page = parse_pagination(request.args)
+        fields = parse_fields(request.args)
+        query = load_fields(apply_filters(build_search_query(current_user.id, q, mode), request.args), fields)
+    except ValueError as e:
+        return jsonify({"error": "Invalid search parameters", "message": str(e)}), 400
+
+    rows, total = paginate(query, page, per_page)
+
+    items = []
+    for transaction, rank in rows:
+        item = transaction.to_dict(fields)
+        item['rank'] = float(rank)
+        items.append(item)
+
+    return jsonify({
+        'items': items,
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'mode': mode
+    }), 200
+
+
+@api.route('/monthly-comparison', methods=['GET'])
+@token_required
+@cached_response()
+@replica_read
+def get_monthly_comparison(current_user):
+    """Get the month x year totals and per-month averages used by the bar chart views."""
+    income_only = parse_flag(request.args, 'income')
+
+    result = monthly_comparison(
+        current_user.id,
+        category=request.args.get('category'),
+        subcategory=request.args.get('subcategory'),
+        income_only=income_only
+    )
+    return jsonify(result), 200
+
+
+@api.route('/pivot', methods=['GET'])
+@token_required
+@cached_response()
+@replica_read
+def get_pivot(current_user):
+    """Get the category x month pivot (with optional subcategory breakdown) for one year."""
+    year = request.args.get('year', datetime.now().year, type=int)
+    breakdown = request.args.get('breakdown') or None
+
+    if not 1 <= year <= 9999:
+        return jsonify({"error": "Invalid query parameters", "message": "'year' is out of range"}), 400
+
+    return jsonify(category_pivot(current_user.id, year, breakdown)), 200
 
 
 @api.route('/transaction', methods=['POST'])
 @token_required
 def add_transaction(current_user):
-    """Add a new transaction for the current user."""
+    """
+    Add a new transaction for the current user.
+
+    One INSERT ... RETURNING: the response is built from the returned row, so
+    nothing is read back after the commit.
+    """
     data = request.get_json()
 
     if not data:
         return jsonify({"error": "No data received"}), 400
+    if 'amount' in data:
+        try:
+            data['amount'] = parse_amount(data['amount'], 'amount')
+        except ValueError as e:
+            return jsonify({"error": "Invalid transaction", "message": str(e)}), 400
 
     try:
         # Parse transaction_date if it's a string
@@ -108,193 +233,597 @@ def add_transaction(current_user):
         if isinstance(transaction_date, str):
             transaction_date = datetime.strptime(transaction_date, '%Y-%m-%d').date()
 
-        transaction = Transaction(
-            transaction_date=transaction_date,  # type: ignore
-            category=data['category'],  # type: ignore
-            subcategory=data.get('subcategory'),  # type: ignore
-            description=data.get('description'),  # type: ignore
-            amount=data['amount'],  # type: ignore
-            user_id=current_user.id  # Set user_id from authenticated user
-        )
+        row = {
+            'transaction_date': transaction_date,
+            'category': data['category'],
+            'subcategory': data.get('subcategory'),
+            'description': data.get('description'),
+            'amount': data['amount'],
+            'user_id': current_user.id,  # Set user_id from authenticated user
+        }
+        # Core inserts skip the ORM hooks, so stamp what they would
+        row['fingerprint'] = transaction_fingerprint(
+            current_user.id, row['transaction_date'], row['amount'], row['description'])
+        row['change_seq'] = next_change_seq(current_user.id)
 
-        db.session.add(transaction)
+        transaction = db.session.scalars(db.insert(Transaction).values(**row).returning(Transaction)).one()
+        result = transaction.to_dict()
         db.session.commit()
 
-        return jsonify(transaction.to_dict()), 201
+        return jsonify(result), 201
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error adding transaction: {str(e)}")
         return jsonify({"error": "Failed to add transaction", "details": str(e)}), 500
 
 
+def _parse_import_row(data):
+    """Validate one imported transaction; category may be left for the rules to fill in."""
+    if not isinstance(data, dict):
+        raise ValueError("each transaction must be an object")
+    if 'transaction_date' not in data or 'amount' not in data:
+        raise ValueError("'transaction_date' and 'amount' are required")
+    return {
+        'transaction_date': parse_date(data['transaction_date'], 'transaction_date'),
+        'amount': parse_amount(data['amount'], 'amount'),
+        'category': data.get('category'),
+        'subcategory': data.get('subcategory'),
+        'description': data.get('description'),
+    }
+
+
+@api.route('/transactions/import', methods=['POST'])
+@token_required
+def import_transactions(current_user):
+    """
+    Import many transactions at once, categorizing them with the user's rules.
+
+    Rows whose fingerprint is already stored are skipped ('on_duplicate': 'skip',
+    the default), imported and reported ('flag'), or imported silently ('allow').
+    Rules only fill in rows sent without a category, unless 'override_categories'
+    is true.
+    """
+    data = request.get_json(silent=True) or {}
+    transactions = data.get('transactions')
+    on_duplicate = data.get('on_duplicate', 'skip')
+
+    if not isinstance(transactions, list) or not transactions:
+        return jsonify({"error": "'transactions' must be a non-empty list"}), 400
+    if on_duplicate not in DUPLICATE_POLICIES:
+        return jsonify({"error": f"'on_duplicate' must be one of: {', '.join(DUPLICATE_POLICIES)}"}), 400
+
+    rows = []
+    for index, item in enumerate(transactions):
+        try:
+            rows.append(_parse_import_row(item))
+        except ValueError as e:
+            return jsonify({"error": "Invalid transaction", "message": f"Row {index}: {e}"}), 400
+
+    duplicates = find_import_duplicates(current_user.id, rows)
+    skipped = set(duplicates) if on_duplicate == 'skip' else set()
+    new_rows = [row for index, row in enumerate(rows) if index not in skipped]
+
+    categorized = 0
+    if data.get('apply_rules', True) and new_rows:
+        categorized = categorize_rows(load_matcher(current_user.id), new_rows,
+                                      override=bool(data.get('override_categories', False)))
+
+    uncategorized = [index for index, row in enumerate(rows) if index not in skipped and not row['category']]
+    if uncategorized:
+        return jsonify({
+            "error": "Uncategorized transactions",
+            "message": "No category given and no rule matched",
+            "rows": uncategorized
+        }), 400
+
+    try:
+        if new_rows:
+            change_seq = next_change_seq(current_user.id)
+            for row in new_rows:
+                row['user_id'] = current_user.id
+                row['change_seq'] = change_seq
+            # One executemany INSERT for the whole batch
+            db.session.execute(db.insert(Transaction), new_rows)
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error importing transactions: {str(e)}")
+        return jsonify({"error": "Failed to import transactions", "details": str(e)}), 500
+
+    return jsonify({
+        'imported': len(new_rows),
+        'categorized': categorized,
+        'skipped': len(skipped),
+        'duplicates': duplicates if on_duplicate != 'allow' else []
+    }), 201
+
+
+@api.route('/transactions/ingest', methods=['POST'])
+@token_required
+def ingest_transactions(current_user):
+    """
+    Write-behind insert: validate now, queue durably and return 202 with a token.
+
+    The rows are inserted by the ingest flusher in its next micro-batch (see
+    app/ingest.py). GET /transactions/ingest/<token> reports when they are
+    committed. Only available when INGEST_WRITE_BEHIND is on.
+    """
+    if ingest_queue() is None:
+        return jsonify({"error": "Write-behind ingestion is not enabled"}), 404
+
+    data = request.get_json(silent=True) or {}
+    transactions = data.get('transactions')
+    if not isinstance(transactions, list) or not transactions:
+        return jsonify({"error": "'transactions' must be a non-empty list"}), 400
+
+    rows = []
+    for index, item in enumerate(transactions):
+        try:
+            row = _parse_import_row(item)
+            if not row['category']:
+                raise ValueError("'category' is required")
+            rows.append(row)
+        except ValueError as e:
+            return jsonify({"error": "Invalid transaction", "message": f"Row {index}: {e}"}), 400
+
+    try:
+        token = enqueue_transactions(current_user.id, rows)
+    except Exception as e:
+        logger.error(f"Error queueing transactions: {str(e)}")
+        return jsonify({"error": "Failed to queue transactions", "details": str(e)}), 500
+
+    return jsonify({'token': token, 'status': 'pending', 'queued': len(rows)}), 202
+
+
+@api.route('/transactions/ingest/<token>', methods=['GET'])
+@token_required
+def get_ingest_status(current_user, token):
+    """Status of a write-behind token: pending, committed (with the new ids) or failed. ?wait= blocks up to 30s."""
+    if ingest_queue() is None:
+        return jsonify({"error": "Write-behind ingestion is not enabled"}), 404
+
+    status = ingest_status(token, current_user.id, wait=request.args.get('wait', 0, type=float))
+    if status is None:
+        return jsonify({"error": "Unknown token"}), 404
+    return jsonify(status), 200
+
+
+@api.route('/transactions/changes', methods=['GET'])
+@token_required
+@replica_read
+def get_transaction_changes(current_user):
+    """
+    Delta sync: transactions changed and ids deleted since the client's last 'seq'.
+
+    Start with since=0 (or omit it); each response's 'seq' is the next 'since'.
+    When 'reset' is true the client must replace its local copy with 'upserts'.
+    'fields' limits the columns read and returned for the upserts.
+    """
+    since = request.args.get('since', 0, type=int)
+    if since < 0:
+        return jsonify({"error": "'since' must be 0 or greater"}), 400
+    try:
+        fields = parse_fields(request.args)
+    except ValueError as e:
+        return jsonify({"error": "Invalid query parameters", "message": str(e)}), 400
+    return jsonify(changes_since(current_user.id, since, fields)), 200
+
+
+@api.route('/transactions/duplicates', methods=['GET'])
+@token_required
+@replica_read
+def get_duplicate_transactions(current_user):
+    """Report groups of the current user's transactions that share a fingerprint."""
+    limit = request.args.get('limit', 100, type=int)
+    return jsonify(find_duplicate_groups(current_user.id, limit=max(1, min(limit, 1000)))), 200
+
+
+EXPORT_MIMETYPES = {
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+
+@api.route('/transactions/export', methods=['GET'])
+@token_required
+@replica_read
+def export_transactions(current_user):
+    """Stream the current user's transactions as Parquet (default) or an Arrow IPC stream."""
+    fmt = request.args.get('format', 'parquet')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"'format' must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    try:
+        require_pyarrow()
+    except RuntimeError as e:
+        return jsonify({"error": "Export unavailable", "message": str(e)}), 501
+
+    mimetype, extension = EXPORT_MIMETYPES[fmt]
+    filename = f"transactions_{datetime.now():%Y%m%d}.{extension}"
+    return Response(
+        stream_with_context(stream_export(current_user.id, fmt)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+@api.route('/transactions/restore', methods=['POST'])
+@token_required
+@admission_controlled('restore')
+def restore_transactions_backup(current_user):
+    """Bulk-load a Parquet/Arrow export (multipart field 'file') into the current user's transactions."""
+    upload = request.files.get('file')
+    if upload is None:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    try:
+        result = restore_transactions(upload.stream, user_id=current_user.id)
+    except RuntimeError as e:
+        return jsonify({"error": "Restore unavailable", "message": str(e)}), 501
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error restoring transactions: {str(e)}")
+        return jsonify({"error": "Failed to restore transactions", "details": str(e)}), 500
+
+    return jsonify(result), 201
+
+
+def _expected_version(values):
+    """
+    The version the client last saw, for optimistic concurrency, or None to write unconditionally.
+
+    Taken from the If-Match header ('3' or '"3"') or a 'version' value.
+    """
+    value = request.headers.get('If-Match')
+    if value is not None:
+        value = value.strip().removeprefix('W/').strip('"')
+    elif 'version' in values:
+        value = values['version']
+    else:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError("'version' must be an integer")
+
+
+def _write_missed(current_user, transaction_id, expected_version):
+    """Response for a write that matched no row: 404, or 409 if only the version did not match."""
+    current_version = None
+    if expected_version is not None:
+        current_version = db.session.query(Transaction.version).filter_by(
+            id=transaction_id, user_id=current_user.id).scalar()
+    if current_version is None:
+        return jsonify({"error": "Transaction not found"}), 404
+    return jsonify({
+        "error": "Version conflict",
+        "message": f"The transaction was changed since version {expected_version}",
+        "version": current_version
+    }), 409
+
+
 @api.route('/transaction/<int:transaction_id>', methods=['DELETE'])
 @token_required
 def delete_transaction(current_user, transaction_id):
-    """Delete a transaction (only if it belongs to the current user)."""
-    transaction = Transaction.query.filter_by(
-        id=transaction_id, user_id=current_user.id).first_or_404()
-    db.session.delete(transaction)
-    db.session.commit()
+    """
+    Delete a transaction (only if it belongs to the current user).
+
+    One user-scoped DELETE ... RETURNING. With If-Match (or ?version=) the row
+    is only deleted if it is still at that version (409 otherwise).
+    """
+    try:
+        expected_version = _expected_version(request.args)
+    except ValueError as e:
+        return jsonify({"error": "Invalid query parameters", "message": str(e)}), 400
+
+    conditions = [Transaction.id == transaction_id, Transaction.user_id == current_user.id]
+    if expected_version is not None:
+        conditions.append(Transaction.version == expected_version)
+
+    try:
+        deleted_id = db.session.execute(
+            db.delete(Transaction).where(*conditions).returning(Transaction.id),
+            execution_options={'synchronize_session': False}
+        ).scalar()
+        if deleted_id is None:
+            db.session.rollback()
+            return _write_missed(current_user, transaction_id, expected_version)
+        record_tombstones(current_user.id, [deleted_id], next_change_seq(current_user.id))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error deleting transaction: {str(e)}")
+        return jsonify({"error": f"Failed to delete transaction: {str(e)}"}), 500
+
     return jsonify({"message": "Transaction deleted successfully"}), 200
 
 
 @api.route('/transaction/<int:transaction_id>', methods=['PUT'])
 @token_required
 def update_transaction(current_user, transaction_id):
-    """Update a transaction (only if it belongs to the current user)."""
-    transaction = Transaction.query.filter_by(
-        id=transaction_id, user_id=current_user.id).first_or_404()
-    data = request.get_json()
+    """
+    Update a transaction (only if it belongs to the current user).
+
+    One user-scoped UPDATE ... RETURNING; fields other than EDITABLE_FIELDS are
+    ignored. With If-Match or a 'version' in the body the update only applies
+    if the row is still at that version (409 otherwise).
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not any(field in data for field in EDITABLE_FIELDS):
+        return jsonify({"error": "No data received"}), 400
 
+    changes = {field: data[field] for field in EDITABLE_FIELDS if field in data}
     try:
-        if 'category' in data:
-            transaction.category = data['category']
-        if 'subcategory' in data:
-            transaction.subcategory = data['subcategory']
-        if 'description' in data:
-            transaction.description = data['description']
-        if 'amount' in data:
-            transaction.amount = data['amount']
-        if 'transaction_date' in data:
-            # Parse transaction_date if it's a string
-            transaction_date = data['transaction_date']
-            if isinstance(transaction_date, str):
-                transaction_date = datetime.strptime(transaction_date, '%Y-%m-%d').date()
-            transaction.transaction_date = transaction_date
+        expected_version = _expected_version(data)
+        if 'amount' in changes:
+            changes['amount'] = parse_amount(changes['amount'], 'amount')
+    except ValueError as e:
+        return jsonify({"error": "Invalid transaction", "message": str(e)}), 400
 
+    conditions = [Transaction.id == transaction_id, Transaction.user_id == current_user.id]
+    if expected_version is not None:
+        conditions.append(Transaction.version == expected_version)
+
+    try:
+        # Parse transaction_date if it's a string
+        if isinstance(changes.get('transaction_date'), str):
+            changes['transaction_date'] = datetime.strptime(changes['transaction_date'], '%Y-%m-%d').date()
+        if all(field in changes for field in FINGERPRINT_FIELDS):
+            # The whole fingerprint is known up front (the usual full-form edit)
+            changes['fingerprint'] = transaction_fingerprint(
+                current_user.id, changes['transaction_date'], changes['amount'], changes['description'])
+
+        transaction = db.session.scalars(
+            db.update(Transaction).where(*conditions).values(
+                **changes, change_seq=next_change_seq(current_user.id), version=Transaction.version + 1
+            ).returning(Transaction),
+            execution_options={'synchronize_session': False, 'populate_existing': True}
+        ).first()
+        if transaction is None:
+            db.session.rollback()
+            return _write_missed(current_user, transaction_id, expected_version)
+        if 'fingerprint' not in changes and any(field in changes for field in FINGERPRINT_FIELDS):
+            db.session.execute(
+                db.update(Transaction).where(Transaction.id == transaction.id).values(
+                    fingerprint=transaction.compute_fingerprint()),
+                execution_options={'synchronize_session': False}
+            )
+        result = transaction.to_dict()
         db.session.commit()
-        return jsonify(transaction.to_dict()), 200
+        return jsonify(result), 200
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error updating transaction: {str(e)}")
         return jsonify({"error": f"Failed to update transaction: {str(e)}"}), 500
 
 
-@api.route('/projections/<category>', methods=['GET'])
+def _parse_changes(data):
+    """Validate a partial transaction update and return the column values to set."""
+    if not isinstance(data, dict) or not data:
+        raise ValueError("'changes' must be a non-empty object")
+    unknown = set(data) - set(EDITABLE_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot change: {', '.join(sorted(unknown))}")
+
+    changes = dict(data)
+    if 'transaction_date' in changes:
+        changes['transaction_date'] = parse_date(changes['transaction_date'], 'transaction_date')
+    if 'amount' in changes:
+        changes['amount'] = parse_amount(changes['amount'], 'amount')
+    if 'category' in changes and not changes['category']:
+        raise ValueError("'category' cannot be empty")
+    return changes
+
+
+def _bulk_conditions(current_user, data):
+    """Build the WHERE clause for a bulk request from either 'ids' or 'filter'."""
+    if not isinstance(data, dict) or ('ids' in data) == ('filter' in data):
+        raise ValueError("Provide exactly one of 'ids' or 'filter'")
+
+    if 'ids' in data:
+        ids = data['ids']
+        if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+            raise ValueError("'ids' must be a non-empty list of integers")
+        conditions = [Transaction.id.in_(ids)]
+    else:
+        conditions = filter_conditions(args_from_json(data['filter']))
+        if not conditions:
+            # An empty filter would match every transaction the user has
+            raise ValueError("'filter' must contain at least one condition")
+
+    return [Transaction.user_id == current_user.id, *conditions]
+
+
+@api.route('/transactions', methods=['PATCH'])
 @token_required
-def get_projections(current_user, category):
-    """Get AI-based projections using Holt-Winters Exponential Smoothing for the current user."""
+def bulk_update_transactions(current_user):
+    """Apply the same changes to many transactions with a single UPDATE statement."""
+    data = request.get_json(silent=True) or {}
+
     try:
-        # Get all transactions for this category for the current user
-        transactions = Transaction.query.filter_by(
-            category=category, user_id=current_user.id).all()
-
-        if len(transactions) < 24:
-            return jsonify({
-                "error": "Insufficient data",
-                "message": f"Need at least 24 transactions. Found {len(transactions)} transactions."
-            }), 400
-
-        # Prepare data
-        data = []
-        for tx in transactions:
-            data.append({
-                'date': tx.transaction_date,
-                'amount': float(abs(tx.amount))  # Convert Decimal to float
-            })
-
-        # Create DataFrame and aggregate by month
-        df = pd.DataFrame(data)
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.groupby(df['date'].dt.to_period('M')).agg(
-            {'amount': 'sum'}).reset_index()
-        df['date'] = df['date'].dt.to_timestamp()
-        df = df.sort_values('date')
-
-        # Check if we have enough monthly data
-        if len(df) < 12:
-            return jsonify({
-                "error": "Insufficient monthly data",
-                "message": f"Need at least 12 months of data. Found {len(df)} months."
-            }), 400
-
-        # Create time series and ensure it's float type
-        ts = df.set_index('date')['amount'].astype(float)
-
-        # Determine if current month is incomplete
-        now = datetime.now()
-        current_month_start = pd.Timestamp(
-            year=now.year, month=now.month, day=1)
-        last_data_month = ts.index[-1]
-
-        # Check if the last data point is the current month (incomplete)
-        is_current_month_incomplete = (
-            last_data_month.year == now.year
-            and last_data_month.month == now.month
-        )
+        conditions = _bulk_conditions(current_user, data)
+        changes = _parse_changes(data.get('changes'))
+    except ValueError as e:
+        return jsonify({"error": "Invalid bulk update", "message": str(e)}), 400
 
-        # If current month is incomplete, exclude it from training data
-        if is_current_month_incomplete:
-            ts_for_training = ts.iloc[:-1]  # Exclude last (incomplete) month
-            # Store the partial amount
-            current_month_actual = float(ts.iloc[-1])
-        else:
-            ts_for_training = ts
-            current_month_actual = None
-
-        # Fit Holt-Winters Exponential Smoothing model
-        # seasonal_periods=12 for yearly seasonality
-        model = ExponentialSmoothing(
-            ts_for_training,
-            seasonal_periods=12,
-            trend='add',
-            seasonal='add',
-            initialization_method='estimated'
-        )
+    try:
+        result = db.session.execute(
+            db.update(Transaction).where(*conditions).values(
+                **changes, change_seq=next_change_seq(current_user.id), version=Transaction.version + 1).returning(
+                Transaction.id, Transaction.transaction_date, Transaction.amount, Transaction.description),
+            execution_options={'synchronize_session': False}
+        ).all()
+        if result and any(field in changes for field in FINGERPRINT_FIELDS):
+            # Keep duplicate detection accurate for the rows just rewritten
+            db.session.execute(db.update(Transaction), [
+                {'id': row.id, 'fingerprint': transaction_fingerprint(
+                    current_user.id, row.transaction_date, row.amount, row.description)}
+                for row in result
+            ])
+        ids = sorted(row.id for row in result)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error bulk updating transactions: {str(e)}")
+        return jsonify({"error": f"Failed to update transactions: {str(e)}"}), 500
 
-        fitted_model = model.fit()
+    return jsonify({'affected': len(ids), 'ids': ids}), 200
 
-        # Forecast ahead
-        # If current month is incomplete, we need 13 forecasts (current month + 12 future)
-        # Otherwise, we need 12 forecasts
-        forecast_steps = 13 if is_current_month_incomplete else 12
-        forecast = fitted_model.forecast(steps=forecast_steps)
 
-        # Calculate confidence intervals using residuals from training data
-        residuals = fitted_model.resid
-        std_error = np.std(residuals)
-        confidence_multiplier = 1.28  # 80% confidence interval
+@api.route('/transactions', methods=['DELETE'])
+@token_required
+def bulk_delete_transactions(current_user):
+    """Delete many transactions with a single DELETE statement."""
+    data = request.get_json(silent=True) or {}
 
-        # Prepare response
-        result = {
-            'historical': [],
-            'projected': [],
-            'current_month_actual': None  # Actual spending so far this month
-        }
+    try:
+        conditions = _bulk_conditions(current_user, data)
+    except ValueError as e:
+        return jsonify({"error": "Invalid bulk delete", "message": str(e)}), 400
+
+    try:
+        result = db.session.execute(
+            db.delete(Transaction).where(*conditions).returning(Transaction.id),
+            execution_options={'synchronize_session': False}
+        )
+        ids = sorted(row.id for row in result)
+        if ids:
+            record_tombstones(current_user.id, ids, next_change_seq(current_user.id))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error bulk deleting transactions: {str(e)}")
+        return jsonify({"error": f"Failed to delete transactions: {str(e)}"}), 500
+
+    return jsonify({'affected': len(ids), 'ids': ids}), 200
 
-        # Historical data - only include complete months (training data)
-        for date, value in ts_for_training.items():
-            result['historical'].append({
-                'date': date.strftime('%Y-%m'),
-                'value': float(value)
-            })
-
-        # Projected data with confidence intervals
-        if is_current_month_incomplete:
-            # First forecast is for current month (full month projection)
-            # Store the actual partial spending
-            result['current_month_actual'] = current_month_actual
-
-            # Start projections from current month
-            forecast_dates = pd.date_range(
-                start=current_month_start, periods=13, freq='MS')
-        else:
-            # Start projections from next month
-            forecast_dates = pd.date_range(
-                start=ts.index[-1] + pd.DateOffset(months=1), periods=12, freq='MS')
-
-        for date, value in zip(forecast_dates, forecast):
-            result['projected'].append({
-                'date': date.strftime('%Y-%m'),
-                'value': float(value),
-                'lower': float(max(0, value - confidence_multiplier * std_error)),
-                'upper': float(value + confidence_multiplier * std_error)
-            })
 
+@api.route('/projections/<category>', methods=['GET'])
+@token_required
+@replica_read
+@serve_precomputed
+@admission_controlled('projections')
+def get_projections(current_user, category):
+    """
+    Get AI-based projections using Holt-Winters Exponential Smoothing for the current user.
+
+    Served from the projections table when the stored result is current (see
+    app/precompute.py); otherwise the model is fitted live and the result stored.
+
+    With ?hierarchical=true the category and all its subcategories are projected
+    together and reconciled (?reconciliation=mint, the default, or bottom_up) so
+    the subcategory projections add up to the category's.
+    """
+    if parse_flag(request.args, 'hierarchical'):
+        try:
+            month_starts, subcategories, matrix, transaction_count = monthly_hierarchy(current_user.id, category)
+            result = hierarchical_projection(category, month_starts, subcategories, matrix, transaction_count,
+                                             method=request.args.get('reconciliation', 'mint'))
+            return jsonify(result), 200
+        except InsufficientData as e:
+            return jsonify({"error": e.title, "message": str(e)}), 400
+        except ValueError as e:
+            return jsonify({"error": "Invalid query parameters", "message": str(e)}), 400
+
+    try:
+        # Monthly sums of absolute amounts, from the user's cached columns
+        month_starts, monthly_amounts, transaction_count = monthly_series(current_user.id, category)
+        result = holt_winters_projection(month_starts, monthly_amounts, transaction_count)
+        store_projection(current_user, category, 200, result)
         return jsonify(result), 200
 
+    except InsufficientData as e:
+        body = {"error": e.title, "message": str(e)}
+        store_projection(current_user, category, 400, body)
+        return jsonify(body), 400
     except Exception as e:
         logger.error(f"Error generating projections for {category}: {str(e)}")
         import traceback
         logger.error(traceback.format_exc())
         return jsonify({"error": f"Failed to generate projections: {str(e)}"}), 500
+
+
+@api.route('/simulate', methods=['GET'])
+@token_required
+@replica_read
+@admission_controlled('simulate')
+def simulate(current_user):
+    """
+    Monte Carlo cashflow simulation over every category (see app/simulation.py).
+
+    Query parameters: months (default 24), paths (default 10000),
+    starting_balance (default 0) and seed (for repeatable results).
+    """
+    try:
+        months, paths, starting_balance, seed = parse_simulation_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": "Invalid query parameters", "message": str(e)}), 400
+
+    now = datetime.now()
+    try:
+        month_starts, categories, matrix = monthly_category_matrix(current_user.id, before=now)
+        result = simulate_cashflow(month_starts, categories, matrix, [is_income_category(c) for c in categories],
+                                   months=months, paths=paths, starting_balance=starting_balance, seed=seed, now=now)
+        return jsonify(result), 200
+    except InsufficientData as e:
+        return jsonify({"error": e.title, "message": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error simulating cashflow: {str(e)}")
+        return jsonify({"error": f"Failed to simulate cashflow: {str(e)}"}), 500
+
+
+@api.route('/backtest', methods=['GET'])
+@token_required
+@replica_read
+def backtest_projections(current_user):
+    """
+    Rolling-origin backtest of the projections model: error curves by months ahead, per category.
+
+    Query parameters: folds (default 12), horizon (default 12) and category
+    (repeatable; default all). The default backtest is precomputed nightly and
+    served from the forecast_backtests table while fresh.
+    """
+    try:
+        folds, horizon = parse_backtest_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": "Invalid query parameters", "message": str(e)}), 400
+    categories = request.args.getlist('category') or None
+
+    if (folds, horizon) == (DEFAULT_FOLDS, DEFAULT_HORIZON):
+        stored = fresh_backtest(current_user)
+        if stored is not None:
+            result = dict(stored.result)
+            if categories is not None:
+                result['categories'] = {c: v for c, v in result['categories'].items() if c in categories}
+                result['skipped'] = [c for c in result['skipped'] if c in categories]
+            return jsonify(result), 200
+
+    return _live_backtest(current_user, categories, folds, horizon)
+
+
+@admission_controlled('backtest')
+def _live_backtest(current_user, categories, folds, horizon):
+    try:
+        result = user_backtest(current_user.id, categories, folds, horizon, executor=forecast_executor())
+        return jsonify(result), 200
+    except Exception as e:
+        logger.error(f"Error backtesting projections: {str(e)}")
+        return jsonify({"error": f"Failed to backtest projections: {str(e)}"}), 500
+
+
+@api.route('/batch', methods=['POST'])
+@token_required
+def batch(current_user):
+    """
+    Run several GET requests in one round trip, under this request's authentication and DB session.
+
+    Body: {"requests": ["/api/categories", {"id": "food", "path": "/api/projections/Food"}, ...]}.
+    Returns {"responses": [{"id", "path", "status", "body"}, ...]} in request order;
+    each sub-request keeps its own status.
+    """
+    try:
+        requests = parse_batch(request.get_json(silent=True),
+                               current_app.config.get('BATCH_MAX_REQUESTS', DEFAULT_MAX_REQUESTS))
+    except ValueError as e:
+        return jsonify({"error": "Invalid batch", "message": str(e)}), 400
+
+    return jsonify({'responses': run_batch(current_user, requests)}), 200
@@ -0,0 +1,126 @@
+import logging
+import re
+from flask import Blueprint, request, jsonify
+from app import db
+from app.auth_utils import token_required
+from app.filters import args_from_json, filter_conditions, parse_amount, parse_date
+from app.models import CategoryRule
+from app.rules import apply_rules_to_history
+
+logger = logging.getLogger(__name__)
+
+rules_bp = Blueprint('rules', __name__)
+
+RULE_FIELDS = ('priority', 'pattern', 'match_type', 'min_amount', 'max_amount',
+               'start_date', 'end_date', 'category', 'subcategory')
+
+
+def _apply_rule_fields(rule, data):
+    """Validate rule fields from a request body and set them on the rule."""
+    unknown = set(data) - set(RULE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown rule fields: {', '.join(sorted(unknown))}")
+
+    for field in RULE_FIELDS:
+        if field not in data:
+            continue
+        value = data[field]
+        if value is not None and field in ('min_amount', 'max_amount'):
+            value = parse_amount(value, field)
+        elif value is not None and field in ('start_date', 'end_date'):
+            value = parse_date(value, field)
+        elif field == 'priority' and not isinstance(value, int):
+            raise ValueError("'priority' must be an integer")
+        setattr(rule, field, value)
+
+    if rule.match_type is None:
+        rule.match_type = 'contains'
+    if rule.match_type not in CategoryRule.MATCH_TYPES:
+        raise ValueError(f"'match_type' must be one of: {', '.join(CategoryRule.MATCH_TYPES)}")
+    if rule.match_type == 'regex' and rule.pattern:
+        try:
+            re.compile(rule.pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression: {e}")
+    if not rule.category:
+        raise ValueError("'category' is required")
+    if not (rule.pattern or rule.min_amount is not None or rule.max_amount is not None
+            or rule.start_date or rule.end_date):
+        # A rule without any condition would swallow every transaction
+        raise ValueError("A rule needs a pattern, an amount range or a date range")
+
+
+@rules_bp.route('', methods=['GET'])
+@token_required
+def get_rules(current_user):
+    """Get the current user's categorization rules in priority order."""
+    rules = CategoryRule.query.filter_by(user_id=current_user.id).order_by(
+        CategoryRule.priority, CategoryRule.id).all()
+    return jsonify([rule.to_dict() for rule in rules]), 200
+
+
+@rules_bp.route('', methods=['POST'])
+@token_required
+def create_rule(current_user):
+    """Create a categorization rule for the current user."""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No data received"}), 400
+
+    rule = CategoryRule(user_id=current_user.id, priority=100)  # type: ignore
+    try:
+        _apply_rule_fields(rule, data)
+    except ValueError as e:
+        return jsonify({"error": "Invalid rule", "message": str(e)}), 400
+
+    db.session.add(rule)
+    db.session.commit()
+    return jsonify(rule.to_dict()), 201
+
+
+@rules_bp.route('/<int:rule_id>', methods=['PUT'])
+@token_required
+def update_rule(current_user, rule_id):
+    """Update one of the current user's rules."""
+    rule = CategoryRule.query.filter_by(id=rule_id, user_id=current_user.id).first_or_404()
+    data = request.get_json(silent=True) or {}
+
+    try:
+        _apply_rule_fields(rule, data)
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": "Invalid rule", "message": str(e)}), 400
+
+    db.session.commit()
+    return jsonify(rule.to_dict()), 200
+
+
+@rules_bp.route('/<int:rule_id>', methods=['DELETE'])
+@token_required
+def delete_rule(current_user, rule_id):
+    """Delete one of the current user's rules."""
+    rule = CategoryRule.query.filter_by(id=rule_id, user_id=current_user.id).first_or_404()
+    db.session.delete(rule)
+    db.session.commit()
+    return jsonify({"message": "Rule deleted successfully"}), 200
+
+
+@rules_bp.route('/apply', methods=['POST'])
+@token_required
+def apply_rules(current_user):
+    """Re-categorize existing transactions (optionally only those matching 'filter') with the rules."""
+    data = request.get_json(silent=True) or {}
+
+    try:
+        conditions = filter_conditions(args_from_json(data['filter'])) if 'filter' in data else []
+    except ValueError as e:
+        return jsonify({"error": "Invalid filter", "message": str(e)}), 400
+
+    try:
+        result = apply_rules_to_history(current_user.id, conditions, dry_run=bool(data.get('dry_run')))
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error applying rules: {str(e)}")
+        return jsonify({"error": f"Failed to apply rules: {str(e)}"}), 500
+
+    return jsonify(result), 200
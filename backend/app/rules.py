@@ -0,0 +1,213 @@
+import re
+from collections import deque
+import numpy as np
+import pandas as pd
+from app import db
+from app.changes import next_change_seq
+from app.models import CategoryRule, Transaction
+
+
+# Rows per UPDATE ... WHERE id IN (...) statement when rewriting history
+UPDATE_CHUNK_SIZE = 5000
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher: one pass over a text finds every pattern it contains."""
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [0]  # bitmask of pattern indices ending at each node
+
+        for index, pattern in enumerate(patterns):
+            node = 0
+            for char in pattern:
+                if char not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(0)
+                    self._goto[node][char] = len(self._goto) - 1
+                node = self._goto[node][char]
+            self._out[node] |= 1 << index
+
+        # Breadth-first failure links; depth-1 nodes fail back to the root
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] |= self._out[self._fail[child]]
+
+    def search(self, text):
+        """Return a bitmask of the patterns found in text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        found = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            found |= out[node]
+        return found
+
+
+class RuleMatcher:
+    """
+    Rules compiled for batch matching.
+
+    Substring rules share one Aho-Corasick automaton, so each distinct
+    description is scanned once regardless of the number of rules. Amount and
+    date constraints are then applied as NumPy masks over the whole batch, in
+    priority order.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+
+        contains = [(i, r.pattern.lower()) for i, r in enumerate(self.rules)
+                    if r.pattern and r.match_type == 'contains']
+        self._contains_rules = [i for i, _ in contains]
+        self._automaton = AhoCorasick([pattern for _, pattern in contains])
+        self._regexes = [(i, re.compile(r.pattern, re.IGNORECASE)) for i, r in enumerate(self.rules)
+                         if r.pattern and r.match_type == 'regex']
+        self._always = [i for i, r in enumerate(self.rules) if not r.pattern]
+
+        def bound(values, missing):
+            return np.array([missing if v is None else v for v in values])
+
+        self._min_amount = bound([r.min_amount for r in self.rules], -np.inf).astype(float)
+        self._max_amount = bound([r.max_amount for r in self.rules], np.inf).astype(float)
+        self._start_date = bound([r.start_date for r in self.rules], np.datetime64('NaT')).astype('datetime64[D]')
+        self._end_date = bound([r.end_date for r in self.rules], np.datetime64('NaT')).astype('datetime64[D]')
+
+    def _text_matches(self, descriptions):
+        """Boolean matrix (distinct description x rule) of pattern hits."""
+        matches = np.zeros((len(descriptions), len(self.rules)), dtype=bool)
+        matches[:, self._always] = True
+        for row, text in enumerate(descriptions):
+            found = self._automaton.search(text) if self._contains_rules else 0
+            for bit, rule_index in enumerate(self._contains_rules):
+                if found >> bit & 1:
+                    matches[row, rule_index] = True
+            for rule_index, regex in self._regexes:
+                if regex.search(text):
+                    matches[row, rule_index] = True
+        return matches
+
+    def match(self, descriptions, amounts, dates):
+        """Return, per row, the index of the winning rule in self.rules, or -1."""
+        result = np.full(len(descriptions), -1, dtype=np.int64)
+        if not self.rules or not len(result):
+            return result
+
+        # Repeated descriptions (the common case for bank exports) are matched once
+        codes, distinct = pd.factorize(pd.Series(descriptions, dtype=object).fillna('').str.lower())
+        text = self._text_matches(distinct)
+        amounts = np.asarray(amounts, dtype=float)
+        dates = np.asarray(dates, dtype='datetime64[D]')
+
+        for rule_index in range(len(self.rules)):
+            candidate = (result == -1) & text[codes, rule_index]
+            candidate &= (amounts >= self._min_amount[rule_index]) & (amounts <= self._max_amount[rule_index])
+            if not np.isnat(self._start_date[rule_index]):
+                candidate &= dates >= self._start_date[rule_index]
+            if not np.isnat(self._end_date[rule_index]):
+                candidate &= dates <= self._end_date[rule_index]
+            result[candidate] = rule_index
+
+        return result
+
+
+def load_matcher(user_id):
+    """Compile the user's rules in priority order."""
+    rules = CategoryRule.query.filter_by(user_id=user_id).order_by(
+        CategoryRule.priority, CategoryRule.id).all()
+    return RuleMatcher(rules)
+
+
+def categorize_rows(matcher, rows, override=False):
+    """
+    Fill category/subcategory on import rows (dicts) from the matching rules.
+
+    Only rows without a category are considered, so a category the client
+    sent is kept, unless override is set. Returns the number of rows a rule
+    categorized; the other rows keep their values.
+    """
+    rows = rows if override else [row for row in rows if not row.get('category')]
+    if not rows:
+        return 0
+    matched = matcher.match(
+        [row.get('description') for row in rows],
+        [float(row['amount']) for row in rows],
+        [row['transaction_date'] for row in rows]
+    )
+    for row, rule_index in zip(rows, matched):
+        if rule_index >= 0:
+            rule = matcher.rules[rule_index]
+            row['category'] = rule.category
+            row['subcategory'] = rule.subcategory
+    return int((matched >= 0).sum())
+
+
+def apply_rules_to_history(user_id, conditions=(), dry_run=False):
+    """
+    Re-categorize existing transactions with the user's rules.
+
+    Only the columns the matcher needs are loaded. Rows whose category and
+    subcategory already agree with their rule are skipped, and the rest are
+    written with one UPDATE per rule (chunked by id).
+    """
+    matcher = load_matcher(user_id)
+    rows = db.session.query(
+        Transaction.id, Transaction.description, Transaction.amount, Transaction.transaction_date,
+        Transaction.category, Transaction.subcategory
+    ).filter(Transaction.user_id == user_id, *conditions).all()
+
+    if not rows or not matcher.rules:
+        return {'scanned': len(rows), 'matched': 0, 'updated': 0, 'by_rule': {}}
+
+    ids, descriptions, amounts, dates, categories, subcategories = (list(column) for column in zip(*rows))
+    matched = matcher.match(descriptions, amounts, dates)
+    ids = np.asarray(ids)
+    categories = np.asarray(categories, dtype=object)
+    subcategories = np.asarray(subcategories, dtype=object)
+
+    by_rule = {}
+    updated = 0
+    change_seq = None
+    for rule_index, rule in enumerate(matcher.rules):
+        hits = matched == rule_index
+        if not hits.any():
+            continue
+        changed = hits & ((categories != rule.category) | (subcategories != rule.subcategory))
+        changed_ids = ids[changed].tolist()
+        by_rule[rule.id] = {'matched': int(hits.sum()), 'updated': len(changed_ids)}
+        updated += len(changed_ids)
+
+        if dry_run or not changed_ids:
+            continue
+        if change_seq is None:
+            change_seq = next_change_seq(user_id)
+        for start in range(0, len(changed_ids), UPDATE_CHUNK_SIZE):
+            db.session.execute(
+                db.update(Transaction).where(
+                    Transaction.user_id == user_id,
+                    Transaction.id.in_(changed_ids[start:start + UPDATE_CHUNK_SIZE])
+                ).values(category=rule.category, subcategory=rule.subcategory, change_seq=change_seq,
+                         version=Transaction.version + 1),
+                execution_options={'synchronize_session': False}
+            )
+
+    if not dry_run:
+        db.session.commit()
+
+    return {
+        'scanned': len(rows),
+        'matched': int((matched >= 0).sum()),
+        'updated': updated,
+        'by_rule': by_rule,
+    }
@@ -0,0 +1,62 @@
+import re
+from sqlalchemy import column, desc, literal, literal_column, table
+from app import db
+from app.models import Transaction, description_tsvector
+
+
+SEARCH_MODES = ('fts', 'fuzzy')
+
+# FTS5 shadow table created for SQLite in app.models
+_sqlite_fts = table('transactions_fts', column('rowid'))
+
+
+def _search_terms(q):
+    """Split a free-text query into lowercase word tokens (drops query-syntax characters)."""
+    return re.findall(r'\w+', q.lower())
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def build_search_query(user_id, q, mode='fts'):
+    """
+    Build a ranked search query over the user's transaction descriptions.
+
+    Yields (Transaction, rank) rows ordered best match first. 'fts' matches every
+    word as a prefix; 'fuzzy' matches substrings and, on PostgreSQL, misspellings.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"'mode' must be one of: {', '.join(SEARCH_MODES)}")
+    terms = _search_terms(q or '')
+    if not terms:
+        raise ValueError("'q' must contain at least one word")
+
+    dialect = db.session.get_bind().dialect.name
+    substring = Transaction.description.ilike(f'%{_escape_like(q.strip())}%', escape='\\')
+
+    if dialect == 'postgresql':
+        if mode == 'fts':
+            tsquery = db.func.to_tsquery(
+                literal_column("'simple'::regconfig"), ' & '.join(f'{term}:*' for term in terms))
+            tsvector = description_tsvector(Transaction.description)
+            rank = db.func.ts_rank_cd(tsvector, tsquery)
+            match = tsvector.op('@@')(tsquery)
+        else:
+            # Both operators are served by the pg_trgm GIN index
+            rank = db.func.similarity(Transaction.description, q)
+            match = Transaction.description.op('%')(q) | substring
+        query = db.session.query(Transaction, rank.label('rank')).filter(match)
+    elif mode == 'fts':
+        fts_table = literal_column('transactions_fts')
+        rank = -db.func.bm25(fts_table)
+        query = db.session.query(Transaction, rank.label('rank')).join(
+            _sqlite_fts, _sqlite_fts.c.rowid == Transaction.id
+        ).filter(fts_table.op('MATCH')(' '.join(f'"{term}"*' for term in terms)))
+    else:
+        # No trigram support; rank substring hits by how much of the description they cover
+        rank = literal(float(len(q.strip()))) / db.func.length(Transaction.description)
+        query = db.session.query(Transaction, rank.label('rank')).filter(substring)
+
+    return query.filter(Transaction.user_id == user_id).order_by(
+        desc('rank'), Transaction.transaction_date.desc(), Transaction.id.desc())
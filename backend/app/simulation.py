@@ -0,0 +1,93 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from app.forecasting import MIN_TRAINING_MONTHS, InsufficientData, fit_holt_winters_batch
+
+
+DEFAULT_PATHS = 10000
+MAX_PATHS = 50000
+DEFAULT_MONTHS = 24
+MAX_MONTHS = 60
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def parse_simulation_args(args):
+    """Validate /simulate query parameters. Returns (months, paths, starting_balance, seed)."""
+    months = args.get('months', DEFAULT_MONTHS, type=int)
+    paths = args.get('paths', DEFAULT_PATHS, type=int)
+    starting_balance = args.get('starting_balance', 0.0, type=float)
+    seed = args.get('seed', type=int)
+    if not 1 <= months <= MAX_MONTHS:
+        raise ValueError(f"'months' must be between 1 and {MAX_MONTHS}")
+    if not 100 <= paths <= MAX_PATHS:
+        raise ValueError(f"'paths' must be between 100 and {MAX_PATHS}")
+    return months, paths, starting_balance, seed
+
+
+def simulate_cashflow(month_starts, categories, matrix, is_income, months=DEFAULT_MONTHS, paths=DEFAULT_PATHS,
+                      starting_balance=0.0, seed=None, now=None):
+    """
+    Monte Carlo simulation of the balance over the coming months.
+
+    matrix holds each category's complete monthly totals (see
+    analytics.monthly_category_matrix) and is_income flags the income rows.
+    Every category gets a Holt-Winters point forecast (one batch fit), and each
+    path adds in-sample residuals drawn from one historical month for all
+    categories at once, so categories that move together keep doing so.
+    Simulated totals are floored at zero. Everything is computed on
+    (paths x months x categories) arrays; no Python loop runs per path.
+
+    The monthly totals are the ones the projections use (monthly_series), but
+    on one shared calendar with empty months as 0 rather than omitted: drawing
+    one month for every category needs the rows aligned. Residuals come from
+    the batch fit's one-step-ahead errors after its initialization season, so
+    two full years of history are needed. If the history ends before the month
+    ahead of 'now', the months in between are fitted as empty months, so the
+    forecast starts in now's month.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    if matrix.shape[1] < MIN_TRAINING_MONTHS:
+        raise InsufficientData(
+            "Insufficient monthly data",
+            f"Need at least {MIN_TRAINING_MONTHS} complete months of data. Found {matrix.shape[1]} months.")
+
+    # The forecast starts at now's month, so months since the last transaction are empty (0) months
+    now = now or datetime.now()
+    month_starts = np.asarray(month_starts, dtype='datetime64[M]')
+    gap = int((np.datetime64(f'{now.year:04d}-{now.month:02d}', 'M') - month_starts[-1]).astype(int)) - 1
+    if gap > 0:
+        matrix = np.hstack([matrix, np.zeros((matrix.shape[0], gap))])
+        month_starts = np.concatenate([month_starts, month_starts[-1] + np.arange(1, gap + 1)])
+
+    forecasts, residuals = fit_holt_winters_batch(matrix, months)
+    rng = np.random.default_rng(seed)
+    drawn_months = rng.integers(0, residuals.shape[1], size=(paths, months))
+
+    # (paths, months, categories): forecast plus the residuals of the drawn month
+    simulated = forecasts.T[None, :, :] + residuals.T[drawn_months]
+    np.maximum(simulated, 0, out=simulated)
+    sign = np.where(np.asarray(is_income, dtype=bool), 1.0, -1.0)
+    net = simulated @ sign
+    balance = starting_balance + np.cumsum(net, axis=1)
+
+    dates = pd.date_range(start=pd.Timestamp(year=now.year, month=now.month, day=1), periods=months, freq='MS')
+    expected = simulated.mean(axis=0)
+    bands = np.percentile(balance, PERCENTILES, axis=0)
+    net_bands = np.percentile(net, PERCENTILES, axis=0)
+    return {
+        'paths': paths,
+        'starting_balance': starting_balance,
+        'months': [d.strftime('%Y-%m') for d in dates],
+        'balance': {f'p{p}': band.tolist() for p, band in zip(PERCENTILES, bands)},
+        'net': {f'p{p}': band.tolist() for p, band in zip(PERCENTILES, net_bands)},
+        # Share of paths below zero in each month, and at any point in the horizon
+        'deficit_probability': (balance < 0).mean(axis=0).tolist(),
+        'probability_of_deficit': float((balance < 0).any(axis=1).mean()),
+        'categories': [{
+            'name': name,
+            'type': 'income' if income else 'expense',
+            'expected': expected[:, i].tolist(),
+        } for i, (name, income) in enumerate(zip(categories, is_income))],
+        # The complete months the model was fitted on
+        'history': {'from': str(month_starts[0]), 'to': str(month_starts[-1])},
+    }
@@ -0,0 +1,44 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class SQLiteFile:
+    """
+    Base for state kept in an on-disk SQLite file shared by every worker process on the host.
+
+    Each thread keeps its own connection in WAL mode, so readers never wait
+    for the writer. Subclasses list their CREATE statements in SCHEMA and set
+    SYNCHRONOUS ('FULL' when an acknowledged write must survive power loss).
+    """
+
+    SCHEMA = []
+    SYNCHRONOUS = 'NORMAL'
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        connection = self._connection()
+        for statement in self.SCHEMA:
+            connection.execute(statement)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(f'PRAGMA synchronous={self.SYNCHRONOUS}')
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        """A write transaction that takes the lock up front (BEGIN IMMEDIATE), committed unless the block raises."""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
@@ -0,0 +1,25 @@
+import logging
+from app.database import ensure_partitions
+from app.ingest import start_ingest_flusher
+from app.precompute import start_precompute_scheduler
+
+
+logger = logging.getLogger(__name__)
+
+
+def start_background_jobs(app):
+    """
+    Server startup shared by run.py and asgi.py (app is the Flask app).
+
+    Makes sure next year's transaction partition exists, then starts the
+    nightly scheduler (PROJECTIONS_PRECOMPUTE_AT) and the write-behind ingest
+    flusher (INGEST_WRITE_BEHIND). Every server worker calls this; the job lock
+    and queue claims keep them from doing the same work twice.
+    """
+    try:
+        ensure_partitions(app)
+    except Exception as e:
+        logger.error(f"Could not ensure transaction partitions: {str(e)}")
+
+    start_precompute_scheduler(app)
+    start_ingest_flusher(app)
@@ -0,0 +1,12 @@
+"""
+ASGI entry point: the async variant of run.py.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+"""
+from app.asgi import create_async_app
+from app.startup import start_background_jobs
+
+app = create_async_app()
+
+# The same startup as run.py: partition check, nightly precompute and write-behind flusher
+start_background_jobs(app.state.flask_app)
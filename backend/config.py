@@ -8,3 +8,80 @@ class Config:
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your_jwt_secret_key')
     JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES_HOURS', '24')))
+    # Yearly transaction partitions are kept this many years ahead of the current year
+    TRANSACTION_PARTITION_YEARS_AHEAD = int(os.getenv('TRANSACTION_PARTITION_YEARS_AHEAD', '2'))
+    # Optional read replica for read-only endpoints; unset means everything uses the primary
+    SQLALCHEMY_REPLICA_URI = os.getenv('DATABASE_REPLICA_URL')
+    # Per-user in-memory analytics cache: total size budget and maximum entry age (entries are also
+    # checked against users.change_seq on every read, so other workers' writes are seen at once)
+    ANALYTICS_CACHE_MAX_BYTES = int(os.getenv('ANALYTICS_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv('ANALYTICS_CACHE_TTL_SECONDS', '300'))
+    # Delta-sync tombstones older than this are compacted (clients further behind must resync fully)
+    TOMBSTONE_RETENTION_DAYS = int(os.getenv('TOMBSTONE_RETENTION_DAYS', '90'))
+    # ASGI variant (asgi.py): async driver URL (derived from DATABASE_URL when unset), pool size,
+    # and forecasting worker processes (default: one per CPU)
+    ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL')
+    ASYNC_POOL_SIZE = int(os.getenv('ASYNC_POOL_SIZE', '20'))
+    ASYNC_MAX_OVERFLOW = int(os.getenv('ASYNC_MAX_OVERFLOW', '10'))
+    FORECAST_WORKERS = int(os.getenv('FORECAST_WORKERS', '0')) or None
+    # Admission control for CPU-heavy endpoints, per process: concurrent runs, queue length and wait,
+    # per-user token bucket (tokens/second and burst), and Retry-After for 503s
+    ADMISSION_LIMITS = {
+        'projections': {
+            'max_concurrent': int(os.getenv('PROJECTIONS_MAX_CONCURRENT', '2')),
+            'max_waiting': int(os.getenv('PROJECTIONS_MAX_WAITING', '4')),
+            'wait_timeout': float(os.getenv('PROJECTIONS_WAIT_TIMEOUT_SECONDS', '10')),
+            'rate': float(os.getenv('PROJECTIONS_RATE_PER_SECOND', '0.5')),
+            'burst': int(os.getenv('PROJECTIONS_BURST', '5')),
+            'retry_after': 5,
+        },
+        'simulate': {
+            'max_concurrent': int(os.getenv('SIMULATE_MAX_CONCURRENT', '2')),
+            'max_waiting': 4,
+            'wait_timeout': 10.0,
+            'rate': 0.2,
+            'burst': 5,
+            'retry_after': 5,
+        },
+        'backtest': {
+            'max_concurrent': 1,
+            'max_waiting': 2,
+            'wait_timeout': 30.0,
+            'rate': 1 / 60,
+            'burst': 3,
+            'retry_after': 30,
+        },
+        'restore': {
+            'max_concurrent': 1,
+            'max_waiting': 2,
+            'wait_timeout': 30.0,
+            'rate': 1 / 60,
+            'burst': 3,
+            'retry_after': 30,
+        },
+    }
+    # Daily in-process projection precompute at this local time ('HH:MM'); unset to rely on
+    # 'flask precompute-projections' from cron instead
+    PROJECTIONS_PRECOMPUTE_AT = os.getenv('PROJECTIONS_PRECOMPUTE_AT', '02:30')
+    # Shared GET response cache: 'sqlite' (one file shared by all workers on the host), 'memory'
+    # (per process) or empty to disable; entries expire after the TTL and are evicted LRU past the budget
+    RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'sqlite')
+    RESPONSE_CACHE_PATH = os.getenv('RESPONSE_CACHE_PATH')
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+    RESPONSE_CACHE_TTL_SECONDS = float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '60'))
+    # Write-behind ingestion (POST /api/transactions/ingest): rows are queued in a SQLite file and
+    # inserted in micro-batches of up to INGEST_BATCH_ROWS every INGEST_FLUSH_INTERVAL_MS
+    INGEST_WRITE_BEHIND = os.getenv('INGEST_WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+    INGEST_QUEUE_PATH = os.getenv('INGEST_QUEUE_PATH')
+    INGEST_FLUSH_INTERVAL_MS = int(os.getenv('INGEST_FLUSH_INTERVAL_MS', '50'))
+    INGEST_BATCH_ROWS = int(os.getenv('INGEST_BATCH_ROWS', '500'))
+    INGEST_MAX_ATTEMPTS = int(os.getenv('INGEST_MAX_ATTEMPTS', '5'))
+    INGEST_RETENTION_SECONDS = int(os.getenv('INGEST_RETENTION_SECONDS', '3600'))
+    # Most GET requests one POST /api/batch may carry
+    BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', '20'))
+    # Logging: root level, per-logger overrides ('app.routes=DEBUG,sqlalchemy.engine=WARNING'),
+    # fraction of DEBUG records kept, and queue size (records beyond it are dropped, never waited on)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '0.1'))
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
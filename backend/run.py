@@ -1,9 +1,13 @@
 import signal
 import sys
 from app import create_app
+from app.startup import start_background_jobs
 
 app = create_app()
 
+# Partition check, nightly projection precompute and write-behind ingestion flusher
+start_background_jobs(app)
+
 def handle_sigterm(signal_number, frame):
     print("Received SIGTERM, exiting cleanly...")
     sys.exit(0)
@@ -0,0 +1,75 @@
+"""
+User Story Tests: Admission Control
+Tests that expensive endpoints are rate limited and capped in concurrency with fast 429/503 responses.
+"""
+import pytest
+from app import create_app, db
+from test_config import TestConfig
+
+
+@pytest.fixture
+def app():
+    """Projections limited to one run at a time, no queue, and a burst of two requests per user."""
+    class AdmissionTestConfig(TestConfig):
+        ADMISSION_LIMITS = {
+            'projections': {'max_concurrent': 1, 'max_waiting': 0, 'rate': 0.001, 'burst': 2, 'retry_after': 7},
+        }
+
+    app = create_app(config_object=AdmissionTestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+class TestAdmissionControl:
+    """Test cases for admission control."""
+
+    def test_rate_limit_per_user(self, client, auth_headers):
+        """
+        User Story: As a user, I want the app to stay responsive when others run heavy reports
+        Test Case 1: A user past their burst gets 429 with Retry-After, without running the endpoint
+        """
+        # A different category each time: answers already stored are served without a live fit
+        for category in ('Food', 'Rent'):
+            assert client.get(f'/api/projections/{category}', headers=auth_headers).status_code == 400
+
+        response = client.get('/api/projections/Travel', headers=auth_headers)
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) > 0
+
+        metrics = client.get('/api/metrics').get_json()['admission']['projections']
+        assert metrics['admitted'] == 2
+        assert metrics['rejected_rate_limited'] == 1
+
+    def test_saturated_endpoint_rejected(self, app, client, auth_headers):
+        """
+        User Story: As a user, I want the app to stay responsive when others run heavy reports
+        Test Case 2: With every slot busy and no queue room, requests get 503 at once
+        """
+        gate = app.extensions['admission']['projections']
+        assert gate.acquire()
+        try:
+            response = client.get('/api/projections/Food', headers=auth_headers)
+        finally:
+            gate.release()
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '7'
+        metrics = client.get('/api/metrics').get_json()['admission']['projections']
+        assert metrics['rejected_overloaded'] == 1
+        assert metrics['in_flight'] == 0
+
+    def test_cheap_endpoints_unaffected(self, app, client, auth_headers):
+        """
+        User Story: As a user, I want the app to stay responsive when others run heavy reports
+        Test Case 3: Other endpoints are served while projections are saturated
+        """
+        gate = app.extensions['admission']['projections']
+        assert gate.acquire()
+        try:
+            assert client.get('/api/transactions', headers=auth_headers).status_code == 200
+            assert client.get('/api/categories', headers=auth_headers).status_code == 200
+        finally:
+            gate.release()
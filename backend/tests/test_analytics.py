@@ -0,0 +1,143 @@
+"""
+User Story Tests: Analytics Endpoints
+Tests for the aggregated views computed in the database.
+"""
+import pytest
+from datetime import date
+
+
+@pytest.fixture
+def history(app, test_user, second_user):
+    """Create two years of expense and income transactions for the test user."""
+    from app.models import Transaction
+    from app import db
+
+    rows = [
+        (date(2023, 1, 10), 'Mat', 'Kiwi', 100.00),
+        (date(2023, 1, 20), 'Mat', 'Rema 1000', 50.00),
+        (date(2023, 2, 5), 'Transport', 'Bensin', 300.00),
+        (date(2024, 1, 15), 'Mat', 'Kiwi', 200.00),
+        (date(2024, 3, 1), 'Hus', None, 1000.00),
+        (date(2024, 3, 25), 'Inntekt', 'Lønn', 20000.00),
+    ]
+    with app.app_context():
+        for tx_date, category, subcategory, amount in rows:
+            db.session.add(Transaction(
+                transaction_date=tx_date,
+                category=category,
+                subcategory=subcategory,
+                amount=amount,
+                user_id=test_user['id']
+            ))
+        db.session.add(Transaction(
+            transaction_date=date(2022, 1, 1),
+            category='Mat',
+            amount=5000.00,
+            user_id=second_user['id']
+        ))
+        db.session.commit()
+
+
+class TestMonthlyComparison:
+    """Test cases for /api/monthly-comparison."""
+
+    def test_matrix_covers_every_year_and_month(self, client, auth_headers, history):
+        """
+        User Story: As a user, I want to compare months across years
+        Test Case 1: Returns one 12-month row per year of the user's own data
+        """
+        response = client.get('/api/monthly-comparison', headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['years'] == [2023, 2024]
+        assert data['matrix']['2023'][:3] == [150.0, 300.0, 0.0]
+        assert data['matrix']['2024'][:3] == [200.0, 0.0, 21000.0]
+        assert all(len(row) == 12 for row in data['matrix'].values())
+
+    def test_category_filter_keeps_years_without_matches(self, client, auth_headers, history):
+        """
+        User Story: As a user, I want to compare months across years
+        Test Case 2: Filtering by category keeps years that have no matching rows
+        """
+        response = client.get('/api/monthly-comparison?category=Transport', headers=auth_headers)
+
+        data = response.get_json()
+        assert data['years'] == [2023, 2024]
+        assert data['matrix']['2023'][1] == 300.0
+        assert data['matrix']['2024'] == [0.0] * 12
+
+    def test_subcategory_and_averages(self, client, auth_headers, history):
+        """
+        User Story: As a user, I want to compare months across years
+        Test Case 3: Averages cover every elapsed year, counting missing months as zero
+        """
+        response = client.get('/api/monthly-comparison?category=Mat&subcategory=Kiwi',
+                              headers=auth_headers)
+
+        data = response.get_json()
+        assert data['matrix']['2023'][0] == 100.0
+        assert data['matrix']['2024'][0] == 200.0
+        assert data['averages'][0] == 150.0
+        assert data['averages'][1] == 0.0
+
+    def test_income_only(self, client, auth_headers, history):
+        """
+        User Story: As a user, I want to compare my income across years
+        Test Case 4: income=true restricts the matrix and its years to income rows
+        """
+        response = client.get('/api/monthly-comparison?income=true', headers=auth_headers)
+
+        data = response.get_json()
+        assert data['years'] == [2024]
+        assert data['matrix']['2024'][2] == 20000.0
+
+
+class TestCategoryPivot:
+    """Test cases for /api/pivot."""
+
+    def test_pivot_totals_for_selected_year(self, client, auth_headers, history):
+        """
+        User Story: As a user, I want a category by month overview for a year
+        Test Case 1: Expense rows, column totals and grand total for the year only
+        """
+        response = client.get('/api/pivot?year=2024', headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['years'] == [2023, 2024]
+        rows = {row['category']: row for row in data['expenses']['rows']}
+        assert set(rows) == {'Mat', 'Hus'}
+        assert rows['Mat']['values'][0] == 200.0
+        assert rows['Hus']['total'] == 1000.0
+        assert data['expenses']['totals'][2] == 1000.0
+        assert data['expenses']['grand_total'] == 1200.0
+        assert data['breakdown'] is None
+
+    def test_income_is_kept_out_of_expenses(self, client, auth_headers, history):
+        """
+        User Story: As a user, I want a category by month overview for a year
+        Test Case 2: Income is reported in its own row
+        """
+        data = client.get('/api/pivot?year=2024', headers=auth_headers).get_json()
+
+        assert data['income']['values'][2] == 20000.0
+        assert data['income']['total'] == 20000.0
+
+    def test_breakdown_with_uncategorized_bucket(self, client, auth_headers, history):
+        """
+        User Story: As a user, I want a subcategory breakdown for a category
+        Test Case 3: Breakdown rows include an Uncategorized bucket and totals
+        """
+        data = client.get('/api/pivot?year=2023&breakdown=Mat', headers=auth_headers).get_json()
+
+        rows = {row['subcategory']: row for row in data['breakdown']['rows']}
+        assert set(rows) == {'Kiwi', 'Rema 1000', 'Uncategorized'}
+        assert rows['Kiwi']['values'][0] == 100.0
+        assert rows['Uncategorized']['total'] == 0.0
+        assert data['breakdown']['grand_total'] == 150.0
+
+        data = client.get('/api/pivot?year=2024&breakdown=Hus', headers=auth_headers).get_json()
+        assert data['breakdown']['rows'] == [
+            {'subcategory': 'Uncategorized', 'values': [0.0, 0.0, 1000.0] + [0.0] * 9, 'total': 1000.0}
+        ]
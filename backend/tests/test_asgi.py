@@ -0,0 +1,159 @@
+"""
+User Story Tests: Async Application
+Tests that the ASGI variant serves the same API as the Flask app.
+"""
+import pytest
+from datetime import date, timedelta
+
+pytest.importorskip('starlette')
+pytest.importorskip('aiosqlite')
+
+
+@pytest.fixture
+def async_app(tmp_path, test_user):
+    """The ASGI app and its Flask app sharing one SQLite file (async and sync drivers)."""
+    from app import db
+    from app.asgi import create_async_app
+    from app.auth_utils import generate_token
+    from app.models import Transaction, User
+    from test_config import TestConfig
+
+    class AsyncTestConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'app.db'}"
+        FORECAST_WORKERS = 1
+
+    app = create_async_app(AsyncTestConfig)
+    with app.state.flask_app.app_context():
+        db.create_all()
+        user = User(username=test_user['username'], email=test_user['email'])
+        user.set_password(test_user['password'])
+        db.session.add(user)
+        db.session.flush()
+        start = date(2022, 1, 15)
+        for month in range(30):
+            db.session.add(Transaction(transaction_date=start + timedelta(days=31 * month), category='Food',
+                                       subcategory='Groceries', description=f'Shop {month}',
+                                       amount=1000 + 10 * (month % 12), user_id=user.id))
+        db.session.commit()
+        app.state.token = generate_token(user.id)
+    return app
+
+
+@pytest.fixture
+def async_client(async_app):
+    from starlette.testclient import TestClient
+
+    with TestClient(async_app) as client:
+        client.headers['Authorization'] = f'Bearer {async_app.state.token}'
+        yield client
+
+
+class TestAsyncApp:
+    """Test cases for the ASGI variant."""
+
+    def test_native_read_endpoints(self, async_client):
+        """
+        User Story: As an operator, I want an async server that handles many concurrent reads
+        Test Case 1: Categories and filtered, paginated transactions match the Flask responses
+        """
+        assert async_client.get('/api/categories').json() == {'Food': ['Groceries']}
+
+        page = async_client.get('/api/transactions?start_date=2023-01-01&sort=-amount&page=1&per_page=5').json()
+        assert page['total'] == 18
+        assert len(page['items']) == 5
+        assert page['items'][0]['amount'] == 1110.0
+        assert page['seq'] == async_client.get('/api/transactions?page=1').json()['seq'] > 0
+
+        assert async_client.get('/api/transactions?sort=nope').status_code == 400
+
+    def test_authentication(self, async_client):
+        """
+        User Story: As an operator, I want an async server that handles many concurrent reads
+        Test Case 2: Native endpoints enforce the same token rules
+        """
+        assert async_client.get('/api/transactions', headers={'Authorization': ''}).status_code == 401
+        assert async_client.get('/api/transactions', headers={'Authorization': 'Bearer bad'}).status_code == 401
+
+    def test_other_routes_served_by_flask(self, async_client):
+        """
+        User Story: As an operator, I want an async server that handles many concurrent reads
+        Test Case 3: Writes go through the mounted Flask app and are visible to native reads
+        """
+        response = async_client.post('/api/transaction', json={
+            'transaction_date': '2024-12-24', 'category': 'Gifts', 'description': 'Presents', 'amount': 500})
+        assert response.status_code == 201
+
+        assert 'Gifts' in async_client.get('/api/categories').json()
+
+    def test_projections_run_in_process_pool(self, async_client):
+        """
+        User Story: As an operator, I want an async server that handles many concurrent reads
+        Test Case 4: Projections are computed off the event loop with the same response shape
+        """
+        data = async_client.get('/api/projections/Food').json()
+
+        assert len(data['projected']) >= 12
+        assert data['historical'][0] == {'date': '2022-01', 'value': 1000.0}
+        assert async_client.get('/api/projections/Unknown').json()['error'] == 'Insufficient data'
+
+        # Hierarchical mode is handed to the Flask app
+        data = async_client.get('/api/projections/Food?hierarchical=true').json()
+        assert data['subcategories'][0]['name'] == 'Groceries'
+
+    def test_projections_admission_controlled(self, async_app, async_client):
+        """
+        User Story: As an operator, I want the server to stay responsive when CPU-heavy requests pile up
+        Test Case 5: Live fits under ASGI go through the same projections gate as the Flask route
+        """
+        from app.admission import AdmissionGate
+
+        gate = AdmissionGate('projections', max_concurrent=1, max_waiting=0, wait_timeout=0, rate=0.001, burst=2,
+                             retry_after=7)
+        async_app.state.flask_app.extensions['admission']['projections'] = gate
+
+        assert gate.acquire()  # another request holds the only slot
+        response = async_client.get('/api/projections/Food')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '7'
+        gate.release()
+
+        assert async_client.get('/api/projections/Food').status_code == 200
+        # Food is now stored, so ask for a category that needs a live fit
+        response = async_client.get('/api/projections/Unknown')
+        assert response.status_code == 429
+        assert 'Retry-After' in response.headers
+        assert gate.metrics()['in_flight'] == 0
+
+    def test_sparse_fieldsets(self, async_client):
+        """
+        User Story: As an operator, I want an async server that handles many concurrent reads
+        Test Case 6: ?fields= limits the returned fields and rejects unknown names, as in the Flask app
+        """
+        rows = async_client.get('/api/transactions?fields=transaction_date,amount').json()
+        assert len(rows) == 30
+        assert all(set(row) == {'id', 'transaction_date', 'amount'} for row in rows)
+
+        page = async_client.get('/api/transactions?fields=category&page=1&per_page=5').json()
+        assert page['total'] == 30
+        assert all(set(row) == {'id', 'category'} for row in page['items'])
+
+        response = async_client.get('/api/transactions?fields=amount,password_hash')
+        assert response.status_code == 400
+        assert 'password_hash' in response.json()['message']
+
+    def test_live_projection_stored(self, async_app, async_client):
+        """
+        User Story: As a user, I want the Projections page to load instantly
+        Test Case 7: A live fit is written to the projections table and served from it next time
+        """
+        from app import db
+        from app.models import Projection
+
+        first = async_client.get('/api/projections/Food').json()
+        with async_app.state.flask_app.app_context():
+            projection = Projection.query.filter_by(category='Food').one()
+            assert projection.result == first
+            projection.result = dict(projection.result, marker='stored')
+            db.session.commit()
+
+        assert async_client.get('/api/projections/Food').json()['marker'] == 'stored'
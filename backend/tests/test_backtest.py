@@ -0,0 +1,100 @@
+"""
+User Story Tests: Projection Backtesting
+Tests for the rolling-origin backtest of the projections model.
+"""
+import pytest
+import numpy as np
+from datetime import date
+from dateutil.relativedelta import relativedelta
+
+
+@pytest.fixture
+def category_history(app, test_user):
+    """30 months of seasonal Food spending and a short Transport history."""
+    from app.models import Transaction
+    from app import db
+
+    with app.app_context():
+        base_date = date(2022, 1, 15)
+        for i in range(30):
+            db.session.add(Transaction(transaction_date=base_date + relativedelta(months=i), category='Food',
+                                       amount=-(1000 + 200 * (i % 12 in (5, 6, 11)) + 5 * i),
+                                       user_id=test_user['id']))
+        for i in range(3):
+            db.session.add(Transaction(transaction_date=base_date + relativedelta(months=i), category='Transport',
+                                       amount=-50, user_id=test_user['id']))
+        db.session.commit()
+    yield
+    with app.app_context():
+        executor = app.extensions.pop('forecast_executor', None)
+        if executor is not None:
+            executor.shutdown()
+
+
+class TestProjectionBacktest:
+    """Test cases for projection backtesting."""
+
+    def test_error_curves(self):
+        """
+        User Story: As a user, I want to know how accurate my projections are
+        Test Case 1: Expanding-window folds are scored by months ahead
+        """
+        from app.backtest import run_backtests
+
+        months = np.arange('2021-01', '2024-01', dtype='datetime64[M]')
+        seasonal = 100 + 2 * np.arange(36) + 20 * np.sin(np.arange(36) * np.pi / 6)
+        result = run_backtests({'Food': (months, seasonal, 36), 'Gifts': (months[:20], seasonal[:20], 20)},
+                               folds=4, horizon=3)
+
+        assert result['skipped'] == ['Gifts']
+        curves = result['categories']['Food']
+        assert curves['horizons'] == [1, 2, 3]
+        # Origins 32..35: the last fold has one month left to score
+        assert curves['folds'] == [4, 3, 2]
+        assert len(curves['mae']) == 3
+        # A trending seasonal series: the model should beat repeating last year's value
+        assert curves['skill'][0] > 0
+
+    def test_backtest_endpoint_live(self, client, auth_headers, category_history):
+        """
+        User Story: As a user, I want to know how accurate my projections are
+        Test Case 2: Non-default folds are computed live on the process pool, per category
+        """
+        response = client.get('/api/backtest?folds=2&horizon=6', headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['folds'] == 2
+        assert data['skipped'] == ['Transport']
+        food = data['categories']['Food']
+        assert food['horizons'] == [1, 2, 3, 4, 5, 6]
+        assert food['folds'][:2] == [2, 1]
+        assert food['mae'][0] >= 0
+
+    def test_backtest_served_from_nightly_run(self, app, client, runner, auth_headers, category_history):
+        """
+        User Story: As a user, I want to know how accurate my projections are
+        Test Case 3: The default backtest is precomputed and served from the table while fresh
+        """
+        from app.models import ForecastBacktest
+        from app import db
+
+        runner.invoke(args=['precompute-projections'])
+        with app.app_context():
+            stored = ForecastBacktest.query.one()
+            assert stored.result['categories']['Food']['folds'][0] > 0
+            stored.result = dict(stored.result, marker='stored')
+            db.session.commit()
+
+        data = client.get('/api/backtest?category=Food', headers=auth_headers).get_json()
+        assert data['marker'] == 'stored'
+        assert list(data['categories']) == ['Food']
+        assert data['skipped'] == []
+
+    def test_backtest_validation(self, client, auth_headers):
+        """
+        User Story: As a user, I want to know how accurate my projections are
+        Test Case 4: Rejects out-of-range folds and horizons
+        """
+        assert client.get('/api/backtest?folds=0', headers=auth_headers).status_code == 400
+        assert client.get('/api/backtest?horizon=13', headers=auth_headers).status_code == 400
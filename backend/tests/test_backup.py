@@ -0,0 +1,106 @@
+"""
+User Story Tests: Columnar Backups
+Tests for Parquet/Arrow export and restore of transactions.
+"""
+import io
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+
+
+def transaction_summary(client, headers):
+    data = client.get('/api/transactions?sort=transaction_date', headers=headers).get_json()
+    return [(t['transaction_date'], t['category'], t['subcategory'], t['description'], t['amount']) for t in data]
+
+
+class TestExport:
+    """Test cases for /api/transactions/export."""
+
+    @pytest.mark.parametrize('fmt, magic', [('parquet', b'PAR1'), ('arrow', b'\xff\xff\xff\xff')])
+    def test_export_formats(self, client, auth_headers, multiple_transactions, fmt, magic):
+        """
+        User Story: As a user, I want to download a compact backup of my transactions
+        Test Case 1: Exports are Parquet files or Arrow IPC streams
+        """
+        response = client.get(f'/api/transactions/export?format={fmt}', headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.data.startswith(magic)
+        assert 'attachment' in response.headers['Content-Disposition']
+
+    def test_export_rejects_unknown_format(self, client, auth_headers):
+        """
+        User Story: As a user, I want to download a compact backup of my transactions
+        Test Case 2: Unknown formats return 400
+        """
+        assert client.get('/api/transactions/export?format=csv', headers=auth_headers).status_code == 400
+
+    def test_export_is_dictionary_encoded(self, app, multiple_transactions, test_user):
+        """
+        User Story: As a user, I want to download a compact backup of my transactions
+        Test Case 3: Categories are dictionary-encoded and each batch is its own row group
+        """
+        import pyarrow.parquet as pq
+        from app.backup import stream_export
+
+        with app.app_context():
+            data = b''.join(stream_export(test_user['id'], 'parquet', batch_size=2))
+
+        parquet_file = pq.ParquetFile(io.BytesIO(data))
+        assert parquet_file.metadata.num_rows == 3
+        assert parquet_file.metadata.num_row_groups == 2
+        assert pa.types.is_dictionary(parquet_file.schema_arrow.field('category').type)
+
+
+class TestRestore:
+    """Test cases for restoring exports."""
+
+    @pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+    def test_round_trip(self, client, auth_headers, multiple_transactions, fmt):
+        """
+        User Story: As a user, I want to restore my transactions from a backup
+        Test Case 1: Deleting everything and restoring brings back identical rows
+        """
+        before = transaction_summary(client, auth_headers)
+        backup = client.get(f'/api/transactions/export?format={fmt}', headers=auth_headers).data
+        client.delete('/api/transactions', json={'filter': {'start_date': '2000-01-01'}}, headers=auth_headers)
+
+        response = client.post('/api/transactions/restore', data={'file': (io.BytesIO(backup), 'backup')},
+                               headers={'Authorization': auth_headers['Authorization']})
+
+        assert response.status_code == 201
+        assert response.get_json() == {'restored': 3, 'skipped': 0}
+        assert transaction_summary(client, auth_headers) == before
+
+    def test_restore_skips_existing_rows(self, app, multiple_transactions, test_user):
+        """
+        User Story: As a user, I want to restore my transactions from a backup
+        Test Case 2: Restoring over existing data only adds what is missing, across batches
+        """
+        from app.backup import restore_transactions, stream_export
+        from app.models import Transaction
+
+        with app.app_context():
+            backup = b''.join(stream_export(test_user['id'], 'arrow', batch_size=1))
+            Transaction.query.filter_by(description='Dinner').delete()
+
+            result = restore_transactions(io.BytesIO(backup))
+
+            assert result == {'restored': 1, 'skipped': 2}
+            assert Transaction.query.count() == 3
+
+    def test_cli_export_and_restore(self, app, runner, multiple_transactions, test_user, second_user, tmp_path):
+        """
+        User Story: As an administrator, I want per-user backups from the command line
+        Test Case 3: export-transactions and restore-transactions move rows between users
+        """
+        from app.models import Transaction
+
+        path = tmp_path / 'backup.parquet'
+        result = runner.invoke(args=['export-transactions', str(path), '--user-id', str(test_user['id'])])
+        assert result.exit_code == 0
+
+        result = runner.invoke(args=['restore-transactions', str(path), '--user-id', str(second_user['id'])])
+        assert 'Restored 3 transaction(s)' in result.output
+        with app.app_context():
+            assert Transaction.query.filter_by(user_id=second_user['id']).count() == 3
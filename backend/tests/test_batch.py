@@ -0,0 +1,100 @@
+"""
+User Story Tests: Batch Requests
+Tests that several GET requests can be made in one round trip to /api/batch.
+"""
+from unittest.mock import patch
+
+
+class TestBatchRequests:
+    """Test cases for /api/batch."""
+
+    def test_batch_returns_each_response(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want pages to load in one round trip
+        Test Case 1: Each sub-request's status and body come back in order, matching the direct calls
+        """
+        response = client.post('/api/batch', headers=auth_headers, json={'requests': [
+            '/api/categories',
+            {'id': 'page', 'path': '/api/transactions?page=1&per_page=2'},
+        ]})
+
+        assert response.status_code == 200
+        categories, page = response.get_json()['responses']
+        assert categories['id'] == 0
+        assert categories['status'] == 200
+        assert categories['body'] == client.get('/api/categories', headers=auth_headers).get_json()
+        assert page['id'] == 'page'
+        assert page['status'] == 200
+        assert page['body'] == client.get('/api/transactions?page=1&per_page=2', headers=auth_headers).get_json()
+
+    def test_token_checked_once(self, client, auth_headers):
+        """
+        User Story: As a user, I want pages to load in one round trip
+        Test Case 2: The token is decoded for the batch only, not again for each sub-request
+        """
+        from app import auth_utils
+
+        with patch.object(auth_utils, 'decode_token', wraps=auth_utils.decode_token) as decode:
+            response = client.post('/api/batch', headers=auth_headers,
+                                   json={'requests': ['/api/categories', '/api/transactions', '/api/pivot']})
+
+        assert [r['status'] for r in response.get_json()['responses']] == [200, 200, 200]
+        assert decode.call_count == 1
+
+    def test_sub_request_failures_isolated(self, client, auth_headers):
+        """
+        User Story: As a user, I want pages to load in one round trip
+        Test Case 3: A failing sub-request gets its own status without failing the others
+        """
+        response = client.post('/api/batch', headers=auth_headers, json={'requests': [
+            '/api/no-such-route', '/api/projections/Food', '/api/categories'
+        ]})
+
+        statuses = [r['status'] for r in response.get_json()['responses']]
+        assert statuses == [404, 400, 200]
+
+    def test_batch_validation(self, client, auth_headers):
+        """
+        User Story: As a user, I want pages to load in one round trip
+        Test Case 4: Writes, nested batches, non-API paths and oversized batches are rejected
+        """
+        invalid = [
+            {},
+            {'requests': []},
+            {'requests': [{'method': 'DELETE', 'path': '/api/transaction/1'}]},
+            {'requests': ['/api/batch']},
+            {'requests': ['/health']},
+            {'requests': ['/api/categories'] * 21},
+        ]
+        for body in invalid:
+            assert client.post('/api/batch', headers=auth_headers, json=body).status_code == 400
+
+    def test_batch_requires_auth(self, client):
+        """
+        User Story: As a user, I want my data protected
+        Test Case 5: The batch itself needs a valid token
+        """
+        assert client.post('/api/batch', json={'requests': ['/api/categories']}).status_code == 401
+
+    def test_request_state_not_shared(self, app, client, auth_headers):
+        """
+        User Story: As a user, I want pages to load in one round trip
+        Test Case 6: A replica read does not route the next sub-request's queries to the replica
+        """
+        from flask import g, jsonify
+        from app import replica
+
+        seen = []
+
+        def record_state():
+            seen.append(g.get('read_replica'))
+            return jsonify({}), 200
+
+        with patch.object(replica, 'replica_caught_up', return_value=True), \
+                patch.dict(app.view_functions, {'api.health_check': record_state}):
+            response = client.post('/api/batch', headers=auth_headers, json={'requests': [
+                '/api/health', '/api/categories', '/api/health', '/api/transactions'
+            ]})
+
+        assert [r['status'] for r in response.get_json()['responses']] == [200, 200, 200, 200]
+        assert seen == [None, None]
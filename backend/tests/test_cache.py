@@ -0,0 +1,120 @@
+"""
+User Story Tests: Analytics Cache
+Tests for the per-user columnar transaction cache behind the analytics endpoints.
+"""
+import pytest
+from datetime import date
+
+
+ROWS = [
+    (date(2024, 1, 15), 15050, 'Food', 'Groceries'),
+    (date(2024, 1, 20), 6000, 'Transport', None),
+    (date(2023, 12, 31), -1005, 'Food', 'Restaurant'),
+]
+
+
+@pytest.mark.unit
+class TestColumnarCache:
+    """Unit tests for UserColumns and ColumnarCache."""
+
+    def test_columns_encode_rows(self):
+        """Dates become day/month ordinals, amounts øre and names integer codes."""
+        from app.cache import UserColumns
+
+        columns = UserColumns.from_rows(ROWS)
+
+        assert columns.amounts.tolist() == [15050, 6000, -1005]
+        assert columns.years.tolist() == [2024, 2024, 2023]
+        assert columns.months.tolist() == [1, 1, 12]
+        assert columns.categories == ('Food', 'Transport')
+        assert columns.subcategory_codes.tolist() == [0, -1, 1]
+        assert columns.category_mask('Food').tolist() == [True, False, True]
+        assert not columns.category_mask('Unknown').any()
+
+    def test_lru_eviction_respects_budget(self):
+        """The least recently used user is evicted once the byte budget is exceeded."""
+        from app.cache import ColumnarCache, UserColumns
+
+        size = UserColumns.from_rows(ROWS).nbytes
+        cache = ColumnarCache(max_bytes=size * 2, ttl=60)
+
+        def loader(_user_id):
+            return UserColumns.from_rows(ROWS)
+
+        cache.get(1, loader)
+        cache.get(2, loader)
+        cache.get(1, loader)
+        cache.get(3, loader)
+
+        assert cache.nbytes <= size * 2
+        cache.get(1, loader)
+        assert cache.hits == 2
+        cache.get(2, loader)
+        assert cache.misses == 4
+
+    def test_invalidation_discards_racing_load(self):
+        """A load that started before an invalidation is returned but not stored."""
+        from app.cache import ColumnarCache, UserColumns
+
+        cache = ColumnarCache(max_bytes=1024 * 1024, ttl=60)
+
+        def racing_loader(user_id):
+            cache.invalidate(user_id)
+            return UserColumns.from_rows(ROWS)
+
+        assert len(cache.get(1, racing_loader)) == 3
+        assert cache.nbytes == 0
+
+
+class TestCacheInvalidation:
+    """Test cases for keeping cached analytics current."""
+
+    def test_reads_are_served_from_cache(self, app, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want analytics pages to load instantly
+        Test Case 1: Repeated analytics requests load the user's rows only once
+        """
+        client.get('/api/categories', headers=auth_headers)
+        client.get('/api/pivot?year=2024', headers=auth_headers)
+        client.get('/api/monthly-comparison', headers=auth_headers)
+
+        cache = app.extensions['analytics_cache']
+        assert (cache.misses, cache.hits) == (1, 2)
+
+    def test_writes_invalidate_cache(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want analytics to reflect my changes immediately
+        Test Case 2: Adding a transaction updates cached categories and totals
+        """
+        assert 'Health' not in client.get('/api/categories', headers=auth_headers).get_json()
+
+        client.post('/api/transaction', json={
+            'transaction_date': '2024-01-25', 'category': 'Health', 'subcategory': 'Pharmacy',
+            'description': 'Vitamins', 'amount': 99.90
+        }, headers=auth_headers)
+
+        assert client.get('/api/categories', headers=auth_headers).get_json()['Health'] == ['Pharmacy']
+        pivot = client.get('/api/pivot?year=2024', headers=auth_headers).get_json()
+        assert pivot['expenses']['totals'][0] == pytest.approx(150.50 + 60 + 99.90)
+
+    def test_writes_by_other_processes_seen(self, app, client, auth_headers, test_user, multiple_transactions):
+        """
+        User Story: As a user, I want analytics to reflect my changes immediately
+        Test Case 3: A write this process did not handle (another worker, the ingest flusher) is seen on the next read
+        """
+        from app import db
+        from app.changes import next_change_seq
+        from app.models import Transaction
+
+        assert 'Health' not in client.get('/api/categories', headers=auth_headers).get_json()
+
+        # As another worker would: no after_request hook runs in this process
+        with app.app_context():
+            db.session.execute(db.insert(Transaction).values(
+                transaction_date=date(2024, 1, 25), category='Health', amount=-99, user_id=test_user['id'],
+                change_seq=next_change_seq(test_user['id'])))
+            db.session.commit()
+
+        assert 'Health' in client.get('/api/categories', headers=auth_headers).get_json()
+        cache = app.extensions['analytics_cache']
+        assert cache.misses == 2
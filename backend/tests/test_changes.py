@@ -0,0 +1,115 @@
+"""
+User Story Tests: Delta Sync
+Tests for /api/transactions/changes, the per-user change sequence and tombstones.
+"""
+from datetime import datetime, timedelta
+
+
+NEW_TRANSACTION = {
+    'transaction_date': '2024-03-01', 'category': 'Food', 'subcategory': 'Groceries',
+    'description': 'Kiwi', 'amount': 42
+}
+
+
+def sync(client, headers, since):
+    return client.get(f'/api/transactions/changes?since={since}', headers=headers).get_json()
+
+
+class TestDeltaSync:
+    """Test cases for delta sync."""
+
+    def test_initial_sync_returns_everything(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want the app to sync only what changed
+        Test Case 1: since=0 returns the full set and a sequence to resume from
+        """
+        data = sync(client, auth_headers, 0)
+
+        assert data['reset'] is True
+        assert len(data['upserts']) == 3
+        # The fixture adds all three rows in one flush, which takes one sequence number
+        assert data['seq'] == 1
+
+    def test_sync_returns_only_changes(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want the app to sync only what changed
+        Test Case 2: Inserts, updates and deletes after 'since' are returned, nothing else
+        """
+        first = sync(client, auth_headers, 0)
+        ids = [t['id'] for t in first['upserts']]
+
+        created = client.post('/api/transaction', json=NEW_TRANSACTION, headers=auth_headers).get_json()
+        client.put(f'/api/transaction/{ids[0]}', json={'amount': 151}, headers=auth_headers)
+        client.delete(f'/api/transaction/{ids[1]}', headers=auth_headers)
+
+        data = sync(client, auth_headers, first['seq'])
+
+        assert data['reset'] is False
+        assert sorted(t['id'] for t in data['upserts']) == sorted([created['id'], ids[0]])
+        assert data['deletes'] == [ids[1]]
+        assert sync(client, auth_headers, data['seq'])['upserts'] == []
+
+    def test_bulk_writes_are_tracked(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want the app to sync only what changed
+        Test Case 3: Bulk updates, bulk deletes and imports each advance the sequence
+        """
+        seq = sync(client, auth_headers, 0)['seq']
+
+        client.patch('/api/transactions', json={'filter': {'category': 'Food'}, 'changes': {'subcategory': 'Mat'}},
+                     headers=auth_headers)
+        data = sync(client, auth_headers, seq)
+        assert sorted(t['description'] for t in data['upserts']) == ['Dinner', 'Weekly shopping']
+
+        deleted = client.delete('/api/transactions', json={'filter': {'category': 'Transport'}},
+                                headers=auth_headers).get_json()['ids']
+        client.post('/api/transactions/import', json={'transactions': [NEW_TRANSACTION]}, headers=auth_headers)
+        data = sync(client, auth_headers, data['seq'])
+        assert data['deletes'] == deleted
+        assert [t['description'] for t in data['upserts']] == ['Kiwi']
+
+    def test_sequences_are_per_user(self, client, auth_headers, second_user, multiple_transactions):
+        """
+        User Story: As a user, I want the app to sync only what changed
+        Test Case 4: Another user's writes never appear in my changes
+        """
+        seq = sync(client, auth_headers, 0)['seq']
+        login = client.post('/api/auth/login', json={
+            'username': second_user['username'], 'password': second_user['password']}).get_json()
+        client.post('/api/transaction', json=NEW_TRANSACTION,
+                    headers={'Authorization': f"Bearer {login['token']}"})
+
+        data = sync(client, auth_headers, seq)
+        assert (data['seq'], data['upserts'], data['deletes']) == (seq, [], [])
+
+    def test_compacted_tombstones_force_reset(self, app, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want the app to sync only what changed
+        Test Case 5: Clients older than the compaction horizon are told to reset
+        """
+        from app.changes import compact_tombstones
+
+        seq = sync(client, auth_headers, 0)['seq']
+        ids = [t['id'] for t in sync(client, auth_headers, 0)['upserts']]
+        client.delete(f'/api/transaction/{ids[0]}', headers=auth_headers)
+
+        with app.app_context():
+            assert compact_tombstones(30, now=datetime.utcnow() + timedelta(days=31)) == 1
+
+        data = sync(client, auth_headers, seq)
+        assert data['reset'] is True
+        assert len(data['upserts']) == 2
+
+    def test_pages_carry_the_sequence(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want the app to sync only what changed
+        Test Case 6: A page of transactions carries the 'seq' to keep it current from
+        """
+        page = client.get('/api/transactions?page=1', headers=auth_headers).get_json()
+        assert page['seq'] == sync(client, auth_headers, 0)['seq']
+
+        client.delete(f"/api/transaction/{page['items'][0]['id']}", headers=auth_headers)
+
+        data = sync(client, auth_headers, page['seq'])
+        assert data['reset'] is False
+        assert data['deletes'] == [page['items'][0]['id']]
@@ -0,0 +1,121 @@
+"""
+User Story Tests: Duplicate Detection
+Tests for fingerprint-based duplicate detection on import and in stored data.
+"""
+import pytest
+from datetime import date
+
+
+EXPORT = [
+    {'transaction_date': '2024-01-05', 'amount': 59.90, 'description': 'Kiwi  Moss', 'category': 'Mat'},
+    {'transaction_date': '2024-01-05', 'amount': 59.90, 'description': 'Kiwi  Moss', 'category': 'Mat'},
+    {'transaction_date': '2024-01-07', 'amount': 300, 'description': 'Circle K', 'category': 'Transport'},
+]
+
+
+@pytest.mark.unit
+def test_fingerprint_ignores_case_and_whitespace():
+    """Cosmetic description differences map to the same fingerprint."""
+    from app.models import transaction_fingerprint
+
+    first = transaction_fingerprint(1, date(2024, 1, 5), 59.9, 'Kiwi  Moss ')
+    assert first == transaction_fingerprint(1, date(2024, 1, 5), '59.90', 'kiwi moss')
+    assert first != transaction_fingerprint(2, date(2024, 1, 5), 59.9, 'Kiwi Moss')
+    assert first != transaction_fingerprint(1, date(2024, 1, 5), 59.91, 'Kiwi Moss')
+
+
+class TestImportDuplicates:
+    """Test cases for duplicate handling on import."""
+
+    def test_reimport_skips_existing_rows(self, client, auth_headers):
+        """
+        User Story: As a user, I want overlapping imports not to create duplicates
+        Test Case 1: Re-importing the same export inserts nothing
+        """
+        first = client.post('/api/transactions/import', json={'transactions': EXPORT}, headers=auth_headers)
+        second = client.post('/api/transactions/import', json={'transactions': EXPORT}, headers=auth_headers)
+
+        assert first.get_json()['imported'] == 3
+        assert second.get_json() == {'imported': 0, 'categorized': 0, 'skipped': 3, 'duplicates': [0, 1, 2]}
+        assert len(client.get('/api/transactions', headers=auth_headers).get_json()) == 3
+
+    def test_overlapping_export_keeps_genuine_repeats(self, client, auth_headers):
+        """
+        User Story: As a user, I want overlapping imports not to create duplicates
+        Test Case 2: Duplicates are counted as a multiset, so new identical rows still import
+        """
+        client.post('/api/transactions/import', json={'transactions': EXPORT[:1]}, headers=auth_headers)
+
+        response = client.post('/api/transactions/import', json={'transactions': EXPORT}, headers=auth_headers)
+
+        data = response.get_json()
+        assert data['skipped'] == 1
+        assert data['imported'] == 2
+
+    def test_flag_policy_imports_and_reports(self, client, auth_headers, test_transaction):
+        """
+        User Story: As a user, I want overlapping imports not to create duplicates
+        Test Case 3: on_duplicate=flag imports the rows but reports which were duplicates
+        """
+        row = {'transaction_date': '2024-01-15', 'amount': 150.5, 'description': 'weekly SHOPPING',
+               'category': 'Food'}
+
+        response = client.post('/api/transactions/import',
+                               json={'transactions': [row], 'on_duplicate': 'flag'},
+                               headers=auth_headers)
+
+        assert response.get_json()['duplicates'] == [0]
+        assert response.get_json()['imported'] == 1
+
+
+class TestDuplicateScan:
+    """Test cases for /api/transactions/duplicates."""
+
+    def test_scan_reports_groups(self, client, auth_headers, test_transaction):
+        """
+        User Story: As a user, I want to find duplicates already in my data
+        Test Case 1: Rows sharing a fingerprint are reported as one group
+        """
+        client.post('/api/transactions/import', json={'transactions': EXPORT, 'on_duplicate': 'allow'},
+                    headers=auth_headers)
+
+        data = client.get('/api/transactions/duplicates', headers=auth_headers).get_json()
+
+        assert data['total_groups'] == 1
+        assert data['duplicate_rows'] == 1
+        assert [t['description'] for t in data['groups'][0]['transactions']] == ['Kiwi  Moss', 'Kiwi  Moss']
+
+    def test_edits_update_fingerprints(self, client, auth_headers, test_transaction):
+        """
+        User Story: As a user, I want to find duplicates already in my data
+        Test Case 2: Single and bulk edits keep fingerprints current
+        """
+        client.post('/api/transactions/import', json={'transactions': EXPORT[2:], 'on_duplicate': 'allow'},
+                    headers=auth_headers)
+        client.put(f"/api/transaction/{test_transaction['id']}",
+                   json={'description': 'Circle K', 'amount': 300}, headers=auth_headers)
+        assert client.get('/api/transactions/duplicates', headers=auth_headers).get_json()['total_groups'] == 0
+
+        client.patch('/api/transactions', json={'ids': [test_transaction['id']],
+                                                'changes': {'transaction_date': '2024-01-07'}},
+                     headers=auth_headers)
+        assert client.get('/api/transactions/duplicates', headers=auth_headers).get_json()['total_groups'] == 1
+
+    def test_backfill_command(self, app, runner, test_transaction):
+        """
+        User Story: As a user, I want to find duplicates already in my data
+        Test Case 3: Rows stored without a fingerprint are backfilled by the CLI command
+        """
+        from app.models import Transaction
+        from app import db
+
+        with app.app_context():
+            db.session.execute(db.update(Transaction).values(fingerprint=None))
+            db.session.commit()
+
+        result = runner.invoke(args=['backfill-fingerprints'])
+
+        assert 'Fingerprinted 1 transaction(s)' in result.output
+        with app.app_context():
+            transaction = Transaction.query.get(test_transaction['id'])
+            assert transaction.fingerprint == transaction.compute_fingerprint()
@@ -0,0 +1,211 @@
+"""
+User Story Tests: Write-Behind Ingestion
+Tests that transactions can be queued durably and inserted in micro-batches, with a token to await the commit.
+"""
+import time
+import pytest
+from unittest.mock import patch
+from app import create_app, db
+from app.models import IngestBatch, Transaction, User
+from test_config import TestConfig
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Write-behind ingestion on, with the queue in a temporary file and small batches."""
+    class IngestTestConfig(TestConfig):
+        INGEST_WRITE_BEHIND = True
+        INGEST_QUEUE_PATH = str(tmp_path / 'ingest_queue.sqlite3')
+        INGEST_BATCH_ROWS = 3
+        INGEST_MAX_ATTEMPTS = 2
+
+    app = create_app(config_object=IngestTestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def ingest(client, auth_headers, count, category='Food'):
+    return client.post('/api/transactions/ingest', headers=auth_headers, json={'transactions': [
+        {'transaction_date': f'2024-03-{day + 1:02d}', 'category': category, 'amount': -10 - day,
+         'description': f'Shop {day}'}
+        for day in range(count)
+    ]})
+
+
+class TestWriteBehindIngestion:
+    """Test cases for write-behind ingestion."""
+
+    def test_queued_then_committed(self, app, client, auth_headers, test_user):
+        """
+        User Story: As a user importing a bank feed, I want high insert rates to keep up
+        Test Case 1: Rows are acknowledged with a token and committed by the next flush
+        """
+        from app.ingest import flush_ingest_queue
+
+        response = ingest(client, auth_headers, 2)
+        assert response.status_code == 202
+        token = response.get_json()['token']
+
+        status = client.get(f'/api/transactions/ingest/{token}', headers=auth_headers).get_json()
+        assert status['status'] == 'pending'
+        assert Transaction.query.count() == 0
+
+        assert flush_ingest_queue() == 2
+
+        status = client.get(f'/api/transactions/ingest/{token}?wait=1', headers=auth_headers).get_json()
+        assert status['status'] == 'committed'
+        stored = [db.session.get(Transaction, transaction_id) for transaction_id in status['ids']]
+        assert [t.description for t in stored] == ['Shop 0', 'Shop 1']
+        assert all(t.fingerprint == t.compute_fingerprint() for t in stored)
+        assert stored[0].change_seq == db.session.get(User, test_user['id']).change_seq
+
+        changes = client.get('/api/transactions/changes', headers=auth_headers).get_json()
+        assert sorted(t['id'] for t in changes['upserts']) == sorted(status['ids'])
+
+    def test_micro_batches(self, app, client, auth_headers):
+        """
+        User Story: As a user importing a bank feed, I want high insert rates to keep up
+        Test Case 2: Several requests are flushed together, up to INGEST_BATCH_ROWS rows per batch
+        """
+        from app.ingest import flush_ingest_queue
+
+        first = ingest(client, auth_headers, 2).get_json()['token']
+        second = ingest(client, auth_headers, 2).get_json()['token']
+
+        assert flush_ingest_queue() == 3
+        assert client.get(f'/api/transactions/ingest/{first}', headers=auth_headers).get_json()['status'] == \
+            'committed'
+        assert client.get(f'/api/transactions/ingest/{second}', headers=auth_headers).get_json()['status'] == \
+            'pending'
+        assert flush_ingest_queue() == 1
+        assert flush_ingest_queue() == 0
+        assert Transaction.query.count() == 4
+
+    def test_failed_flush_retried_then_reported(self, app, client, auth_headers):
+        """
+        User Story: As a user importing a bank feed, I want to know if queued rows could not be saved
+        Test Case 3: A failing batch is queued again, and fails its token after INGEST_MAX_ATTEMPTS
+        """
+        from app import ingest as ingest_module
+
+        token = ingest(client, auth_headers, 1).get_json()['token']
+        with patch.object(ingest_module, '_insert_batch', side_effect=RuntimeError('database is down')):
+            with pytest.raises(RuntimeError):
+                ingest_module.flush_ingest_queue()
+            assert client.get(f'/api/transactions/ingest/{token}', headers=auth_headers).get_json()['status'] == \
+                'pending'
+            with pytest.raises(RuntimeError):
+                ingest_module.flush_ingest_queue()
+
+        status = client.get(f'/api/transactions/ingest/{token}', headers=auth_headers).get_json()
+        assert status == {'token': token, 'status': 'failed', 'error': 'database is down'}
+        assert ingest_module.flush_ingest_queue() == 0
+
+    def test_interrupted_flush_recovered(self, app, client, auth_headers, test_user):
+        """
+        User Story: As a user importing a bank feed, I want no rows lost or doubled if the server restarts
+        Test Case 4: A batch whose flusher died is committed if its insert went through, otherwise queued again
+        """
+        from app.ingest import ingest_queue, recover_stale_batches
+
+        committed = ingest(client, auth_headers, 1).get_json()['token']
+        lost = ingest(client, auth_headers, 1).get_json()['token']
+        queue = ingest_queue()
+        committed_batch, _ = queue.claim(1, time.time())
+        queue.claim(1, time.time())
+        # The first batch's insert committed before its flusher died
+        db.session.add(IngestBatch(id=committed_batch))
+        db.session.commit()
+
+        recover_stale_batches(now=time.time() + 3600)
+
+        assert queue.status(committed, test_user['id'])['status'] == 'committed'
+        assert queue.status(lost, test_user['id'])['status'] == 'pending'
+
+    def test_validation_and_scope(self, client, auth_headers, second_user):
+        """
+        User Story: As a user, I want bad rows rejected immediately and my tokens kept private
+        Test Case 5: Invalid rows get 400 before queueing; other users' tokens are unknown
+        """
+        from app.auth_utils import generate_token
+
+        response = client.post('/api/transactions/ingest', headers=auth_headers, json={'transactions': [
+            {'transaction_date': '2024-03-01', 'amount': -5}]})
+        assert response.status_code == 400
+        assert 'category' in response.get_json()['message']
+        assert client.post('/api/transactions/ingest', headers=auth_headers, json={}).status_code == 400
+
+        token = ingest(client, auth_headers, 1).get_json()['token']
+        other_headers = {'Authorization': f"Bearer {generate_token(second_user['id'])}"}
+        assert client.get(f'/api/transactions/ingest/{token}', headers=other_headers).status_code == 404
+
+    def test_disabled_by_default(self):
+        """
+        User Story: As an operator, I want write-behind ingestion to be opt-in
+        Test Case 6: Without INGEST_WRITE_BEHIND the endpoint is not available
+        """
+        from app.auth_utils import generate_token
+
+        app = create_app(config_object=TestConfig)
+        with app.app_context():
+            db.create_all()
+            user = User(username='plain', email='plain@example.com')
+            user.set_password('PlainPassword123')
+            db.session.add(user)
+            db.session.commit()
+            headers = {'Authorization': f"Bearer {generate_token(user.id)}"}
+            response = ingest(app.test_client(), headers, 1)
+            db.session.remove()
+            db.drop_all()
+
+        assert app.extensions['ingest_queue'] is None
+        assert response.status_code == 404
+
+    def test_bad_row_fails_alone(self, app, client, auth_headers, second_user):
+        """
+        User Story: As a user importing a bank feed, I want my rows saved even if someone else's are bad
+        Test Case 7: A row that cannot be inserted is split out of the batch; only its token fails
+        """
+        from app import ingest as ingest_module
+        from app.auth_utils import generate_token
+
+        insert_batch = ingest_module._insert_batch
+
+        def reject_bad_rows(batch, entries):
+            if any(payload['description'] == 'Bad' for _, _, payload in entries):
+                raise OverflowError('bigint out of range')
+            return insert_batch(batch, entries)
+
+        other_headers = {'Authorization': f"Bearer {generate_token(second_user['id'])}"}
+        good = ingest(client, auth_headers, 2).get_json()['token']
+        bad = client.post('/api/transactions/ingest', headers=other_headers, json={'transactions': [
+            {'transaction_date': '2024-03-01', 'category': 'Food', 'amount': -5, 'description': 'Bad'}]}
+        ).get_json()['token']
+
+        with patch.object(ingest_module, '_insert_batch', side_effect=reject_bad_rows):
+            assert ingest_module.flush_ingest_queue() == 2
+            with pytest.raises(OverflowError):
+                ingest_module.flush_ingest_queue()
+
+        assert client.get(f'/api/transactions/ingest/{good}', headers=auth_headers).get_json()['status'] == \
+            'committed'
+        status = client.get(f'/api/transactions/ingest/{bad}', headers=other_headers).get_json()
+        assert status == {'token': bad, 'status': 'failed', 'error': 'bigint out of range'}
+        assert Transaction.query.count() == 2
+
+    def test_out_of_range_amount_rejected(self, client, auth_headers):
+        """
+        User Story: As a user importing a bank feed, I want bad rows rejected immediately
+        Test Case 8: An amount the database cannot hold gets 400 and is never queued
+        """
+        from app.ingest import ingest_stats
+
+        response = client.post('/api/transactions/ingest', headers=auth_headers, json={'transactions': [
+            {'transaction_date': '2024-03-01', 'category': 'Food', 'amount': '1e20'}]})
+
+        assert response.status_code == 400
+        assert 'amount' in response.get_json()['message']
+        assert ingest_stats()['pending'] == 0
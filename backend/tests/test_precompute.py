@@ -0,0 +1,140 @@
+"""
+User Story Tests: Precomputed Projections
+Tests that projections are precomputed into a table, served from it while fresh, and refit when stale.
+"""
+import pytest
+from datetime import date
+from dateutil.relativedelta import relativedelta
+from app import db
+from app.models import Projection, Transaction, User
+
+
+@pytest.fixture
+def food_history(app, test_user):
+    """30 months of Food spending (enough to project) and one Transport row (not enough)."""
+    with app.app_context():
+        base_date = date(2022, 1, 15)
+        for i in range(30):
+            db.session.add(Transaction(transaction_date=base_date + relativedelta(months=i), category='Food',
+                                       amount=-(100 + 5 * (i % 12)), user_id=test_user['id']))
+        db.session.add(Transaction(transaction_date=base_date, category='Transport', amount=-40,
+                                   user_id=test_user['id']))
+        db.session.commit()
+
+
+class TestPrecomputedProjections:
+    """Test cases for precomputed projections."""
+
+    def test_precompute_stores_every_category(self, app, runner, test_user, food_history):
+        """
+        User Story: As a user, I want the Projections page to load instantly
+        Test Case 1: The job stores a result (or the insufficient-data answer) per category, and skips fresh ones
+        """
+        result = runner.invoke(args=['precompute-projections'])
+        assert 'Computed 2 projection(s) and 1 backtest(s) for 1 user(s)' in result.output
+
+        with app.app_context():
+            stored = {p.category: p for p in Projection.query.filter_by(user_id=test_user['id'])}
+            assert stored['Food'].status == 200
+            assert len(stored['Food'].result['projected']) >= 12
+            assert stored['Transport'].status == 400
+            assert stored['Transport'].result['error'] == 'Insufficient data'
+
+        result = runner.invoke(args=['precompute-projections'])
+        assert 'Computed 0 projection(s) and 0 backtest(s)' in result.output
+
+    def test_fresh_projection_served_from_table(self, app, client, runner, auth_headers, food_history):
+        """
+        User Story: As a user, I want the Projections page to load instantly
+        Test Case 2: A fresh stored result is returned as-is, without a live fit
+        """
+        runner.invoke(args=['precompute-projections'])
+        with app.app_context():
+            projection = Projection.query.filter_by(category='Food').one()
+            projection.result = dict(projection.result, marker='stored')
+            db.session.commit()
+
+        response = client.get('/api/projections/Food', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.get_json()['marker'] == 'stored'
+        # An explicit hierarchical=false is the plain projection too
+        assert client.get('/api/projections/Food?hierarchical=false', headers=auth_headers).get_json()['marker'] == \
+            'stored'
+        assert client.get('/api/projections/Transport', headers=auth_headers).status_code == 400
+
+    def test_stale_projection_refit_live(self, app, client, runner, auth_headers, food_history):
+        """
+        User Story: As a user, I want projections to reflect my latest edits
+        Test Case 3: After a write the stored result is stale and the projection is fitted live
+        """
+        runner.invoke(args=['precompute-projections'])
+        with app.app_context():
+            projection = Projection.query.filter_by(category='Food').one()
+            projection.result = dict(projection.result, marker='stored')
+            db.session.commit()
+
+        response = client.post('/api/transaction', headers=auth_headers, json={
+            'transaction_date': '2024-07-01', 'category': 'Food', 'amount': -120})
+        assert response.status_code == 201
+
+        data = client.get('/api/projections/Food', headers=auth_headers).get_json()
+        assert 'marker' not in data
+        assert len(data['projected']) >= 12
+
+    def test_removed_category_dropped(self, app, runner, test_user, food_history):
+        """
+        User Story: As a user, I want the Projections page to load instantly
+        Test Case 4: Stored projections for categories the user no longer has are removed
+        """
+        runner.invoke(args=['precompute-projections'])
+        with app.app_context():
+            for transaction in Transaction.query.filter_by(category='Transport'):
+                db.session.delete(transaction)
+            db.session.commit()
+
+        result = runner.invoke(args=['precompute-projections'])
+        assert 'removed 1' in result.output
+        with app.app_context():
+            assert [p.category for p in Projection.query.filter_by(user_id=test_user['id'])] == ['Food']
+
+    def test_live_fit_written_through(self, app, client, auth_headers, test_user, food_history):
+        """
+        User Story: As a user, I want projections to reflect my latest edits without slowing every visit
+        Test Case 5: After an edit, the live fit is stored and the next request is served from the table
+        """
+        from unittest.mock import patch
+        from app import routes
+
+        response = client.post('/api/transaction', headers=auth_headers, json={
+            'transaction_date': '2024-07-01', 'category': 'Transport', 'amount': -120})
+        assert response.status_code == 201
+
+        with patch.object(routes, 'holt_winters_projection', wraps=routes.holt_winters_projection) as fit:
+            first = client.get('/api/projections/Food', headers=auth_headers).get_json()
+            second = client.get('/api/projections/Food', headers=auth_headers).get_json()
+            assert client.get('/api/projections/Transport', headers=auth_headers).status_code == 400
+            assert client.get('/api/projections/Transport', headers=auth_headers).status_code == 400
+
+        assert fit.call_count == 2
+        assert second == first
+        with app.app_context():
+            change_seq = db.session.get(User, test_user['id']).change_seq
+            stored = {p.category: p.data_version for p in Projection.query}
+            assert stored == {'Food': change_seq, 'Transport': change_seq}
+
+    def test_nightly_jobs_ensure_partitions(self, app, test_user, food_history):
+        """
+        User Story: As an operator, I want next year's partition created without a restart
+        Test Case 6: The nightly job checks the partitions before precomputing, and a failed check does not stop it
+        """
+        from unittest.mock import patch
+        from app import database
+        from app.precompute import run_nightly_jobs
+
+        with patch.object(database, 'ensure_partitions', side_effect=RuntimeError('no permission')) as ensure:
+            totals = run_nightly_jobs(app)
+
+        ensure.assert_called_once_with(app)
+        assert totals['computed'] == 2
+        with app.app_context():
+            assert Projection.query.filter_by(user_id=test_user['id']).count() == 2
@@ -175,3 +175,75 @@ class TestFinancialProjections:
         data = response.get_json()
         assert 'Insufficient data' in data['error']
 
+    def test_hierarchical_projections_are_coherent(self, client, auth_headers, test_user, app):
+        """
+        User Story: As a user, I want projections for every subcategory that add up to the category
+        Test Case 6: Hierarchical mode returns the category and its subcategories, reconciled
+        """
+        from app.models import Transaction
+        from app import db
+
+        with app.app_context():
+            base_date = date(2022, 1, 15)
+            for i in range(30):
+                db.session.add(Transaction(transaction_date=base_date + relativedelta(months=i), category='Food',
+                                           subcategory='Groceries', amount=-(300 + 20 * (i % 12)),
+                                           user_id=test_user['id']))
+                db.session.add(Transaction(transaction_date=base_date + relativedelta(months=i), category='Food',
+                                           subcategory='Restaurant', amount=-(100 + 3 * i), user_id=test_user['id']))
+            # Without a subcategory, in a few months only
+            for i in range(0, 30, 5):
+                db.session.add(Transaction(transaction_date=base_date + relativedelta(months=i), category='Food',
+                                           amount=-50, user_id=test_user['id']))
+            db.session.commit()
+
+        for method in ('mint', 'bottom_up'):
+            response = client.get(f'/api/projections/Food?hierarchical=true&reconciliation={method}',
+                                  headers=auth_headers)
+            assert response.status_code == 200
+            data = response.get_json()
+            assert data['name'] == 'Food'
+            assert data['reconciliation'] == method
+            assert [child['name'] for child in data['subcategories']] == ['Uncategorized', 'Groceries', 'Restaurant']
+            assert len(data['projected']) >= 12
+            # Empty months are part of each subcategory's history
+            assert all(len(child['historical']) == len(data['historical']) for child in data['subcategories'])
+
+            assert all(point['lower'] < point['upper'] for point in data['projected'])
+
+            for i, point in enumerate(data['projected']):
+                children_total = sum(child['projected'][i]['value'] for child in data['subcategories'])
+                assert point['value'] == pytest.approx(children_total)
+
+    def test_hierarchical_projections_validation(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want projections for every subcategory that add up to the category
+        Test Case 7: Hierarchical mode rejects unknown reconciliation methods and too little data
+        """
+        response = client.get('/api/projections/Food?hierarchical=true&reconciliation=average', headers=auth_headers)
+        assert response.status_code == 400
+
+        response = client.get('/api/projections/Food?hierarchical=true', headers=auth_headers)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Insufficient data'
+
+    def test_hierarchical_projections_need_two_seasons(self, client, auth_headers, test_user, app):
+        """
+        User Story: As a user, I want projections for every subcategory that add up to the category
+        Test Case 8: Hierarchical mode needs two full years of complete months to size its intervals
+        """
+        from app.models import Transaction
+        from app import db
+
+        with app.app_context():
+            base_date = date(2022, 1, 15)
+            for i in range(18):
+                for subcategory in ('Groceries', 'Restaurant'):
+                    db.session.add(Transaction(transaction_date=base_date + relativedelta(months=i), category='Food',
+                                               subcategory=subcategory, amount=-(100 + 10 * i),
+                                               user_id=test_user['id']))
+            db.session.commit()
+
+        response = client.get('/api/projections/Food?hierarchical=true', headers=auth_headers)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Insufficient monthly data'
@@ -0,0 +1,100 @@
+"""
+User Story Tests: Read Replica Routing
+Tests that read-only endpoints use the replica while writes (and reads right after them) use the primary.
+"""
+import pytest
+from datetime import date
+from app import create_app, db
+from app.models import Transaction, User
+from test_config import TestConfig
+
+
+@pytest.fixture
+def app(tmp_path):
+    """The in-memory primary plus a separate database file standing in for the replica."""
+    class ReplicaTestConfig(TestConfig):
+        SQLALCHEMY_REPLICA_URI = f"sqlite:///{tmp_path / 'replica.db'}"
+
+    app = create_app(config_object=ReplicaTestConfig)
+    replica = app.extensions['replica_engine']
+
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(replica)
+        yield app
+        db.session.remove()
+        db.drop_all()
+    replica.dispose()
+
+
+@pytest.fixture
+def replica_only_transaction(app, test_user):
+    """A row that exists only on the replica, so reads that return it were routed there."""
+    with app.app_context():
+        user = db.session.get(User, test_user['id'])
+        with app.extensions['replica_engine'].begin() as connection:
+            # The replica has replayed the user's row as of now
+            connection.execute(db.insert(User), [{
+                'id': user.id, 'username': user.username, 'email': user.email,
+                'password_hash': user.password_hash, 'change_seq': user.change_seq
+            }])
+            connection.execute(db.insert(Transaction), [{
+                'transaction_date': date(2024, 1, 15), 'category': 'Food', 'subcategory': 'Groceries',
+                'description': 'Replica row', 'amount': 10, 'user_id': test_user['id']
+            }])
+
+
+class TestReplicaRouting:
+    """Test cases for replica routing."""
+
+    def test_reads_use_replica(self, client, auth_headers, replica_only_transaction):
+        """
+        User Story: As a user, I want heavy reads kept off the primary database
+        Test Case 1: Read-only endpoints are served from the replica
+        """
+        data = client.get('/api/transactions', headers=auth_headers).get_json()
+        assert [t['description'] for t in data] == ['Replica row']
+
+        categories = client.get('/api/categories', headers=auth_headers).get_json()
+        assert categories == {'Food': ['Groceries']}
+
+    def test_reads_after_a_write_use_primary(self, client, auth_headers, replica_only_transaction):
+        """
+        User Story: As a user, I want to see my own changes immediately
+        Test Case 2: Until the replica has replayed the user's latest write, reads go to the primary
+        """
+        response = client.post('/api/transaction', json={
+            'transaction_date': '2024-02-01', 'category': 'Transport', 'subcategory': 'Gas',
+            'description': 'Fuel', 'amount': 60
+        }, headers=auth_headers)
+        assert response.status_code == 201
+
+        data = client.get('/api/transactions', headers=auth_headers).get_json()
+        assert [t['description'] for t in data] == ['Fuel']
+
+    def test_client_can_request_primary(self, client, auth_headers, replica_only_transaction):
+        """
+        User Story: As a user, I want to see my own changes immediately
+        Test Case 3: 'X-Read-Consistency: primary' bypasses the replica
+        """
+        headers = dict(auth_headers, **{'X-Read-Consistency': 'primary'})
+        assert client.get('/api/transactions', headers=headers).get_json() == []
+
+    def test_replica_used_again_once_caught_up(self, app, client, auth_headers, test_user,
+                                               replica_only_transaction):
+        """
+        User Story: As a user, I want to see my own changes immediately
+        Test Case 4: A write made by any process keeps reads on the primary until the replica replays it
+        """
+        from app.changes import next_change_seq
+
+        # Written by another worker: nothing in this process records it
+        next_change_seq(test_user['id'])
+        db.session.commit()
+        assert client.get('/api/transactions', headers=auth_headers).get_json() == []
+
+        with app.extensions['replica_engine'].begin() as connection:
+            connection.execute(db.update(User).where(User.id == test_user['id']).values(
+                change_seq=User.change_seq + 1))
+        data = client.get('/api/transactions', headers=auth_headers).get_json()
+        assert [t['description'] for t in data] == ['Replica row']
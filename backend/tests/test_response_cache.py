@@ -0,0 +1,161 @@
+"""
+User Story Tests: Response Cache
+Tests for the shared read-through cache of GET responses and its tag invalidation.
+"""
+import pytest
+from app import create_app, db
+from app.response_cache import MemoryBackend, SQLiteBackend
+from test_config import TestConfig
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def app(request, tmp_path):
+    """The regular test app with the response cache enabled, once per backend."""
+    class CacheTestConfig(TestConfig):
+        RESPONSE_CACHE_BACKEND = request.param
+        RESPONSE_CACHE_PATH = str(tmp_path / 'response_cache.sqlite3')
+
+    app = create_app(config_object=CacheTestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+class TestResponseCache:
+    """Test cases for the response cache."""
+
+    def test_repeated_reads_hit(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want pages I revisit to load instantly
+        Test Case 1: A repeated GET is served from the cache; different arguments are cached separately
+        """
+        first = client.get('/api/transactions?sort=-amount', headers=auth_headers)
+        second = client.get('/api/transactions?sort=-amount', headers=auth_headers)
+        other = client.get('/api/transactions?sort=amount', headers=auth_headers)
+
+        assert first.headers['X-Cache'] == 'MISS'
+        assert second.headers['X-Cache'] == 'HIT'
+        assert second.get_json() == first.get_json()
+        assert other.headers['X-Cache'] == 'MISS'
+        assert other.get_json() == list(reversed(first.get_json()))
+
+        stats = client.get('/api/metrics').get_json()['response_cache']
+        assert stats['hits'] == 1
+        assert stats['misses'] == 2
+        assert stats['hit_ratio'] == pytest.approx(1 / 3)
+        assert stats['bytes'] > 0
+
+    def test_write_invalidates_user_tag(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want to see my own changes immediately
+        Test Case 2: A successful write invalidates the user's cached responses
+        """
+        assert client.get('/api/categories', headers=auth_headers).headers['X-Cache'] == 'MISS'
+        assert client.get('/api/categories', headers=auth_headers).headers['X-Cache'] == 'HIT'
+
+        response = client.post('/api/transaction', headers=auth_headers, json={
+            'transaction_date': '2024-03-01', 'category': 'Gifts', 'amount': -200})
+        assert response.status_code == 201
+
+        response = client.get('/api/categories', headers=auth_headers)
+        assert response.headers['X-Cache'] == 'MISS'
+        assert 'Gifts' in response.get_json()
+
+    def test_failed_write_keeps_cache(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want pages I revisit to load instantly
+        Test Case 3: Rejected writes do not invalidate anything
+        """
+        client.get('/api/categories', headers=auth_headers)
+        response = client.delete('/api/transaction/999999', headers=auth_headers)
+        assert response.status_code == 404
+
+        assert client.get('/api/categories', headers=auth_headers).headers['X-Cache'] == 'HIT'
+
+    def test_write_by_other_worker_misses(self, app, client, auth_headers, test_user, multiple_transactions):
+        """
+        User Story: As a user, I want to see my own changes immediately
+        Test Case 4: After a write handled by another worker, the next read is recomputed from current data
+        """
+        from datetime import date
+        from app.changes import next_change_seq
+        from app.models import Transaction
+
+        assert client.get('/api/categories', headers=auth_headers).headers['X-Cache'] == 'MISS'
+
+        # As another worker would: neither this process's caches nor the cache tags are invalidated
+        db.session.execute(db.insert(Transaction).values(
+            transaction_date=date(2024, 3, 1), category='Gifts', amount=-200, user_id=test_user['id'],
+            change_seq=next_change_seq(test_user['id'])))
+        db.session.commit()
+
+        response = client.get('/api/categories', headers=auth_headers)
+        assert response.headers['X-Cache'] == 'MISS'
+        assert 'Gifts' in response.get_json()
+
+
+class TestCacheBackends:
+    """Test cases for the cache backends."""
+
+    @pytest.fixture(params=['memory', 'sqlite'])
+    def backend(self, request, tmp_path):
+        if request.param == 'memory':
+            return MemoryBackend(max_bytes=25)
+        return SQLiteBackend(str(tmp_path / 'cache.sqlite3'), max_bytes=25)
+
+    def test_ttl_and_lru_eviction(self, backend):
+        """
+        User Story: As an operator, I want the cache to stay within its memory budget
+        Test Case 1: Entries expire after their TTL and the least recently used are evicted past the budget
+        """
+        backend.set('a', 200, 'application/json', b'x' * 10, ttl=60, now=0)
+        backend.set('b', 200, 'application/json', b'y' * 10, ttl=60, now=1)
+        assert backend.get('a', now=2) is not None  # 'a' is now the most recently used
+        backend.set('c', 200, 'application/json', b'z' * 10, ttl=60, now=3)
+
+        assert backend.get('b', now=4) is None
+        assert backend.get('a', now=4)[2] == b'x' * 10
+        assert backend.get('c', now=61) is not None
+        assert backend.get('a', now=61) is None
+        assert backend.stats()['bytes'] <= 25
+
+    def test_sqlite_backend_shared_between_processes(self, tmp_path):
+        """
+        User Story: As an operator, I want all workers to share one cache
+        Test Case 2: Two SQLite backends on the same file see each other's entries and tag versions
+        """
+        path = str(tmp_path / 'shared.sqlite3')
+        worker_a = SQLiteBackend(path, max_bytes=1024)
+        worker_b = SQLiteBackend(path, max_bytes=1024)
+
+        worker_a.set('key', 200, 'application/json', b'{}', ttl=60, now=0)
+        assert worker_b.get('key', now=1) == (200, 'application/json', b'{}')
+
+        worker_b.bump(['user:1'])
+        assert worker_a.tag_versions(['user:1', 'user:2']) == [1, 0]
+        assert worker_a.stats()['hits'] == 1
+
+    def test_sqlite_lookups_do_not_write(self, tmp_path):
+        """
+        User Story: As a user, I want cached reads to stay fast under load
+        Test Case 3: Hits and misses take no write lock; their counts and LRU touches go out with the next write
+        """
+        path = str(tmp_path / 'shared.sqlite3')
+        worker_a = SQLiteBackend(path, max_bytes=1024)
+        worker_b = SQLiteBackend(path, max_bytes=1024)
+        worker_a.set('key', 200, 'application/json', b'{}', ttl=60, now=0)
+
+        connection = worker_a._connection()
+        changes = connection.total_changes
+        assert worker_a.get('key', now=1) is not None
+        assert worker_a.get('missing', now=1) is None
+        assert connection.total_changes == changes
+        assert worker_a.stats()['hits'] == 1
+        assert worker_b.stats()['hits'] == 0
+
+        worker_a.set('other', 200, 'application/json', b'{}', ttl=60, now=2)
+        assert worker_b.stats()['hits'] == 1
+        assert worker_b.stats()['misses'] == 1
+        assert connection.execute("SELECT accessed FROM entries WHERE key = 'key'").fetchone()[0] == 1
@@ -0,0 +1,179 @@
+"""
+User Story Tests: Categorization Rules
+Tests for rule-based categorization during import and on existing history.
+"""
+import pytest
+from datetime import date
+from types import SimpleNamespace
+
+
+def make_rule(category, pattern=None, match_type='contains', subcategory=None, **constraints):
+    """Build an unsaved rule-like object for matcher unit tests."""
+    values = dict(min_amount=None, max_amount=None, start_date=None, end_date=None)
+    values.update(constraints)
+    return SimpleNamespace(id=None, pattern=pattern, match_type=match_type,
+                           category=category, subcategory=subcategory, **values)
+
+
+@pytest.mark.unit
+class TestRuleMatcher:
+    """Unit tests for the compiled matcher."""
+
+    def test_aho_corasick_finds_overlapping_patterns(self):
+        """Every pattern contained in the text is reported, including overlaps."""
+        from app.rules import AhoCorasick
+
+        automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+
+        assert automaton.search('ushers') == 0b1011
+        assert automaton.search('xyz') == 0
+
+    def test_priority_order_and_constraints(self):
+        """The first rule (in priority order) whose constraints all hold wins."""
+        from app.rules import RuleMatcher
+
+        matcher = RuleMatcher([
+            make_rule('Hus', 'moss kommune', min_amount=1000),
+            make_rule('Andre', 'moss kommune'),
+            make_rule('Mat', r'^rema\s*1000', match_type='regex', subcategory='Rema 1000'),
+            make_rule('Transport', start_date=date(2024, 6, 1), max_amount=50),
+        ])
+
+        result = matcher.match(
+            ['Moss Kommune renovasjon', 'MOSS KOMMUNE', 'Rema 1000 Jeløy', 'Parkering', None],
+            [2500, 300, 120, 40, 40],
+            [date(2024, 1, 1), date(2024, 1, 1), date(2024, 1, 1), date(2024, 7, 1), date(2024, 5, 1)]
+        )
+
+        assert result.tolist() == [0, 1, 2, 3, -1]
+
+
+@pytest.fixture
+def moss_rule(client, auth_headers):
+    """Create a rule consolidating moss kommune subcategories."""
+    response = client.post('/api/rules', json={
+        'pattern': 'moss kommune',
+        'category': 'Hus',
+        'subcategory': 'moss kommune',
+        'priority': 10
+    }, headers=auth_headers)
+    assert response.status_code == 201
+    return response.get_json()
+
+
+class TestRuleManagement:
+    """Test cases for /api/rules."""
+
+    def test_create_and_list_rules(self, client, auth_headers, moss_rule):
+        """
+        User Story: As a user, I want to define categorization rules
+        Test Case 1: Created rules are listed in priority order
+        """
+        client.post('/api/rules', json={'pattern': 'kiwi', 'category': 'Mat'}, headers=auth_headers)
+
+        data = client.get('/api/rules', headers=auth_headers).get_json()
+
+        assert [rule['pattern'] for rule in data] == ['moss kommune', 'kiwi']
+        assert data[1]['priority'] == 100
+
+    def test_invalid_rules_are_rejected(self, client, auth_headers):
+        """
+        User Story: As a user, I want to define categorization rules
+        Test Case 2: Rules without conditions, bad regexes or categories return 400
+        """
+        assert client.post('/api/rules', json={'category': 'Mat'}, headers=auth_headers).status_code == 400
+        assert client.post('/api/rules', json={'pattern': '(', 'match_type': 'regex', 'category': 'Mat'},
+                           headers=auth_headers).status_code == 400
+        assert client.post('/api/rules', json={'pattern': 'kiwi'}, headers=auth_headers).status_code == 400
+
+    def test_update_and_delete_rule(self, client, auth_headers, moss_rule):
+        """
+        User Story: As a user, I want to define categorization rules
+        Test Case 3: Rules can be edited and removed
+        """
+        response = client.put(f"/api/rules/{moss_rule['id']}", json={'priority': 5}, headers=auth_headers)
+        assert response.get_json()['priority'] == 5
+
+        response = client.delete(f"/api/rules/{moss_rule['id']}", headers=auth_headers)
+        assert response.status_code == 200
+        assert client.get('/api/rules', headers=auth_headers).get_json() == []
+
+
+class TestRuleApplication:
+    """Test cases for applying rules on import and to existing history."""
+
+    def test_import_categorizes_with_rules(self, client, auth_headers, moss_rule):
+        """
+        User Story: As a user, I want imports categorized automatically
+        Test Case 1: Rules fill in rows imported without a category
+        """
+        response = client.post('/api/transactions/import', json={'transactions': [
+            {'transaction_date': '2024-03-01', 'amount': 900, 'description': 'Eindomskatt (Moss Kommune)'},
+            {'transaction_date': '2024-03-02', 'amount': 80, 'description': 'Kiwi', 'category': 'Mat'},
+        ]}, headers=auth_headers)
+
+        assert response.status_code == 201
+        assert response.get_json()['imported'] == 2
+        assert response.get_json()['categorized'] == 1
+        data = client.get('/api/transactions?sort=transaction_date', headers=auth_headers).get_json()
+        assert [(t['category'], t['subcategory']) for t in data] == [('Hus', 'moss kommune'), ('Mat', None)]
+
+    def test_import_rejects_rows_left_uncategorized(self, client, auth_headers):
+        """
+        User Story: As a user, I want imports categorized automatically
+        Test Case 2: Rows with no category and no matching rule are reported
+        """
+        response = client.post('/api/transactions/import', json={'transactions': [
+            {'transaction_date': '2024-03-01', 'amount': 10, 'description': 'Unknown shop'},
+        ]}, headers=auth_headers)
+
+        assert response.status_code == 400
+        assert response.get_json()['rows'] == [0]
+        assert client.get('/api/transactions', headers=auth_headers).get_json() == []
+
+    def test_apply_rules_to_history(self, client, auth_headers, moss_rule, app, test_user):
+        """
+        User Story: As a user, I want to re-categorize my history with rules
+        Test Case 3: Only rows whose category changes are rewritten; dry runs write nothing
+        """
+        from app.models import Transaction
+        from app import db
+
+        with app.app_context():
+            for description, subcategory in [('Renovasjon (moss kommune)', 'Renovasjon (moss kommune)'),
+                                             ('Moss kommune', 'moss kommune'),
+                                             ('Telia', 'Telia telefon')]:
+                db.session.add(Transaction(transaction_date=date(2024, 2, 1), category='Hus',
+                                           subcategory=subcategory, description=description,
+                                           amount=500, user_id=test_user['id']))
+            db.session.commit()
+
+        dry = client.post('/api/rules/apply', json={'dry_run': True}, headers=auth_headers).get_json()
+        assert dry['matched'] == 2
+        assert dry['updated'] == 1
+
+        result = client.post('/api/rules/apply', json={'filter': {'category': 'Hus'}},
+                             headers=auth_headers).get_json()
+        assert result['scanned'] == 3
+        assert result['updated'] == 1
+
+        data = client.get('/api/transactions?category=Hus', headers=auth_headers).get_json()
+        assert sorted(t['subcategory'] for t in data) == ['Telia telefon', 'moss kommune', 'moss kommune']
+
+    def test_import_keeps_client_categories(self, client, auth_headers, moss_rule):
+        """
+        User Story: As a user, I want imports categorized automatically without losing my own choices
+        Test Case 4: A category sent with the row is kept even if a rule matches, unless overriding is asked for
+        """
+        row = {'transaction_date': '2024-03-01', 'amount': 900, 'description': 'Eindomskatt (Moss Kommune)',
+               'category': 'Skatt', 'subcategory': 'Eiendom'}
+
+        response = client.post('/api/transactions/import', json={'transactions': [row]}, headers=auth_headers)
+        assert response.get_json()['categorized'] == 0
+
+        response = client.post('/api/transactions/import', headers=auth_headers, json={
+            'transactions': [dict(row, transaction_date='2024-04-01')], 'override_categories': True})
+        assert response.get_json()['categorized'] == 1
+
+        data = client.get('/api/transactions?sort=transaction_date', headers=auth_headers).get_json()
+        assert [(t['category'], t['subcategory']) for t in data] == [('Skatt', 'Eiendom'), ('Hus', 'moss kommune')]
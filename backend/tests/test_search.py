@@ -0,0 +1,127 @@
+"""
+User Story Tests: Transaction Search
+Tests for ranked full-text and fuzzy search over transaction descriptions.
+"""
+import pytest
+from datetime import date
+
+
+@pytest.fixture
+def searchable_transactions(app, test_user, second_user):
+    """Create transactions with varied descriptions for both users."""
+    from app.models import Transaction
+    from app import db
+
+    rows = [
+        (test_user['id'], date(2024, 4, 10), 'Food', 'Rema 1000 Moss', 320.00),
+        (test_user['id'], date(2024, 5, 2), 'Food', 'Rema 1000 Jeløy', 150.00),
+        (test_user['id'], date(2023, 4, 12), 'Food', 'Kiwi Moss', 90.00),
+        (test_user['id'], date(2024, 4, 20), 'Transport', 'Circle K Moss', 600.00),
+        (test_user['id'], date(2024, 6, 1), 'Hus', None, 1200.00),
+        (second_user['id'], date(2024, 4, 10), 'Food', 'Rema 1000 Oslo', 999.00),
+    ]
+    with app.app_context():
+        for user_id, tx_date, category, description, amount in rows:
+            db.session.add(Transaction(
+                transaction_date=tx_date,
+                category=category,
+                description=description,
+                amount=amount,
+                user_id=user_id
+            ))
+        db.session.commit()
+
+
+class TestTransactionSearch:
+    """Test cases for /api/transactions/search."""
+
+    def test_search_requires_authentication(self, client):
+        """
+        User Story: As a user, I want to search my transactions
+        Test Case 1: Search without a token returns 401
+        """
+        response = client.get('/api/transactions/search?q=rema')
+        assert response.status_code == 401
+
+    def test_search_returns_only_user_matches(self, client, auth_headers, searchable_transactions):
+        """
+        User Story: As a user, I want to search my transactions
+        Test Case 2: Full-text search matches words and never leaks other users' rows
+        """
+        response = client.get('/api/transactions/search?q=rema', headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['total'] == 2
+        assert {item['description'] for item in data['items']} == {'Rema 1000 Moss', 'Rema 1000 Jeløy'}
+        assert all('rank' in item for item in data['items'])
+
+    def test_search_matches_word_prefixes_and_all_terms(self, client, auth_headers, searchable_transactions):
+        """
+        User Story: As a user, I want to search my transactions
+        Test Case 3: Every term must match, and terms match as prefixes
+        """
+        response = client.get('/api/transactions/search?q=rem mos', headers=auth_headers)
+
+        data = response.get_json()
+        assert [item['description'] for item in data['items']] == ['Rema 1000 Moss']
+
+    def test_search_filters_by_date_range_and_category(self, client, auth_headers, searchable_transactions):
+        """
+        User Story: As a user, I want to search my transactions
+        Test Case 4: Date range and category filters narrow the results
+        """
+        response = client.get(
+            '/api/transactions/search?q=moss&category=Food&start_date=2024-01-01&end_date=2024-12-31',
+            headers=auth_headers)
+
+        data = response.get_json()
+        assert [item['description'] for item in data['items']] == ['Rema 1000 Moss']
+
+    def test_search_is_paginated(self, client, auth_headers, searchable_transactions):
+        """
+        User Story: As a user, I want to search my transactions
+        Test Case 5: Results are paginated and the total covers every page
+        """
+        first = client.get('/api/transactions/search?q=moss&per_page=2', headers=auth_headers).get_json()
+        second = client.get('/api/transactions/search?q=moss&per_page=2&page=2', headers=auth_headers).get_json()
+
+        assert first['total'] == 3
+        assert len(first['items']) == 2
+        assert len(second['items']) == 1
+        first_ids = {item['id'] for item in first['items']}
+        assert second['items'][0]['id'] not in first_ids
+
+    def test_fuzzy_search_matches_substrings(self, client, auth_headers, searchable_transactions):
+        """
+        User Story: As a user, I want to search my transactions
+        Test Case 6: Fuzzy mode matches substrings inside words
+        """
+        response = client.get('/api/transactions/search?q=ircle&mode=fuzzy', headers=auth_headers)
+
+        data = response.get_json()
+        assert [item['description'] for item in data['items']] == ['Circle K Moss']
+
+    def test_search_follows_description_updates(self, client, auth_headers, test_transaction):
+        """
+        User Story: As a user, I want to search my transactions
+        Test Case 7: Edited descriptions are searchable under the new text only
+        """
+        client.put(f"/api/transaction/{test_transaction['id']}",
+                   json={'description': 'Bakery run'},
+                   headers=auth_headers)
+
+        old = client.get('/api/transactions/search?q=weekly', headers=auth_headers).get_json()
+        new = client.get('/api/transactions/search?q=bakery', headers=auth_headers).get_json()
+        assert old['total'] == 0
+        assert new['total'] == 1
+
+    def test_search_rejects_invalid_parameters(self, client, auth_headers):
+        """
+        User Story: As a user, I want to search my transactions
+        Test Case 8: Empty queries, unknown modes and bad dates return 400
+        """
+        assert client.get('/api/transactions/search?q=', headers=auth_headers).status_code == 400
+        assert client.get('/api/transactions/search?q=rema&mode=regex', headers=auth_headers).status_code == 400
+        assert client.get('/api/transactions/search?q=rema&start_date=04/2024',
+                          headers=auth_headers).status_code == 400
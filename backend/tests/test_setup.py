@@ -82,3 +82,28 @@ def test_multiple_transactions_fixture(app, multiple_transactions, test_user):
         assert 'Food' in categories
         assert 'Transport' in categories
 
+
+def test_ensure_partitions_is_noop_on_sqlite(app, runner):
+    """Test that partition maintenance only runs against PostgreSQL."""
+    from app.database import ensure_partitions
+
+    assert ensure_partitions(app) == 0
+
+    result = runner.invoke(args=['ensure-partitions'])
+    assert result.exit_code == 0
+    assert 'Created 0 transaction partition(s)' in result.output
+
+
+def test_startup_checks_partitions_before_starting_jobs(app):
+    """Test that both server entry points' shared startup runs the partition check and starts the jobs."""
+    from unittest.mock import patch
+    from app import startup
+
+    with patch.object(startup, 'ensure_partitions', side_effect=RuntimeError('no permission')) as ensure, \
+            patch.object(startup, 'start_precompute_scheduler') as scheduler, \
+            patch.object(startup, 'start_ingest_flusher') as flusher:
+        startup.start_background_jobs(app)
+
+    ensure.assert_called_once_with(app)
+    scheduler.assert_called_once_with(app)
+    flusher.assert_called_once_with(app)
@@ -0,0 +1,114 @@
+"""
+User Story Tests: Cashflow Simulation
+Tests for the Monte Carlo balance simulation.
+"""
+import pytest
+import numpy as np
+from datetime import date
+from dateutil.relativedelta import relativedelta
+
+
+@pytest.fixture
+def monthly_history(app, test_user):
+    """30 complete months of salary and two expense categories, ending last month."""
+    from app.models import Transaction
+    from app import db
+
+    start = date.today().replace(day=10) - relativedelta(months=30)
+    with app.app_context():
+        for i in range(30):
+            day = start + relativedelta(months=i)
+            db.session.add(Transaction(transaction_date=day, category='Inntekt', amount=30000 + 500 * (i % 3),
+                                       user_id=test_user['id']))
+            db.session.add(Transaction(transaction_date=day, category='Food', amount=-(4000 + 300 * (i % 12)),
+                                       user_id=test_user['id']))
+            db.session.add(Transaction(transaction_date=day, category='Hus', amount=-12000, user_id=test_user['id']))
+        db.session.commit()
+
+
+class TestCashflowSimulation:
+    """Test cases for the cashflow simulation."""
+
+    def test_simulation_bands(self, client, auth_headers, monthly_history):
+        """
+        User Story: As a user, I want to know how likely I am to run out of money
+        Test Case 1: Returns ordered percentile bands for the balance and deficit probabilities
+        """
+        response = client.get('/api/simulate?months=12&paths=2000&seed=7&starting_balance=1000',
+                              headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data['months']) == 12
+        assert data['months'][0] == date.today().strftime('%Y-%m')
+        bands = [data['balance'][f'p{p}'] for p in (5, 25, 50, 75, 95)]
+        assert all(len(band) == 12 for band in bands)
+        assert np.all(np.diff(np.array(bands), axis=0) >= 0)
+        # Income comfortably exceeds spending, so the balance grows and a deficit is unlikely
+        assert data['balance']['p50'][-1] > data['balance']['p50'][0] > 1000
+        assert data['probability_of_deficit'] < 0.05
+        assert {c['name']: c['type'] for c in data['categories']} == {
+            'Food': 'expense', 'Hus': 'expense', 'Inntekt': 'income'}
+
+        # The same seed gives the same paths
+        again = client.get('/api/simulate?months=12&paths=2000&seed=7&starting_balance=1000',
+                           headers=auth_headers).get_json()
+        assert again['balance'] == data['balance']
+
+    def test_simulation_detects_deficit(self, client, auth_headers, monthly_history):
+        """
+        User Story: As a user, I want to know how likely I am to run out of money
+        Test Case 2: A large negative starting balance makes a deficit certain
+        """
+        data = client.get('/api/simulate?months=3&paths=500&starting_balance=-1000000',
+                          headers=auth_headers).get_json()
+
+        assert data['probability_of_deficit'] == 1.0
+        assert data['deficit_probability'] == [1.0, 1.0, 1.0]
+
+    def test_simulation_validation(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want to know how likely I am to run out of money
+        Test Case 3: Rejects bad parameters and too little history
+        """
+        assert client.get('/api/simulate?months=0', headers=auth_headers).status_code == 400
+        assert client.get('/api/simulate?paths=10', headers=auth_headers).status_code == 400
+
+        response = client.get('/api/simulate', headers=auth_headers)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Insufficient monthly data'
+
+    def test_residuals_exclude_initialization_season(self):
+        """
+        User Story: As a user, I want simulated bands as wide as my spending really varies
+        Test Case 4: The batch fit's residuals start after the initialization season and carry the noise
+        """
+        from app.forecasting import MIN_TRAINING_MONTHS, SEASON, fit_holt_winters_batch
+
+        rng = np.random.default_rng(3)
+        months = np.arange(36)
+        series = 5000 + 800 * np.sin(2 * np.pi * months / SEASON) + rng.normal(0, 100, size=36)
+
+        _, residuals = fit_holt_winters_batch(series[None, :], 12)
+
+        assert residuals.shape == (1, 36 - SEASON)
+        assert residuals[0, :SEASON].std() > 50
+        with pytest.raises(ValueError):
+            fit_holt_winters_batch(series[None, :MIN_TRAINING_MONTHS - 1], 12)
+
+    def test_forecast_starts_now_after_a_gap(self):
+        """
+        User Story: As a user, I want the simulated months labelled with the months they forecast
+        Test Case 5: History ending months before now is carried forward as empty months
+        """
+        from datetime import datetime
+        from app.simulation import simulate_cashflow
+
+        month_starts = np.arange('2020-01', '2023-01', dtype='datetime64[M]')
+        matrix = np.vstack([np.full(36, 30000.0), np.full(36, 12000.0)])
+
+        result = simulate_cashflow(month_starts, ['Inntekt', 'Hus'], matrix, [True, False], months=6, paths=200,
+                                   seed=1, now=datetime(2023, 6, 15))
+
+        assert result['months'] == ['2023-06', '2023-07', '2023-08', '2023-09', '2023-10', '2023-11']
+        assert result['history'] == {'from': '2020-01', 'to': '2023-05'}
@@ -81,7 +81,7 @@ class TestCreateTransaction:
         response = client.post('/api/transaction', 
                               json=transaction_data,
                               headers=auth_headers)
-        assert response.status_code == 500
+        assert response.status_code == 400
         data = response.get_json()
         assert 'error' in data
 
@@ -308,6 +308,70 @@ class TestViewTransactions:
         assert len(data) == 0
 
 
+class TestFilterAndSortTransactions:
+    """Test cases for server-side filtering, sorting and pagination."""
+
+    def test_filter_by_date_range(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want to filter my transactions on the server
+        Test Case 1: start_date and end_date are inclusive bounds
+        """
+        response = client.get('/api/transactions?start_date=2024-01-16&end_date=2024-02-05',
+                              headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert sorted(t['transaction_date'] for t in data) == ['2024-01-20', '2024-02-05']
+
+    def test_filter_by_amount_range_and_category_list(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want to filter my transactions on the server
+        Test Case 2: Amount ranges combine with repeated category parameters
+        """
+        response = client.get('/api/transactions?min_amount=50&category=Food&category=Transport',
+                              headers=auth_headers)
+        assert sorted(t['amount'] for t in response.get_json()) == [60.0, 150.5]
+
+        response = client.get('/api/transactions?max_amount=100&subcategory=Restaurant',
+                              headers=auth_headers)
+        assert [t['description'] for t in response.get_json()] == ['Dinner']
+
+    def test_sort_by_column_with_tie_breaker(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want to sort my transactions on the server
+        Test Case 3: Sorting supports multiple keys and descending order
+        """
+        response = client.get('/api/transactions?sort=-amount', headers=auth_headers)
+        assert [t['amount'] for t in response.get_json()] == [150.5, 60.0, 45.75]
+
+        response = client.get('/api/transactions?sort=category,-transaction_date', headers=auth_headers)
+        assert [t['transaction_date'] for t in response.get_json()] == ['2024-02-05', '2024-01-15', '2024-01-20']
+
+    def test_pagination_returns_page_and_total(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want only the visible rows sent to the browser
+        Test Case 4: page/per_page return one page plus the total count
+        """
+        response = client.get('/api/transactions?sort=transaction_date&per_page=2&page=2',
+                              headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['total'] == 3
+        assert data['page'] == 2
+        assert [t['transaction_date'] for t in data['items']] == ['2024-02-05']
+
+    def test_invalid_filter_or_sort_returns_400(self, client, auth_headers):
+        """
+        User Story: As a user, I want to filter my transactions on the server
+        Test Case 5: Unknown sort columns and malformed values return 400
+        """
+        assert client.get('/api/transactions?sort=password', headers=auth_headers).status_code == 400
+        assert client.get('/api/transactions?min_amount=lots', headers=auth_headers).status_code == 400
+        assert client.get('/api/transactions?end_date=tomorrow', headers=auth_headers).status_code == 400
+        assert client.get('/api/transactions?page=0', headers=auth_headers).status_code == 400
+
+
 class TestUpdateTransaction:
     """Test cases for updating transactions."""
 
@@ -379,7 +443,7 @@ class TestUpdateTransaction:
                              json={'amount': 'invalid'},
                              headers=auth_headers)
 
-        assert response.status_code == 500  # Backend returns 500 for invalid data
+        assert response.status_code == 400
         data = response.get_json()
         assert 'error' in data
 
@@ -470,3 +534,321 @@ class TestDeleteTransaction:
         assert isinstance(data['message'], str)
         assert len(data['message']) > 0
 
+
+class TestBulkTransactions:
+    """Test cases for bulk updating and deleting transactions."""
+
+    def test_bulk_update_by_ids(self, client, auth_headers, multiple_transactions, app, test_user):
+        """
+        User Story: As a user, I want to recategorize many transactions at once
+        Test Case 1: PATCH with an id list updates them and reports the ids
+        """
+        from app.models import Transaction
+
+        with app.app_context():
+            food_ids = sorted(t.id for t in Transaction.query.filter_by(
+                user_id=test_user['id'], category='Food'))
+
+        response = client.patch('/api/transactions',
+                                json={'ids': food_ids, 'changes': {'category': 'Mat', 'subcategory': None}},
+                                headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data == {'affected': 2, 'ids': food_ids}
+        with app.app_context():
+            for transaction_id in food_ids:
+                transaction = Transaction.query.get(transaction_id)
+                assert transaction.category == 'Mat'
+                assert transaction.subcategory is None
+
+    def test_bulk_update_by_filter(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want to recategorize many transactions at once
+        Test Case 2: PATCH with a filter expression updates every match
+        """
+        response = client.patch('/api/transactions',
+                                json={'filter': {'category': ['Transport'], 'end_date': '2024-01-31'},
+                                      'changes': {'category': 'Bil'}},
+                                headers=auth_headers)
+
+        assert response.get_json()['affected'] == 1
+        data = client.get('/api/transactions?category=Bil', headers=auth_headers).get_json()
+        assert [t['description'] for t in data] == ['Fuel']
+
+    def test_bulk_delete_by_filter(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want to delete many transactions at once
+        Test Case 3: DELETE with a filter removes every match in one call
+        """
+        response = client.delete('/api/transactions',
+                                 json={'filter': {'category': 'Food'}},
+                                 headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.get_json()['affected'] == 2
+        remaining = client.get('/api/transactions', headers=auth_headers).get_json()
+        assert [t['category'] for t in remaining] == ['Transport']
+
+    def test_bulk_operations_are_scoped_to_user(self, client, test_transaction, second_user):
+        """
+        User Story: As a user, I want to delete many transactions at once
+        Test Case 4: Ids belonging to another user are never touched
+        """
+        response = client.post('/api/auth/login', json={
+            'username': second_user['username'],
+            'password': second_user['password']
+        })
+        headers = {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+        response = client.delete('/api/transactions', json={'ids': [test_transaction['id']]}, headers=headers)
+        assert response.get_json() == {'affected': 0, 'ids': []}
+
+        response = client.patch('/api/transactions',
+                                json={'filter': {'category': 'Food'}, 'changes': {'category': 'Hacked'}},
+                                headers=headers)
+        assert response.get_json()['affected'] == 0
+
+    def test_bulk_rejects_ambiguous_or_unsafe_requests(self, client, auth_headers, test_transaction):
+        """
+        User Story: As a user, I want to delete many transactions at once
+        Test Case 5: Empty filters, missing targets and unknown fields return 400
+        """
+        assert client.delete('/api/transactions', json={'filter': {}}, headers=auth_headers).status_code == 400
+        assert client.delete('/api/transactions', json={}, headers=auth_headers).status_code == 400
+        assert client.delete('/api/transactions',
+                             json={'ids': [test_transaction['id']], 'filter': {'category': 'Food'}},
+                             headers=auth_headers).status_code == 400
+        assert client.patch('/api/transactions', json={'ids': [test_transaction['id']], 'changes': {'user_id': 2}},
+                            headers=auth_headers).status_code == 400
+        assert client.patch('/api/transactions', json={'ids': [test_transaction['id']], 'changes': {'amount': 'x'}},
+                            headers=auth_headers).status_code == 400
+
+
+class TestMinorUnitAmounts:
+    """Test cases for amounts stored as integer øre."""
+
+    def test_amounts_are_stored_as_integer_ore(self, app, client, auth_headers):
+        """
+        User Story: As a user, I want amounts kept exactly to the øre
+        Test Case 1: The database holds whole øre; the API returns the decimal amount
+        """
+        from sqlalchemy import text
+        from app import db
+
+        response = client.post('/api/transaction', json={
+            'transaction_date': '2024-03-15', 'category': 'Food', 'description': 'Kiwi', 'amount': '1234.56'
+        }, headers=auth_headers)
+
+        assert response.get_json()['amount'] == 1234.56
+        with app.app_context():
+            assert db.session.execute(text('SELECT amount FROM transactions')).scalar() == 123456
+
+    @pytest.mark.unit
+    def test_minor_unit_conversion(self):
+        """Conversions are exact and round half away from zero."""
+        from decimal import Decimal
+        from app.models import from_minor_units, to_minor_units
+
+        assert to_minor_units('0.1') + to_minor_units(0.2) == to_minor_units('0.30')
+        assert to_minor_units('10.005') == 1001
+        assert to_minor_units(Decimal('-10.005')) == -1001
+        assert from_minor_units(-1005) == Decimal('-10.05')
+        assert str(from_minor_units(15050)) == '150.50'
+
+    @pytest.mark.unit
+    def test_fingerprint_uses_stored_rounding(self):
+        """An amount with more than two decimals has the same fingerprint as the øre value stored for it."""
+        from datetime import date
+        from app.models import from_minor_units, to_minor_units, transaction_fingerprint
+
+        stored = from_minor_units(to_minor_units('10.125'))
+        assert transaction_fingerprint(1, date(2024, 3, 1), '10.125', 'Kiwi') == \
+            transaction_fingerprint(1, date(2024, 3, 1), stored, 'Kiwi')
+
+    def test_non_finite_amounts_rejected(self, client, auth_headers, test_transaction):
+        """
+        User Story: As a user, I want amounts kept exactly to the øre
+        Test Case 2: NaN and infinite amounts get 400, not a server error
+        """
+        for value in ('NaN', 'Infinity', '-inf', 'sNaN'):
+            assert client.get(f'/api/transactions?min_amount={value}', headers=auth_headers).status_code == 400
+            response = client.post('/api/transactions/import', headers=auth_headers, json={'transactions': [
+                {'transaction_date': '2024-03-15', 'category': 'Food', 'amount': value}]})
+            assert response.status_code == 400
+
+    def test_invalid_amounts_rejected_on_write(self, client, auth_headers, test_transaction):
+        """
+        User Story: As a user, I want amounts kept exactly to the øre
+        Test Case 3: Creating or editing with a non-numeric or out-of-range amount gets 400
+        """
+        url = f'/api/transaction/{test_transaction["id"]}'
+        for value in ('NaN', 'abc', '1e20', 100000000, '-99999999.995'):
+            response = client.post('/api/transaction', headers=auth_headers, json={
+                'transaction_date': '2024-03-15', 'category': 'Food', 'amount': value})
+            assert response.status_code == 400
+            assert 'amount' in response.get_json()['message']
+            assert client.put(url, headers=auth_headers, json={'amount': value}).status_code == 400
+            response = client.post('/api/transactions/import', headers=auth_headers, json={'transactions': [
+                {'transaction_date': '2024-03-15', 'category': 'Food', 'amount': value}]})
+            assert response.status_code == 400
+
+        response = client.post('/api/transaction', headers=auth_headers, json={
+            'transaction_date': '2024-03-15', 'category': 'Food', 'amount': '-99999999.99'})
+        assert response.status_code == 201
+        assert response.get_json()['amount'] == -99999999.99
+        assert client.put(url, headers=auth_headers, json={'amount': 99999999.99}).status_code == 200
+
+
+class TestSparseFieldsets:
+    """Test cases for ?fields= on the list endpoints."""
+
+    def test_only_requested_fields_returned(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want charts to load only the data they draw
+        Test Case 1: ?fields= limits every item to those fields, plus the id
+        """
+        response = client.get('/api/transactions?fields=transaction_date,category,amount&page=1',
+                              headers=auth_headers)
+
+        assert response.status_code == 200
+        items = response.get_json()['items']
+        assert len(items) == 3
+        for item in items:
+            assert set(item) == {'id', 'transaction_date', 'category', 'amount'}
+
+        full = client.get('/api/transactions', headers=auth_headers).get_json()
+        assert set(full[0]) == {'id', 'transaction_date', 'category', 'subcategory', 'description', 'amount',
+                                'user_id', 'version'}
+
+    def test_unrequested_columns_not_selected(self, app, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want charts to load only the data they draw
+        Test Case 2: The SQL only selects the requested columns; description is never read
+        """
+        from sqlalchemy import event
+        from app import db
+
+        statements = []
+
+        def record(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+            event.listen(engine, 'before_cursor_execute', record)
+            try:
+                response = client.get('/api/transactions?fields=category,amount', headers=auth_headers)
+            finally:
+                event.remove(engine, 'before_cursor_execute', record)
+
+        assert response.status_code == 200
+        select = next(s for s in statements if 'FROM transactions' in s)
+        assert 'transactions.amount' in select
+        assert 'transactions.description' not in select
+        assert 'transactions.fingerprint' not in select
+
+    def test_fields_on_changes(self, client, auth_headers, multiple_transactions):
+        """
+        User Story: As a user, I want charts to load only the data they draw
+        Test Case 3: Delta sync upserts honour ?fields= too
+        """
+        data = client.get('/api/transactions/changes?fields=amount', headers=auth_headers).get_json()
+
+        assert len(data['upserts']) == 3
+        assert all(set(item) == {'id', 'amount'} for item in data['upserts'])
+
+    def test_unknown_field_rejected(self, client, auth_headers):
+        """
+        User Story: As a user, I want charts to load only the data they draw
+        Test Case 4: Unknown field names are a 400 listing the available fields
+        """
+        response = client.get('/api/transactions?fields=amount,password', headers=auth_headers)
+
+        assert response.status_code == 400
+        assert 'password' in response.get_json()['message']
+
+
+class TestSingleStatementWrites:
+    """Test cases for single-statement writes and optimistic concurrency."""
+
+    @staticmethod
+    def transaction_statements(app, request):
+        """Run request() and return the SQL statements it sent that touch the transactions table."""
+        from sqlalchemy import event
+        from app import db
+
+        statements = []
+
+        def record(_conn, _cursor, statement, *_args):
+            if 'transactions' in statement and 'transaction_tombstones' not in statement:
+                statements.append(statement.split()[0].upper())
+
+        with app.app_context():
+            engine = db.engine
+            event.listen(engine, 'before_cursor_execute', record)
+            try:
+                response = request()
+            finally:
+                event.remove(engine, 'before_cursor_execute', record)
+        return response, statements
+
+    def test_each_write_is_one_statement(self, app, client, auth_headers, test_transaction):
+        """
+        User Story: As a user, I want edits to save quickly
+        Test Case 1: Create, update and delete each touch the transactions table with one statement
+        """
+        url = f"/api/transaction/{test_transaction['id']}"
+        response, statements = self.transaction_statements(app, lambda: client.put(url, json={
+            'transaction_date': '2024-03-16', 'category': 'Food', 'description': 'Kiwi', 'amount': 99},
+            headers=auth_headers))
+        assert response.status_code == 200
+        assert statements == ['UPDATE']
+        assert response.get_json()['description'] == 'Kiwi'
+
+        response, statements = self.transaction_statements(app, lambda: client.post('/api/transaction', json={
+            'transaction_date': '2024-03-17', 'category': 'Food', 'amount': '12.345'}, headers=auth_headers))
+        assert response.status_code == 201
+        assert statements == ['INSERT']
+        # The response is the stored row, rounded to whole øre
+        assert response.get_json()['amount'] == 12.35
+
+        response, statements = self.transaction_statements(app, lambda: client.delete(url, headers=auth_headers))
+        assert response.status_code == 200
+        assert statements == ['DELETE']
+
+    def test_fingerprint_and_version_kept_current(self, app, client, auth_headers, test_transaction):
+        """
+        User Story: As a user, I want edits to save quickly
+        Test Case 2: Partial and full updates keep the fingerprint accurate and bump the version
+        """
+        from app import db
+        from app.models import Transaction
+
+        url = f"/api/transaction/{test_transaction['id']}"
+        first = client.put(url, json={'amount': 10}, headers=auth_headers).get_json()
+        second = client.put(url, json={'transaction_date': '2024-04-01', 'description': 'Rema', 'amount': 11},
+                            headers=auth_headers).get_json()
+
+        assert second['version'] == first['version'] + 1
+        with app.app_context():
+            stored = db.session.get(Transaction, test_transaction['id'])
+            assert stored.fingerprint == stored.compute_fingerprint()
+
+    def test_stale_version_rejected(self, client, auth_headers, test_transaction):
+        """
+        User Story: As a user editing on two devices, I want a stale edit rejected instead of silently winning
+        Test Case 3: A write with an old version gets 409 and the current version; the current version succeeds
+        """
+        url = f"/api/transaction/{test_transaction['id']}"
+        version = client.get('/api/transactions', headers=auth_headers).get_json()[0]['version']
+        assert client.put(url, json={'category': 'Transport', 'version': version},
+                          headers=auth_headers).status_code == 200
+
+        response = client.put(url, json={'category': 'Food', 'version': version}, headers=auth_headers)
+        assert response.status_code == 409
+        assert response.get_json()['version'] == version + 1
+
+        assert client.delete(url, headers={**auth_headers, 'If-Match': f'"{version}"'}).status_code == 409
+        assert client.delete(f'{url}?version={version + 1}', headers=auth_headers).status_code == 200
+        assert client.delete(f'{url}?version={version + 1}', headers=auth_headers).status_code == 404
@@ -6,6 +6,9 @@ CREATE TABLE users (
     username VARCHAR(255) UNIQUE NOT NULL,
     email VARCHAR(255) UNIQUE NOT NULL,
     password_hash VARCHAR(255) NOT NULL,
+    -- Delta sync: last change sequence handed out, and the tombstone compaction horizon
+    change_seq BIGINT NOT NULL DEFAULT 0,
+    compacted_seq BIGINT NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -19,21 +22,122 @@ CREATE INDEX idx_users_email ON users(email);
 -- ============================================
 -- Create transactions table with user_id
 -- ============================================
+-- Range partitioned by year on transaction_date; the yearly partitions are
+-- created by ensure_transaction_partitions() in partitions.sql. The primary
+-- key must include the partition key; ids stay unique through the sequence.
 CREATE TABLE transactions (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     transaction_date DATE NOT NULL,
     category VARCHAR(255) NOT NULL,
     subcategory VARCHAR(255),
     description TEXT,
-    amount NUMERIC(10, 2) NOT NULL,
+    -- Whole øre (1/100 NOK); the backend converts to and from decimal kroner
+    amount BIGINT NOT NULL,
     user_id INTEGER NOT NULL,
+    -- Duplicate-detection key, computed by the backend (app.models.transaction_fingerprint)
+    fingerprint VARCHAR(32),
+    -- Owner's change sequence at the last insert/update (see app/changes.py)
+    change_seq BIGINT NOT NULL DEFAULT 0,
+    -- Bumped by every change; used for optimistic concurrency (If-Match)
+    version INTEGER NOT NULL DEFAULT 1,
+    CONSTRAINT transactions_pkey PRIMARY KEY (id, transaction_date),
     CONSTRAINT fk_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-);
+) PARTITION BY RANGE (transaction_date);
+
+-- Catches rows outside the existing yearly partitions until they are created
+CREATE TABLE transactions_default PARTITION OF transactions DEFAULT;
 
 -- ============================================
 -- Create index for transactions
 -- ============================================
 CREATE INDEX idx_transactions_user_id ON transactions(user_id);
+-- Composite indexes backing the /api/transactions filters and sorts
+CREATE INDEX idx_transactions_user_date ON transactions(user_id, transaction_date, id);
+CREATE INDEX idx_transactions_user_category_date ON transactions(user_id, category, transaction_date);
+CREATE INDEX idx_transactions_user_subcategory ON transactions(user_id, subcategory);
+CREATE INDEX idx_transactions_user_amount ON transactions(user_id, amount);
+-- Equality-only lookups for duplicate detection
+CREATE INDEX idx_transactions_fingerprint ON transactions USING hash (fingerprint);
+-- Delta sync: rows changed since a sequence number
+CREATE INDEX idx_transactions_user_change_seq ON transactions(user_id, change_seq);
+
+-- ============================================
+-- Create transaction tombstones table
+-- ============================================
+-- Deleted transaction ids for GET /api/transactions/changes; compacted by
+-- 'flask compact-tombstones'
+CREATE TABLE transaction_tombstones (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    transaction_id INTEGER NOT NULL,
+    change_seq BIGINT NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_transaction_tombstones_user_change_seq ON transaction_tombstones(user_id, change_seq);
+
+-- ============================================
+-- Create projections table
+-- ============================================
+-- Precomputed GET /api/projections/<category> responses, refreshed nightly by
+-- 'flask precompute-projections'; stale once users.change_seq moves past data_version
+CREATE TABLE projections (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    category VARCHAR(255) NOT NULL,
+    data_version BIGINT NOT NULL,
+    period VARCHAR(7) NOT NULL,
+    status SMALLINT NOT NULL,
+    result JSON NOT NULL,
+    computed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_projections_user_category UNIQUE (user_id, category)
+);
+
+-- Each user's precomputed GET /api/backtest response (same refresh rules)
+CREATE TABLE forecast_backtests (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES users(id) ON DELETE CASCADE,
+    data_version BIGINT NOT NULL,
+    period VARCHAR(7) NOT NULL,
+    result JSON NOT NULL,
+    computed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Write-behind ingestion batches, recorded with their rows (see app/ingest.py)
+CREATE TABLE ingest_batches (
+    id VARCHAR(32) PRIMARY KEY,
+    committed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX ix_ingest_batches_committed_at ON ingest_batches (committed_at);
+
+-- ============================================
+-- Create search indexes for transactions
+-- ============================================
+-- Full-text index; the expression must match app.models.description_tsvector
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_transactions_description_fts ON transactions
+    USING gin (to_tsvector('simple'::regconfig, coalesce(description, '')));
+-- Trigram index for fuzzy (%) and substring (ILIKE) matching
+CREATE INDEX idx_transactions_description_trgm ON transactions
+    USING gin (description gin_trgm_ops);
+
+-- ============================================
+-- Create category rules table
+-- ============================================
+-- User-defined rules applied on import and by POST /api/rules/apply
+CREATE TABLE category_rules (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    priority INTEGER NOT NULL DEFAULT 100,
+    pattern VARCHAR(255),
+    match_type VARCHAR(16) NOT NULL DEFAULT 'contains',
+    min_amount NUMERIC(10, 2),
+    max_amount NUMERIC(10, 2),
+    start_date DATE,
+    end_date DATE,
+    category VARCHAR(255) NOT NULL,
+    subcategory VARCHAR(255)
+);
+CREATE INDEX ix_category_rules_user_id ON category_rules(user_id);
 
 -- ============================================
 -- Create default user
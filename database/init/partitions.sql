@@ -0,0 +1,55 @@
+-- ============================================
+-- Yearly partition maintenance for transactions
+-- ============================================
+-- Runs after init.sql (scripts execute in alphabetical order). The migration
+-- partition_transactions.sh also loads this file on existing databases.
+--
+-- ensure_transaction_partitions(years_ahead) creates one partition per year,
+-- from the oldest year found in transactions_default (or the current year)
+-- up to the current year + years_ahead. Rows that landed in the default
+-- partition are moved into the new yearly partition before it is attached.
+-- Safe to call concurrently: callers serialize on an advisory lock.
+CREATE OR REPLACE FUNCTION ensure_transaction_partitions(years_ahead INTEGER DEFAULT 2)
+RETURNS INTEGER AS $$
+DECLARE
+    current_year INTEGER := EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER;
+    first_year INTEGER;
+    partition_name TEXT;
+    range_start DATE;
+    range_end DATE;
+    created INTEGER := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_transaction_partitions'));
+
+    -- LEAST ignores NULL, so an empty default partition starts at the current year
+    SELECT LEAST(EXTRACT(YEAR FROM MIN(transaction_date))::INTEGER, current_year)
+    INTO first_year
+    FROM transactions_default;
+
+    FOR y IN first_year..current_year + years_ahead LOOP
+        partition_name := format('transactions_y%s', y);
+        CONTINUE WHEN to_regclass(partition_name) IS NOT NULL;
+
+        range_start := make_date(y, 1, 1);
+        range_end := make_date(y + 1, 1, 1);
+
+        EXECUTE format(
+            'CREATE TABLE %I (LIKE transactions INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+            partition_name);
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM transactions_default '
+            'WHERE transaction_date >= %L AND transaction_date < %L RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved',
+            range_start, range_end, partition_name);
+        EXECUTE format(
+            'ALTER TABLE transactions ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+            partition_name, range_start, range_end);
+
+        created := created + 1;
+    END LOOP;
+
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_transaction_partitions(2);
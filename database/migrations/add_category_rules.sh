@@ -0,0 +1,40 @@
+#!/bin/bash
+
+# Migration Script: Add Category Rules
+# This script creates the category_rules table used to categorize
+# transactions automatically on import and via POST /api/rules/apply.
+# Rules replace one-off fixes such as consolidate_moss_kommune.sh, e.g.:
+#   POST /api/rules {"pattern": "moss kommune", "category": "Hus", "subcategory": "moss kommune"}
+#   POST /api/rules/apply {"dry_run": true}
+
+set -e  # Exit on error
+
+echo "=========================================="
+echo "Category Rules"
+echo "=========================================="
+echo ""
+
+echo "Creating category_rules table..."
+docker compose exec -T database psql -U admin -d finance_tracker -v ON_ERROR_STOP=1 <<SQL
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS category_rules (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    priority INTEGER NOT NULL DEFAULT 100,
+    pattern VARCHAR(255),
+    match_type VARCHAR(16) NOT NULL DEFAULT 'contains',
+    min_amount NUMERIC(10, 2),
+    max_amount NUMERIC(10, 2),
+    start_date DATE,
+    end_date DATE,
+    category VARCHAR(255) NOT NULL,
+    subcategory VARCHAR(255)
+);
+CREATE INDEX IF NOT EXISTS ix_category_rules_user_id ON category_rules(user_id);
+
+COMMIT;
+SQL
+
+echo "✓ Migration completed successfully!"
+echo ""
@@ -0,0 +1,59 @@
+#!/bin/bash
+
+# Migration Script: Add Delta-Sync Change Log
+# This script adds the per-user change sequence (users.change_seq,
+# transactions.change_seq) and the transaction_tombstones table behind
+# GET /api/transactions/changes. Adding NOT NULL columns with a constant
+# default is a metadata-only change, and the index is built CONCURRENTLY.
+# Existing rows get sequence 0, so clients pick them up on their first
+# (since=0) sync.
+
+set -e  # Exit on error
+
+PSQL="docker compose exec -T database psql -U admin -d finance_tracker -v ON_ERROR_STOP=1"
+
+echo "=========================================="
+echo "Delta-Sync Change Log"
+echo "=========================================="
+echo ""
+
+# Step 1: Columns and tombstone table
+echo "Step 1: Adding change sequence columns and tombstone table..."
+$PSQL <<'SQL'
+BEGIN;
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE users ADD COLUMN IF NOT EXISTS compacted_seq BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS transaction_tombstones (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    transaction_id INTEGER NOT NULL,
+    change_seq BIGINT NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_transaction_tombstones_user_change_seq
+    ON transaction_tombstones(user_id, change_seq);
+
+COMMIT;
+SQL
+
+# Step 2: Index (CONCURRENTLY cannot run inside a transaction block)
+echo ""
+echo "Step 2: Building change sequence index..."
+IS_PARTITIONED=$($PSQL -tAc "SELECT relkind = 'p' FROM pg_class WHERE relname = 'transactions';")
+if [ "$IS_PARTITIONED" = "t" ]; then
+    # Partitioned parents do not support CONCURRENTLY; the index is built per partition under a lock
+    $PSQL -c "CREATE INDEX IF NOT EXISTS idx_transactions_user_change_seq ON transactions(user_id, change_seq);"
+else
+    $PSQL -c "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_user_change_seq ON transactions(user_id, change_seq);"
+fi
+
+echo ""
+echo "=========================================="
+echo "Migration Complete!"
+echo "=========================================="
+echo "Schedule tombstone compaction, e.g. daily:"
+echo "  docker compose exec -T backend flask --app run compact-tombstones"
+echo ""
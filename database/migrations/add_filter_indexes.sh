@@ -0,0 +1,47 @@
+#!/bin/bash
+
+# Migration Script: Add Transaction Filter Indexes
+# This script adds the composite (user_id, ...) indexes that back the
+# server-side filters and sorts of /api/transactions.
+# Indexes are built CONCURRENTLY, so the application can keep running.
+
+set -e  # Exit on error
+
+echo "=========================================="
+echo "Transaction Filter Indexes"
+echo "=========================================="
+echo ""
+
+INDEXES=(
+    "idx_transactions_user_date ON transactions(user_id, transaction_date, id)"
+    "idx_transactions_user_category_date ON transactions(user_id, category, transaction_date)"
+    "idx_transactions_user_subcategory ON transactions(user_id, subcategory)"
+    "idx_transactions_user_amount ON transactions(user_id, amount)"
+)
+
+# Step 1: Build indexes (CONCURRENTLY cannot run inside a transaction block)
+echo "Step 1: Building indexes..."
+for INDEX in "${INDEXES[@]}"; do
+    echo "  CREATE INDEX ${INDEX}"
+    docker compose exec -T database psql -U admin -d finance_tracker -v ON_ERROR_STOP=1 -c "
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ${INDEX};
+"
+done
+docker compose exec -T database psql -U admin -d finance_tracker -c "ANALYZE transactions;"
+
+# Step 2: Verify
+echo ""
+echo "Step 2: Verification"
+echo "----------------------------------------"
+docker compose exec -T database psql -U admin -d finance_tracker -c "
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'transactions'
+  AND indexname LIKE 'idx_transactions_user_%';
+"
+
+echo ""
+echo "=========================================="
+echo "Migration Complete!"
+echo "=========================================="
+echo ""
@@ -0,0 +1,54 @@
+#!/bin/bash
+
+# Migration Script: Add Duplicate-Detection Fingerprints
+# This script adds the transactions.fingerprint column and its hash index,
+# then has the backend compute fingerprints for existing rows. The
+# fingerprint covers (user_id, date, amount, normalized description), and
+# only the backend computes it, so it always matches what imports compare.
+
+set -e  # Exit on error
+
+echo "=========================================="
+echo "Duplicate-Detection Fingerprints"
+echo "=========================================="
+echo ""
+
+# Step 1: Add the column (metadata-only change, no table rewrite)
+echo "Step 1: Adding fingerprint column..."
+docker compose exec -T database psql -U admin -d finance_tracker -v ON_ERROR_STOP=1 -c "
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(32);
+"
+
+# Step 2: Backfill from the backend, in batches
+echo ""
+echo "Step 2: Computing fingerprints for existing transactions..."
+docker compose exec -T backend flask --app run backfill-fingerprints
+
+# Step 3: Build the index
+echo ""
+echo "Step 3: Building hash index..."
+docker compose exec -T database psql -U admin -d finance_tracker -v ON_ERROR_STOP=1 -c "
+CREATE INDEX IF NOT EXISTS idx_transactions_fingerprint ON transactions USING hash (fingerprint);
+"
+
+# Step 4: Report existing duplicates
+echo ""
+echo "Step 4: Existing duplicate groups"
+echo "----------------------------------------"
+docker compose exec -T database psql -U admin -d finance_tracker -c "
+SELECT user_id, COUNT(*) AS duplicate_groups, SUM(copies - 1) AS extra_rows
+FROM (
+    SELECT user_id, fingerprint, COUNT(*) AS copies
+    FROM transactions
+    GROUP BY user_id, fingerprint
+    HAVING COUNT(*) > 1
+) groups
+GROUP BY user_id;
+"
+
+echo ""
+echo "=========================================="
+echo "Migration Complete!"
+echo "=========================================="
+echo "Review the groups with GET /api/transactions/duplicates."
+echo ""
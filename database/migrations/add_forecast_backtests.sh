@@ -0,0 +1,35 @@
+#!/bin/bash
+
+# Migration Script: Add Forecast Backtests Table
+# This script creates the forecast_backtests table holding each user's
+# precomputed GET /api/backtest response. The nightly precompute job
+# (see add_projections_table.sh) fills it alongside the projections.
+
+set -e  # Exit on error
+
+echo "=========================================="
+echo "Forecast Backtests"
+echo "=========================================="
+echo ""
+
+echo "Creating forecast_backtests table..."
+docker compose exec -T database psql -U admin -d finance_tracker -v ON_ERROR_STOP=1 <<SQL
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS forecast_backtests (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES users(id) ON DELETE CASCADE,
+    data_version BIGINT NOT NULL,
+    period VARCHAR(7) NOT NULL,
+    result JSON NOT NULL,
+    computed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMIT;
+SQL
+
+echo ""
+echo "✓ Migration completed successfully!"
+echo "Backtests are computed by the next precompute run, or now with:"
+echo "  docker compose exec -T backend flask --app run precompute-projections"
+echo ""
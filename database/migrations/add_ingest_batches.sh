@@ -0,0 +1,32 @@
+#!/bin/bash
+
+# Migration Script: Add Ingest Batches Table
+# This script creates the ingest_batches table. The write-behind ingestion
+# flusher (INGEST_WRITE_BEHIND) records each batch here in the same
+# transaction as its rows, so a batch interrupted by a restart is never
+# inserted twice.
+
+set -e  # Exit on error
+
+echo "=========================================="
+echo "Ingest Batches"
+echo "=========================================="
+echo ""
+
+echo "Creating ingest_batches table..."
+docker compose exec -T database psql -U admin -d finance_tracker -v ON_ERROR_STOP=1 <<SQL
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS ingest_batches (
+    id VARCHAR(32) PRIMARY KEY,
+    committed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_ingest_batches_committed_at ON ingest_batches (committed_at);
+
+COMMIT;
+SQL
+
+echo ""
+echo "✓ Migration completed successfully!"
+echo "Enable write-behind ingestion with INGEST_WRITE_BEHIND=true in the backend environment."
+echo ""
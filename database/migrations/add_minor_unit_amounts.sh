@@ -0,0 +1,85 @@
+#!/bin/bash
+
+# Migration Script: Store Amounts as Integer Øre
+# This script converts transactions.amount from NUMERIC(10, 2) kroner to a
+# BIGINT count of øre (1/100 NOK), so sums and range scans use native
+# integer arithmetic. The backend that expects BIGINT øre must not run
+# against the old column (and vice versa), so the backend is stopped first.
+# Deploy the new backend right after this script.
+
+set -e  # Exit on error
+
+TIMESTAMP=$(date +%Y%m%d_%H%M%S)
+BACKUP_DIR="/home/mats/FinanceLog/database/backups"
+BACKUP_FILE="${BACKUP_DIR}/backup_before_minor_units_${TIMESTAMP}.sql"
+PSQL="docker compose exec -T database psql -U admin -d finance_tracker -v ON_ERROR_STOP=1"
+
+echo "=========================================="
+echo "Integer Øre Amounts"
+echo "=========================================="
+echo ""
+
+AMOUNT_TYPE=$($PSQL -tAc "SELECT data_type FROM information_schema.columns WHERE table_name = 'transactions' AND column_name = 'amount';")
+if [ "$AMOUNT_TYPE" = "bigint" ]; then
+    echo "transactions.amount is already BIGINT. Nothing to do."
+    exit 0
+fi
+
+# Step 1: Backup the database
+echo "Step 1: Creating database backup..."
+mkdir -p "${BACKUP_DIR}"
+docker compose exec -T database pg_dump -U admin -d finance_tracker > "${BACKUP_FILE}"
+echo "✓ Backup created: ${BACKUP_FILE} ($(du -h "${BACKUP_FILE}" | cut -f1))"
+
+read -p "The backend will be stopped during the conversion. Proceed? (yes/no): " CONFIRM
+if [ "$CONFIRM" != "yes" ]; then
+    echo "Migration cancelled."
+    exit 0
+fi
+
+# Step 2: Stop the backend so nothing writes kroner into the øre column
+echo ""
+echo "Step 2: Stopping backend..."
+docker compose stop backend
+
+# Step 3: Convert, checking per-user totals inside the same transaction
+echo ""
+echo "Step 3: Converting amounts..."
+$PSQL <<'SQL'
+BEGIN;
+
+CREATE TEMP TABLE totals_before ON COMMIT DROP AS
+SELECT user_id, SUM(amount) AS total, COUNT(*) AS rows FROM transactions GROUP BY user_id;
+
+-- Rewrites the table (and its amount index); partitions follow the parent
+ALTER TABLE transactions ALTER COLUMN amount TYPE BIGINT USING round(amount * 100)::bigint;
+
+DO $$
+DECLARE
+    mismatches INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO mismatches
+    FROM totals_before b
+    FULL JOIN (
+        SELECT user_id, SUM(amount) AS total, COUNT(*) AS rows FROM transactions GROUP BY user_id
+    ) a USING (user_id)
+    WHERE a.total IS DISTINCT FROM b.total * 100 OR a.rows IS DISTINCT FROM b.rows;
+
+    IF mismatches > 0 THEN
+        RAISE EXCEPTION 'Totals differ after conversion for % user(s); rolled back', mismatches;
+    END IF;
+END $$;
+
+COMMIT;
+
+ANALYZE transactions;
+SQL
+echo "✓ Amounts converted; totals verified"
+
+echo ""
+echo "=========================================="
+echo "Migration Complete!"
+echo "=========================================="
+echo "Deploy and start the new backend: docker compose up -d --build backend"
+echo "To undo: ALTER TABLE transactions ALTER COLUMN amount TYPE NUMERIC(10, 2) USING amount / 100.0;"
+echo ""
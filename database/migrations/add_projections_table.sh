@@ -0,0 +1,42 @@
+#!/bin/bash
+
+# Migration Script: Add Projections Table
+# This script creates the projections table holding precomputed
+# GET /api/projections/<category> responses, then fills it once with
+# 'flask precompute-projections'. The unique (user_id, category) constraint
+# is the index every projection read uses.
+
+set -e  # Exit on error
+
+echo "=========================================="
+echo "Precomputed Projections"
+echo "=========================================="
+echo ""
+
+echo "Step 1: Creating projections table..."
+docker compose exec -T database psql -U admin -d finance_tracker -v ON_ERROR_STOP=1 <<SQL
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS projections (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    category VARCHAR(255) NOT NULL,
+    data_version BIGINT NOT NULL,
+    period VARCHAR(7) NOT NULL,
+    status SMALLINT NOT NULL,
+    result JSON NOT NULL,
+    computed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_projections_user_category UNIQUE (user_id, category)
+);
+
+COMMIT;
+SQL
+
+echo ""
+echo "Step 2: Precomputing projections for all users..."
+docker compose exec -T backend flask --app run precompute-projections
+
+echo ""
+echo "✓ Migration completed successfully!"
+echo "The backend refreshes projections daily at PROJECTIONS_PRECOMPUTE_AT (default 02:30)."
+echo ""
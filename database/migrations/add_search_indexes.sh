@@ -0,0 +1,50 @@
+#!/bin/bash
+
+# Migration Script: Add Transaction Search Indexes
+# This script adds the full-text (tsvector) and trigram GIN indexes used by
+# /api/transactions/search to an existing database.
+# Indexes are built CONCURRENTLY, so the application can keep running.
+
+set -e  # Exit on error
+
+echo "=========================================="
+echo "Transaction Search Indexes"
+echo "=========================================="
+echo ""
+
+# Step 1: Enable pg_trgm
+echo "Step 1: Enabling pg_trgm extension..."
+docker compose exec -T database psql -U admin -d finance_tracker -v ON_ERROR_STOP=1 -c "
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+"
+
+# Step 2: Build indexes (CONCURRENTLY cannot run inside a transaction block)
+echo ""
+echo "Step 2: Building indexes (this may take a while on large tables)..."
+docker compose exec -T database psql -U admin -d finance_tracker -v ON_ERROR_STOP=1 -c "
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_description_fts ON transactions
+    USING gin (to_tsvector('simple'::regconfig, coalesce(description, '')));
+"
+docker compose exec -T database psql -U admin -d finance_tracker -v ON_ERROR_STOP=1 -c "
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_description_trgm ON transactions
+    USING gin (description gin_trgm_ops);
+"
+docker compose exec -T database psql -U admin -d finance_tracker -c "ANALYZE transactions;"
+
+# Step 3: Verify
+echo ""
+echo "Step 3: Verification"
+echo "----------------------------------------"
+docker compose exec -T database psql -U admin -d finance_tracker -c "
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'transactions'
+  AND indexname LIKE 'idx_transactions_description_%';
+"
+
+echo ""
+echo "=========================================="
+echo "Migration Complete!"
+echo "=========================================="
+echo "If an index build was interrupted, drop the INVALID index and re-run this script."
+echo ""
@@ -0,0 +1,28 @@
+#!/bin/bash
+
+# Migration Script: Add Transaction Versions
+# This script adds transactions.version, bumped by every change to a row.
+# Clients send the version they last saw (If-Match or 'version') with
+# PUT/DELETE /api/transaction/<id> and get 409 instead of overwriting a newer
+# edit. Adding a NOT NULL column with a constant default is a metadata-only
+# change; existing rows start at version 1.
+
+set -e  # Exit on error
+
+echo "=========================================="
+echo "Transaction Versions"
+echo "=========================================="
+echo ""
+
+echo "Adding version column..."
+docker compose exec -T database psql -U admin -d finance_tracker -v ON_ERROR_STOP=1 <<SQL
+BEGIN;
+
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+COMMIT;
+SQL
+
+echo ""
+echo "✓ Migration completed successfully!"
+echo ""
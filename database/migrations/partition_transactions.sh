@@ -0,0 +1,220 @@
+#!/bin/bash
+
+# Migration Script: Partition Transactions by Year
+# This script converts the existing heap table "transactions" into a table
+# range-partitioned by year on transaction_date, while the application keeps
+# running:
+#   1. A partitioned copy is created and kept in sync by a trigger
+#   2. Existing rows are copied one year at a time
+#   3. The tables are swapped inside a short lock after a final reconcile
+# The old table is kept as "transactions_unpartitioned" for rollback.
+
+set -e  # Exit on error
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+TIMESTAMP=$(date +%Y%m%d_%H%M%S)
+BACKUP_DIR="/home/mats/FinanceLog/database/backups"
+BACKUP_FILE="${BACKUP_DIR}/backup_before_partitioning_${TIMESTAMP}.sql"
+PSQL="docker compose exec -T database psql -U admin -d finance_tracker -v ON_ERROR_STOP=1"
+
+echo "=========================================="
+echo "Partition Transactions by Year"
+echo "=========================================="
+echo ""
+
+# Step 1: Backup the database
+echo "Step 1: Creating database backup..."
+mkdir -p "${BACKUP_DIR}"
+docker compose exec -T database pg_dump -U admin -d finance_tracker > "${BACKUP_FILE}"
+echo "✓ Backup created: ${BACKUP_FILE} ($(du -h "${BACKUP_FILE}" | cut -f1))"
+
+# add_fingerprints.sh, add_change_log.sh and add_transaction_versions.sh must have run first
+# so both tables have the same columns
+HAS_COLUMNS=$($PSQL -tAc "SELECT COUNT(*) FROM information_schema.columns WHERE table_name = 'transactions' AND column_name IN ('fingerprint', 'change_seq', 'version');")
+if [ "$HAS_COLUMNS" != "3" ]; then
+    echo "✗ Run add_fingerprints.sh, add_change_log.sh and add_transaction_versions.sh before partitioning."
+    exit 1
+fi
+
+# Rows are copied and mirrored by column name, so the tables' column order does not matter
+COLUMNS="id, transaction_date, category, subcategory, description, amount, user_id, fingerprint, change_seq, version"
+NEW_COLUMNS=$(sed 's/\([a-z_][a-z_]*\)/NEW.\1/g' <<< "${COLUMNS}")
+
+# Step 2: Check current state
+echo ""
+echo "Step 2: Current table state"
+echo "----------------------------------------"
+IS_PARTITIONED=$($PSQL -tAc "SELECT relkind = 'p' FROM pg_class WHERE relname = 'transactions';")
+if [ "$IS_PARTITIONED" = "t" ]; then
+    echo "transactions is already partitioned. Nothing to do."
+    exit 0
+fi
+$PSQL -c "
+SELECT EXTRACT(YEAR FROM transaction_date) AS year, COUNT(*) AS transaction_count
+FROM transactions
+GROUP BY 1
+ORDER BY 1;
+"
+
+read -p "Do you want to proceed with the migration? (yes/no): " CONFIRM
+if [ "$CONFIRM" != "yes" ]; then
+    echo "Migration cancelled."
+    exit 0
+fi
+
+# Step 3: Create the partitioned table and the sync trigger
+echo ""
+echo "Step 3: Creating partitioned table..."
+# Copy the live amount type (NUMERIC(10,2), or BIGINT øre after add_minor_unit_amounts.sh)
+AMOUNT_TYPE=$($PSQL -tAc "SELECT format_type(atttypid, atttypmod) FROM pg_attribute WHERE attrelid = 'transactions'::regclass AND attname = 'amount';")
+sed -e "s/__AMOUNT_TYPE__/${AMOUNT_TYPE}/" -e "s/__COLUMNS__/${COLUMNS}/" -e "s/__NEW_COLUMNS__/${NEW_COLUMNS}/" <<'SQL' | $PSQL
+BEGIN;
+
+CREATE TABLE transactions_partitioned (
+    id INTEGER NOT NULL DEFAULT nextval('transactions_id_seq'),
+    transaction_date DATE NOT NULL,
+    category VARCHAR(255) NOT NULL,
+    subcategory VARCHAR(255),
+    description TEXT,
+    amount __AMOUNT_TYPE__ NOT NULL,
+    user_id INTEGER NOT NULL,
+    fingerprint VARCHAR(32),
+    change_seq BIGINT NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 1,
+    CONSTRAINT transactions_partitioned_pkey PRIMARY KEY (id, transaction_date),
+    CONSTRAINT fk_user_partitioned FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) PARTITION BY RANGE (transaction_date);
+
+CREATE TABLE transactions_partitioned_default PARTITION OF transactions_partitioned DEFAULT;
+
+-- Yearly partitions covering existing data plus two years ahead
+DO $$
+DECLARE
+    first_year INTEGER;
+    last_year INTEGER;
+BEGIN
+    SELECT LEAST(COALESCE(EXTRACT(YEAR FROM MIN(transaction_date))::INTEGER, EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER),
+                 EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER)
+    INTO first_year FROM transactions;
+    last_year := EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER + 2;
+    FOR y IN first_year..last_year LOOP
+        EXECUTE format('CREATE TABLE %I PARTITION OF transactions_partitioned FOR VALUES FROM (%L) TO (%L)',
+                       format('transactions_y%s', y), make_date(y, 1, 1), make_date(y + 1, 1, 1));
+    END LOOP;
+END $$;
+
+-- Same indexes as database/init/init.sql
+CREATE INDEX idx_tp_user_id ON transactions_partitioned(user_id);
+CREATE INDEX idx_tp_user_date ON transactions_partitioned(user_id, transaction_date, id);
+CREATE INDEX idx_tp_user_category_date ON transactions_partitioned(user_id, category, transaction_date);
+CREATE INDEX idx_tp_user_subcategory ON transactions_partitioned(user_id, subcategory);
+CREATE INDEX idx_tp_user_amount ON transactions_partitioned(user_id, amount);
+CREATE INDEX idx_tp_fingerprint ON transactions_partitioned USING hash (fingerprint);
+CREATE INDEX idx_tp_user_change_seq ON transactions_partitioned(user_id, change_seq);
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_tp_description_fts ON transactions_partitioned
+    USING gin (to_tsvector('simple'::regconfig, coalesce(description, '')));
+CREATE INDEX idx_tp_description_trgm ON transactions_partitioned
+    USING gin (description gin_trgm_ops);
+
+-- Mirror writes made while the copy runs
+CREATE FUNCTION transactions_partition_sync() RETURNS trigger AS $fn$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM transactions_partitioned WHERE id = OLD.id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO transactions_partitioned (__COLUMNS__) VALUES (__NEW_COLUMNS__) ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$fn$ LANGUAGE plpgsql;
+
+CREATE TRIGGER transactions_partition_sync
+AFTER INSERT OR UPDATE OR DELETE ON transactions
+FOR EACH ROW EXECUTE FUNCTION transactions_partition_sync();
+
+COMMIT;
+SQL
+echo "✓ Partitioned table created"
+
+# Step 4: Copy existing rows one year at a time (short transactions, no table lock)
+echo ""
+echo "Step 4: Copying rows..."
+YEARS=$($PSQL -tAc "SELECT DISTINCT EXTRACT(YEAR FROM transaction_date)::INTEGER FROM transactions ORDER BY 1;")
+for YEAR in $YEARS; do
+    echo "  Copying ${YEAR}..."
+    $PSQL -c "
+INSERT INTO transactions_partitioned (${COLUMNS})
+SELECT ${COLUMNS} FROM transactions
+WHERE transaction_date >= make_date(${YEAR}, 1, 1) AND transaction_date < make_date(${YEAR} + 1, 1, 1)
+ON CONFLICT DO NOTHING;
+"
+done
+echo "✓ Rows copied"
+
+# Step 5: Reconcile and swap under a short exclusive lock
+echo ""
+echo "Step 5: Swapping tables..."
+T_COLUMNS=$(sed 's/\([a-z_][a-z_]*\)/t.\1/g' <<< "${COLUMNS}")
+P_COLUMNS=$(sed 's/\([a-z_][a-z_]*\)/p.\1/g' <<< "${COLUMNS}")
+sed -e "s/__COLUMNS__/${COLUMNS}/" -e "s/__T_COLUMNS__/${T_COLUMNS}/g" -e "s/__P_COLUMNS__/${P_COLUMNS}/" <<'SQL' | $PSQL
+BEGIN;
+LOCK TABLE transactions IN ACCESS EXCLUSIVE MODE;
+
+-- Drop copies of rows that changed between the copy and the trigger firing
+DELETE FROM transactions_partitioned p
+WHERE NOT EXISTS (
+    SELECT 1 FROM transactions t
+    WHERE t.id = p.id AND ROW(__T_COLUMNS__) IS NOT DISTINCT FROM ROW(__P_COLUMNS__)
+);
+INSERT INTO transactions_partitioned (__COLUMNS__)
+SELECT __T_COLUMNS__ FROM transactions t
+WHERE NOT EXISTS (
+    SELECT 1 FROM transactions_partitioned p
+    WHERE p.id = t.id AND p.transaction_date = t.transaction_date
+);
+
+DROP TRIGGER transactions_partition_sync ON transactions;
+DROP FUNCTION transactions_partition_sync();
+
+ALTER TABLE transactions RENAME TO transactions_unpartitioned;
+ALTER TABLE transactions_partitioned RENAME TO transactions;
+ALTER TABLE transactions_partitioned_default RENAME TO transactions_default;
+ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id;
+ALTER TABLE transactions_unpartitioned ALTER COLUMN id DROP DEFAULT;
+
+COMMIT;
+SQL
+echo "✓ Tables swapped"
+
+# Step 6: Install partition maintenance and verify
+echo ""
+echo "Step 6: Installing ensure_transaction_partitions()..."
+$PSQL < "${SCRIPT_DIR}/../init/partitions.sql"
+$PSQL -c "ANALYZE transactions;"
+
+echo ""
+echo "Verification"
+echo "----------------------------------------"
+$PSQL -c "
+SELECT
+    (SELECT COUNT(*) FROM transactions) AS partitioned_rows,
+    (SELECT COUNT(*) FROM transactions_unpartitioned) AS original_rows;
+"
+$PSQL -c "
+SELECT inhrelid::regclass AS partition, pg_get_expr(c.relpartbound, c.oid) AS bounds
+FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+WHERE inhparent = 'transactions'::regclass
+ORDER BY 1;
+"
+
+echo ""
+echo "=========================================="
+echo "Migration Complete!"
+echo "=========================================="
+echo "Backup saved at: ${BACKUP_FILE}"
+echo ""
+echo "Once the application has been verified, drop the old table:"
+echo "  docker compose exec -T database psql -U admin -d finance_tracker -c 'DROP TABLE transactions_unpartitioned;'"
+echo ""
@@ -44,6 +44,56 @@ export const getTransactions = async (params = {}) => { // updated function to a
   }
 };
 
+// Server-side filtered, sorted and paginated transactions.
+// Array values (e.g. category: ['Mat', 'Hus']) are sent as repeated parameters.
+export const queryTransactions = async (params = {}) => {
+  const searchParams = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    (Array.isArray(value) ? value : [value])
+      .filter((v) => v !== undefined && v !== null && v !== '')
+      .forEach((v) => searchParams.append(key, v));
+  });
+  try {
+    const response = await axios.get(`${API_URL}/transactions`, { params: searchParams });
+    return response.data;
+  } catch (error) {
+    console.error('Error querying transactions:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+export const searchTransactions = async (q, params = {}) => {
+  try {
+    const response = await axios.get(`${API_URL}/transactions/search`, { params: { q, ...params } });
+    return response.data;
+  } catch (error) {
+    console.error('Error searching transactions:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+// Month x year totals plus per-month averages for the bar chart views
+export const getMonthlyComparison = async (params = {}) => {
+  try {
+    const response = await axios.get(`${API_URL}/monthly-comparison`, { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching monthly comparison:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+// Category x month pivot for one year; breakdown adds a subcategory table for that category
+export const getPivot = async (year, breakdown) => {
+  try {
+    const response = await axios.get(`${API_URL}/pivot`, { params: { year, breakdown } });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching pivot:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
 export const addTransaction = async (transaction) => {
   try {
     const response = await axios.post(`${API_URL}/transaction`, transaction, {
@@ -78,6 +128,27 @@ export const updateTransaction = async (id, transaction) => {
   }
 };
 
+// Bulk operations take either { ids: [...] } or { filter: {...} } as the target
+export const bulkUpdateTransactions = async (target, changes) => {
+  try {
+    const response = await axios.patch(`${API_URL}/transactions`, { ...target, changes });
+    return response.data;
+  } catch (error) {
+    console.error('Error bulk updating transactions:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+export const bulkDeleteTransactions = async (target) => {
+  try {
+    const response = await axios.delete(`${API_URL}/transactions`, { data: target });
+    return response.data;
+  } catch (error) {
+    console.error('Error bulk deleting transactions:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
 export const getProjections = async (category) => {
   try {
     const response = await axios.get(`${API_URL}/projections/${encodeURIComponent(category)}`);
@@ -88,6 +159,191 @@ export const getProjections = async (category) => {
   }
 };
 
+// reconciliation: 'mint' (default) or 'bottom_up'
+export const getHierarchicalProjections = async (category, reconciliation = 'mint') => {
+  try {
+    const response = await axios.get(`${API_URL}/projections/${encodeURIComponent(category)}`, {
+      params: { hierarchical: true, reconciliation }
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching hierarchical projections:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+// options: { months, paths, starting_balance, seed }
+export const simulateCashflow = async (options = {}) => {
+  try {
+    const response = await axios.get(`${API_URL}/simulate`, { params: options });
+    return response.data;
+  } catch (error) {
+    console.error('Error simulating cashflow:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+// options: { folds, horizon, category }
+export const getProjectionBacktest = async (options = {}) => {
+  try {
+    const response = await axios.get(`${API_URL}/backtest`, { params: options });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching projection backtest:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+// requests: paths under the API ('/categories') or { id, path }; returns [{ id, path, status, body }]
+export const batchGet = async (requests) => {
+  const toApiPath = (path) => `/api${path}`;
+  try {
+    const response = await axios.post(`${API_URL}/batch`, {
+      requests: requests.map((r) => (typeof r === 'string' ? toApiPath(r) : { ...r, path: toApiPath(r.path) }))
+    });
+    return response.data.responses;
+  } catch (error) {
+    console.error('Error running batch request:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+// Write-behind insert (when enabled on the server): returns { token, status: 'pending', queued }
+export const ingestTransactions = async (transactions) => {
+  try {
+    const response = await axios.post(`${API_URL}/transactions/ingest`, { transactions });
+    return response.data;
+  } catch (error) {
+    console.error('Error queueing transactions:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+// Waits up to `wait` seconds for the rows to commit; status is 'pending', 'committed' (with ids) or 'failed'
+export const getIngestStatus = async (token, wait = 0) => {
+  try {
+    const response = await axios.get(`${API_URL}/transactions/ingest/${token}`, { params: { wait } });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching ingest status:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+// onDuplicate: 'skip' (default), 'flag' or 'allow'
+export const importTransactions = async (transactions, applyRules = true, onDuplicate = 'skip') => {
+  try {
+    const response = await axios.post(`${API_URL}/transactions/import`, {
+      transactions,
+      apply_rules: applyRules,
+      on_duplicate: onDuplicate
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error importing transactions:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+// Delta sync: pass the 'seq' of the previous response as 'since' (0 for a full sync).
+// When the response has reset: true, replace local state with 'upserts'. See transactionSync.js.
+export const getTransactionChanges = async (since = 0, params = {}) => {
+  try {
+    const response = await axios.get(`${API_URL}/transactions/changes`, { params: { since, ...params } });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching transaction changes:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+export const getDuplicateTransactions = async (limit = 100) => {
+  try {
+    const response = await axios.get(`${API_URL}/transactions/duplicates`, { params: { limit } });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching duplicates:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+// format: 'parquet' or 'arrow'; resolves to a Blob for download
+export const exportTransactions = async (format = 'parquet') => {
+  try {
+    const response = await axios.get(`${API_URL}/transactions/export`, {
+      params: { format },
+      responseType: 'blob'
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error exporting transactions:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+export const restoreTransactions = async (file) => {
+  try {
+    const formData = new FormData();
+    formData.append('file', file);
+    const response = await axios.post(`${API_URL}/transactions/restore`, formData);
+    return response.data;
+  } catch (error) {
+    console.error('Error restoring transactions:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+// Categorization rules
+export const getRules = async () => {
+  try {
+    const response = await axios.get(`${API_URL}/rules`);
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching rules:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+export const createRule = async (rule) => {
+  try {
+    const response = await axios.post(`${API_URL}/rules`, rule);
+    return response.data;
+  } catch (error) {
+    console.error('Error creating rule:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+export const updateRule = async (id, rule) => {
+  try {
+    const response = await axios.put(`${API_URL}/rules/${id}`, rule);
+    return response.data;
+  } catch (error) {
+    console.error('Error updating rule:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+export const deleteRule = async (id) => {
+  try {
+    const response = await axios.delete(`${API_URL}/rules/${id}`);
+    return response.data;
+  } catch (error) {
+    console.error('Error deleting rule:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
+export const applyRules = async (options = {}) => {
+  try {
+    const response = await axios.post(`${API_URL}/rules/apply`, options);
+    return response.data;
+  } catch (error) {
+    console.error('Error applying rules:', error.response?.data || error.message);
+    throw error;
+  }
+};
+
 // Authentication API functions
 export const login = async (username, password) => {
   try {
@@ -12,6 +12,7 @@ import {
   LineController,
 } from 'chart.js';
 import { Chart } from 'react-chartjs-2';
+import { getMonthlyComparison } from '../api';
 
 // Import the categories from your existing configuration
 const CATEGORY_OPTIONS = {
@@ -35,8 +36,9 @@ ChartJS.register(
   LineController
 );
 
-const BarChartView = ({ transactions }) => {
+const BarChartView = () => {
   const [selectedCategory, setSelectedCategory] = useState('All');
+  const [comparison, setComparison] = useState({ years: [], matrix: {}, averages: [] });
   const [chartKey, setChartKey] = useState(0);
 
   // Force chart re-render on window resize (including zoom)
@@ -56,66 +58,29 @@ const BarChartView = ({ transactions }) => {
     };
   }, []);
 
-  const filterTransactionsByCategory = (transactions, category) => {
-    if (category === 'All') return transactions;
-    
-    return transactions.filter(tx => {
-      // Check if transaction matches main category
-      if (tx.category === category) return true;
-      // Check if transaction's subcategory matches any in the category's subcategories
-      if (tx.subcategory && CATEGORY_OPTIONS[category]) {
-        return CATEGORY_OPTIONS[category].some(sub => 
-          sub.toLowerCase() === tx.subcategory.toLowerCase()
-        );
+  // Month x year totals and averages are computed on the server
+  useEffect(() => {
+    let cancelled = false;
+    const fetchComparison = async () => {
+      try {
+        const data = await getMonthlyComparison(selectedCategory === 'All' ? {} : { category: selectedCategory });
+        if (!cancelled) {
+          setComparison(data);
+        }
+      } catch (error) {
+        console.error('Error fetching monthly comparison:', error);
       }
-      return false;
-    });
-  };
-
-  const filteredTransactions = filterTransactionsByCategory(transactions, selectedCategory);
-  const groupedData = {};
-  const monthlyAverages = {};
-
-  // Group transactions by month and year
-  filteredTransactions.forEach((tx) => {
-    const date = new Date(tx.transaction_date);
-    const month = date.toLocaleString('default', { month: 'long' });
-    const year = date.getFullYear();
-    const key = `${month} ${year}`;
-
-    groupedData[key] = (groupedData[key] || 0) + tx.amount;
-  });
+    };
+    fetchComparison();
+    return () => { cancelled = true; };
+  }, [selectedCategory]);
 
   // Create labels for months
   const allMonths = Array.from({ length: 12 }, (_, i) =>
     new Date(0, i).toLocaleString('default', { month: 'long' })
   );
 
-  // Extract years from the data
-  const years = Array.from(
-    new Set(transactions.map((tx) => new Date(tx.transaction_date).getFullYear()))
-  ).sort();
-
-  // Get current date for comparison
-  const currentDate = new Date();
-  const currentYear = currentDate.getFullYear();
-  const currentMonth = currentDate.getMonth();
-
-  // Calculate monthly averages across years, excluding future months
-  allMonths.forEach((month, monthIndex) => {
-    const monthValues = years
-      .filter(year => {
-        // Include year if:
-        // 1. It's a past year, or
-        // 2. It's current year but the month is not in the future
-        return year < currentYear || (year === currentYear && monthIndex <= currentMonth);
-      })
-      .map(year => groupedData[`${month} ${year}`] || 0);
-
-    const sum = monthValues.reduce((acc, val) => acc + val, 0);
-    // Only divide by the number of valid years we actually found data for
-    monthlyAverages[month] = monthValues.length > 0 ? sum / monthValues.length : 0;
-  });
+  const { years } = comparison;
 
   // Define distinct colors and patterns for each year
   const colorPalette = [
@@ -178,7 +143,7 @@ const BarChartView = ({ transactions }) => {
     ...years.map((year) => ({
       type: 'bar',
       label: year.toString(),
-      data: allMonths.map((month) => groupedData[`${month} ${year}`] || 0),
+      data: comparison.matrix[year],
       backgroundColor: yearStyles[year].backgroundColor,
       borderColor: yearStyles[year].borderColor,
       borderWidth: 1,
@@ -187,7 +152,7 @@ const BarChartView = ({ transactions }) => {
     {
       type: 'line',
       label: 'Monthly Average',
-      data: allMonths.map((month) => monthlyAverages[month]),
+      data: comparison.averages,
       borderColor: 'rgba(255, 0, 0, 0.8)',  // Red line
       backgroundColor: 'rgba(255, 0, 0, 0.1)',
       borderWidth: 2,
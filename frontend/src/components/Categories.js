@@ -1,10 +1,10 @@
 import React, { useState, useEffect } from 'react';
-import { getTransactions, getCategories } from '../api';
+import { getPivot, getCategories } from '../api';
 
 const Months = [1,2,3,4,5,6,7,8,9,10,11,12];
 
 const Categories = () => {
-  const [transactions, setTransactions] = useState([]);
+  const [pivot, setPivot] = useState(null);
   const [availableYears, setAvailableYears] = useState([]);
   const [selectedYear, setSelectedYear] = useState(new Date().getFullYear());
   const [categoryOptions, setCategoryOptions] = useState({});
@@ -12,15 +12,8 @@ const Categories = () => {
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    const fetchData = async () => {
+    const fetchCategories = async () => {
       try {
-        setLoading(true);
-
-        // Fetch transactions
-        const transactionData = await getTransactions();
-        setTransactions(transactionData);
-
-        // Fetch categories
         const categoriesData = await getCategories();
 
         // Filter out 'Inntekt' from the main category options for expense tracking
@@ -38,125 +31,38 @@ const Categories = () => {
         if (firstCategory) {
           setBreakdownCategory(firstCategory);
         }
-
-        // Derive unique years from transaction dates
-        const years = Array.from(new Set(transactionData.map(t => new Date(t.transaction_date).getFullYear())));
-        years.sort((a, b) => a - b);
-        setAvailableYears(years);
-
-        if (!years.includes(selectedYear) && years.length > 0) {
-          setSelectedYear(years[0]);
-        }
-
-        setLoading(false);
       } catch (error) {
-        console.error('Error fetching data:', error);
-        setLoading(false);
+        console.error('Error fetching categories:', error);
       }
     };
-    fetchData();
+    fetchCategories();
   }, []);
 
-  const aggregateData = () => {
-    const result = {};
-    Object.keys(categoryOptions).forEach(mainCat => {
-      result[mainCat] = {};
-      Months.forEach(month => {
-        result[mainCat][month] = 0;
-      });
-    });
-    transactions
-      .filter(t => new Date(t.transaction_date).getFullYear() === selectedYear)
-      .forEach(t => {
-        const date = new Date(t.transaction_date);
-        const month = date.getMonth() + 1;
-        const amount = parseFloat(t.amount);
-        for (let mainCat in categoryOptions) {
-          // Check if the transaction's main category matches or its subcategory matches the options
-          if (
-            t.category.toLowerCase() === mainCat.toLowerCase() ||
-            (t.subcategory && categoryOptions[mainCat].some(cat => cat.toLowerCase() === t.subcategory.toLowerCase()))
-          ) {
-            result[mainCat][month] += amount;
-            break;
-          }
-        }
-      });
-    return result;
-  };
-
-  // Helper to aggregate data for any main category's subcategories
-  const aggregateSubData = (mainCat) => {
-    const result = {};
-    const subCategories = categoryOptions[mainCat] || [];
-    
-    // Add "Uncategorized" to track unmatched transactions
-    result["Uncategorized"] = {};
-    Months.forEach(month => {
-        result["Uncategorized"][month] = 0;
-    });
-
-    // Initialize regular subcategories
-    subCategories.forEach(subcat => {
-        result[subcat] = {};
-        Months.forEach(month => {
-            result[subcat][month] = 0;
-        });
-    });
-
-    transactions
-        .filter(t => {
-            // Filter transactions by main category AND selected year
-            const transactionYear = new Date(t.transaction_date).getFullYear();
-            return t.category.toLowerCase() === mainCat.toLowerCase() && 
-                   transactionYear === selectedYear;
-        })
-        .forEach(t => {
-            const month = new Date(t.transaction_date).getMonth() + 1;
-            const amount = parseFloat(t.amount);
-
-            if (t.subcategory) {
-                // Try to find matching subcategory
-                const found = subCategories.find(s => 
-                    s.toLowerCase() === t.subcategory.toLowerCase()
-                );
-                if (found) {
-                    result[found][month] += amount;
-                } else {
-                    // If no matching subcategory found, add to Uncategorized
-                    result["Uncategorized"][month] += amount;
-                }
-            } else {
-                // If no subcategory provided, add to Uncategorized
-                result["Uncategorized"][month] += amount;
-            }
-        });
-
-    return result;
-  };
-
-  // In the aggregateData function, add a new function for income data
-  const aggregateIncomeData = () => {
-    const result = {};
-    Months.forEach(month => {
-      result[month] = 0;
-    });
-
-    transactions
-      .filter(t => new Date(t.transaction_date).getFullYear() === selectedYear)
-      .forEach(t => {
-        if (t.category.toLowerCase() === 'inntekt') {
-          const date = new Date(t.transaction_date);
-          const month = date.getMonth() + 1;
-          result[month] += parseFloat(t.amount);
+  // The pivot (and the subcategory breakdown) is computed on the server for one year at a time
+  useEffect(() => {
+    let cancelled = false;
+    const fetchPivot = async () => {
+      try {
+        const data = await getPivot(selectedYear, breakdownCategory || undefined);
+        if (cancelled) return;
+        setAvailableYears(data.years);
+        if (!data.years.includes(selectedYear) && data.years.length > 0) {
+          setSelectedYear(data.years[0]);
+          return;
         }
-      });
-    return result;
-  };
-
-  const data = aggregateData();
+        setPivot(data);
+      } catch (error) {
+        console.error('Error fetching pivot:', error);
+      }
+      if (!cancelled) {
+        setLoading(false);
+      }
+    };
+    fetchPivot();
+    return () => { cancelled = true; };
+  }, [selectedYear, breakdownCategory]);
 
-  if (loading) {
+  if (loading || !pivot) {
     return (
       <div className="p-5 m-5 w-[95%] mx-auto bg-white border border-gray-200 rounded-lg shadow-sm">
         <div className="flex justify-center items-center h-64">
@@ -202,28 +108,28 @@ const Categories = () => {
             </tr>
           </thead>
           <tbody>
-            {Object.keys(categoryOptions).map(mainCat => (
-              <tr key={mainCat} className="hover:bg-gray-50">
-                <td className="p-3 border border-gray-200">{mainCat}</td>
-                {Months.map(month => (
-                  <td key={month} className="p-3 text-right border border-gray-200">
-                    {Math.round(data[mainCat][month]).toLocaleString('fr-FR')}
+            {pivot.expenses.rows.map(row => (
+              <tr key={row.category} className="hover:bg-gray-50">
+                <td className="p-3 border border-gray-200">{row.category}</td>
+                {row.values.map((value, index) => (
+                  <td key={Months[index]} className="p-3 text-right border border-gray-200">
+                    {Math.round(value).toLocaleString('fr-FR')}
                   </td>
                 ))}
                 <td className="p-3 text-right border border-gray-200 border-l-2 border-l-gray-400">
-                  {Math.round(Months.reduce((sum, m) => sum + data[mainCat][m], 0)).toLocaleString('fr-FR')}
+                  {Math.round(row.total).toLocaleString('fr-FR')}
                 </td>
               </tr>
             ))}
             <tr className="bg-gray-50 font-semibold">
               <td className="p-3 border border-gray-200">Total</td>
-              {Months.map(month => (
-                <td key={month} className="p-3 text-right border border-gray-200">
-                  {Math.round(Object.keys(categoryOptions).reduce((sum, cat) => sum + data[cat][month], 0)).toLocaleString('fr-FR')}
+              {pivot.expenses.totals.map((value, index) => (
+                <td key={Months[index]} className="p-3 text-right border border-gray-200">
+                  {Math.round(value).toLocaleString('fr-FR')}
                 </td>
               ))}
               <td className="p-3 text-right border border-gray-200 border-l-2 border-l-gray-400">
-                {Math.round(Months.reduce((total, m) => total + Object.keys(categoryOptions).reduce((sum, cat) => sum + data[cat][m], 0), 0)).toLocaleString('fr-FR')}
+                {Math.round(pivot.expenses.grand_total).toLocaleString('fr-FR')}
               </td>
             </tr>
           </tbody>
@@ -248,13 +154,13 @@ const Categories = () => {
           <tbody>
             <tr className="hover:bg-gray-50">
               <td className="p-3 border border-gray-200">Income</td>
-              {Months.map(month => (
-                <td key={month} className="p-3 text-right border border-gray-200">
-                  {Math.round(aggregateIncomeData()[month]).toLocaleString('fr-FR')}
+              {pivot.income.values.map((value, index) => (
+                <td key={Months[index]} className="p-3 text-right border border-gray-200">
+                  {Math.round(value).toLocaleString('fr-FR')}
                 </td>
               ))}
               <td className="p-3 text-right border border-gray-200 border-l-2 border-l-gray-400">
-                {Math.round(Months.reduce((sum, m) => sum + aggregateIncomeData()[m], 0)).toLocaleString('fr-FR')}
+                {Math.round(pivot.income.total).toLocaleString('fr-FR')}
               </td>
             </tr>
           </tbody>
@@ -278,71 +184,51 @@ const Categories = () => {
         ))}
       </div>
 
-      {breakdownCategory && (
-        (() => {
-          const subData = aggregateSubData(breakdownCategory);
-          return (
-            <div className="mt-4">
-              <h3 className="text-xl font-semibold mb-4">{breakdownCategory} Subcategories</h3>
-              <div className="overflow-x-auto">
-                <table className="w-full mb-10 border-collapse">
-                  <thead>
-                    <tr className="bg-gray-50">
-                      <th className="p-3 text-left font-semibold border border-gray-200 min-w-[150px]">Sub Category</th>
-                      {Months.map(month => (
-                        <th key={month} className="p-3 text-center font-semibold border border-gray-200">
-                          {new Date(0, month - 1).toLocaleString('default', { month: 'long' })}
-                        </th>
-                      ))}
-                      <th className="p-3 text-center font-semibold border border-gray-200 border-l-2 border-l-gray-400">Total</th>
-                    </tr>
-                  </thead>
-                  <tbody>
-                    {[...(categoryOptions[breakdownCategory] || []), "Uncategorized"].map(subcat => (
-                      <tr key={subcat} className="hover:bg-gray-50">
-                        <td className="p-3 border border-gray-200">{subcat}</td>
-                        {Months.map(month => (
-                          <td key={month} className="p-3 text-right border border-gray-200">
-                            {Math.round(subData[subcat][month]).toLocaleString('fr-FR')}
-                          </td>
-                        ))}
-                        <td className="p-3 text-right border border-gray-200 border-l-2 border-l-gray-400">
-                          {Math.round(Months.reduce((sum, m) => sum + subData[subcat][m], 0)).toLocaleString('fr-FR')}
-                        </td>
-                      </tr>
-                    ))}
-                    <tr className="bg-gray-50 font-semibold">
-                      <td className="p-3 border border-gray-200">Total</td>
-                      {Months.map(month => (
-                        <td key={month} className="p-3 text-right border border-gray-200">
-                          {Math.round(
-                            [...(categoryOptions[breakdownCategory] || []), "Uncategorized"].reduce(
-                              (sum, subcat) => sum + subData[subcat][month],
-                              0
-                            )
-                          ).toLocaleString('fr-FR')}
-                        </td>
-                      ))}
-                      <td className="p-3 text-right border border-gray-200 border-l-2 border-l-gray-400">
-                        {Math.round(
-                          Months.reduce(
-                            (total, m) =>
-                              total +
-                              [...(categoryOptions[breakdownCategory] || []), "Uncategorized"].reduce(
-                                (sum, subcat) => sum + subData[subcat][m],
-                                0
-                              ),
-                            0
-                          )
-                        ).toLocaleString('fr-FR')}
+      {pivot.breakdown && (
+        <div className="mt-4">
+          <h3 className="text-xl font-semibold mb-4">{pivot.breakdown.category} Subcategories</h3>
+          <div className="overflow-x-auto">
+            <table className="w-full mb-10 border-collapse">
+              <thead>
+                <tr className="bg-gray-50">
+                  <th className="p-3 text-left font-semibold border border-gray-200 min-w-[150px]">Sub Category</th>
+                  {Months.map(month => (
+                    <th key={month} className="p-3 text-center font-semibold border border-gray-200">
+                      {new Date(0, month - 1).toLocaleString('default', { month: 'long' })}
+                    </th>
+                  ))}
+                  <th className="p-3 text-center font-semibold border border-gray-200 border-l-2 border-l-gray-400">Total</th>
+                </tr>
+              </thead>
+              <tbody>
+                {pivot.breakdown.rows.map(row => (
+                  <tr key={row.subcategory} className="hover:bg-gray-50">
+                    <td className="p-3 border border-gray-200">{row.subcategory}</td>
+                    {row.values.map((value, index) => (
+                      <td key={Months[index]} className="p-3 text-right border border-gray-200">
+                        {Math.round(value).toLocaleString('fr-FR')}
                       </td>
-                    </tr>
-                  </tbody>
-                </table>
-              </div>
-            </div>
-          );
-        })()
+                    ))}
+                    <td className="p-3 text-right border border-gray-200 border-l-2 border-l-gray-400">
+                      {Math.round(row.total).toLocaleString('fr-FR')}
+                    </td>
+                  </tr>
+                ))}
+                <tr className="bg-gray-50 font-semibold">
+                  <td className="p-3 border border-gray-200">Total</td>
+                  {pivot.breakdown.totals.map((value, index) => (
+                    <td key={Months[index]} className="p-3 text-right border border-gray-200">
+                      {Math.round(value).toLocaleString('fr-FR')}
+                    </td>
+                  ))}
+                  <td className="p-3 text-right border border-gray-200 border-l-2 border-l-gray-400">
+                    {Math.round(pivot.breakdown.grand_total).toLocaleString('fr-FR')}
+                  </td>
+                </tr>
+              </tbody>
+            </table>
+          </div>
+        </div>
       )}
     </div>
   );
@@ -3,18 +3,34 @@ import StackedChartView from './StackedChartView';
 import BarChartView from './BarChartView';
 import IncomeBarChartView from './IncomeBarChartView';
 import { Line, Bar, XAxis, YAxis, Tooltip, ResponsiveContainer, Legend, ComposedChart, CartesianGrid } from 'recharts';
-import { getTransactions } from '../api';
+import { createTransactionSync } from '../transactionSync';
 import '../Dashboard.css';
 
+// Kept across visits to the dashboard, so coming back only fetches what changed
+const syncDashboardTransactions = createTransactionSync('transaction_date,category,amount');
+
 const Dashboard = () => {
   const [transactions, setTransactions] = useState([]);
 
   useEffect(() => {
+    let cancelled = false;
     const loadTransactions = async () => {
-      const data = await getTransactions();
-      setTransactions(data);
+      try {
+        const data = await syncDashboardTransactions();
+        if (!cancelled) {
+          setTransactions(data);
+        }
+      } catch (error) {
+        console.error('Error syncing transactions:', error);
+      }
     };
     loadTransactions();
+    // Pick up changes made in other tabs when the window regains focus
+    window.addEventListener('focus', loadTransactions);
+    return () => {
+      cancelled = true;
+      window.removeEventListener('focus', loadTransactions);
+    };
   }, []);
 
   // Extract unique years from transactions
@@ -78,13 +94,13 @@ const Dashboard = () => {
       {/* Monthly Income Summary Card */}
       <div className="bg-table rounded-lg shadow-md p-6">
         <h2 className="text-2xl font-bold mb-4">Monthly Income Summary</h2>
-        <IncomeBarChartView transactions={transactions} />
+        <IncomeBarChartView />
       </div>
 
       {/* Monthly Expenditure Summary Card */}
       <div className="bg-table rounded-lg shadow-md p-6">
         <h2 className="text-2xl font-bold mb-4">Monthly Expenditure Summary</h2>
-        <BarChartView transactions={transactions} />
+        <BarChartView />
       </div>
 
       {/* Income, Expenditure & Savings Over Time Card */}
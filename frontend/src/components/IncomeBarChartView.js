@@ -1,4 +1,4 @@
-import React, { useState, useMemo, useEffect } from 'react';
+import React, { useState, useEffect } from 'react';
 import {
   Chart as ChartJS,
   BarElement,
@@ -12,6 +12,7 @@ import {
   LineController,
 } from 'chart.js';
 import { Chart } from 'react-chartjs-2';
+import { getCategories, getMonthlyComparison } from '../api';
 
 ChartJS.register(
   BarElement,
@@ -25,8 +26,10 @@ ChartJS.register(
   LineController
 );
 
-const IncomeBarChartView = ({ transactions }) => {
+const IncomeBarChartView = () => {
   const [selectedSubcategory, setSelectedSubcategory] = useState('All');
+  const [subcategories, setSubcategories] = useState([]);
+  const [comparison, setComparison] = useState({ years: [], matrix: {}, averages: [] });
   const [chartKey, setChartKey] = useState(0);
 
   // Force chart re-render on window resize (including zoom)
@@ -46,67 +49,47 @@ const IncomeBarChartView = ({ transactions }) => {
     };
   }, []);
 
-  // Filter only income transactions
-  const incomeTransactions = useMemo(() => {
-    return transactions.filter(tx => tx.category.toLowerCase() === 'inntekt');
-  }, [transactions]);
-
-  // Get unique subcategories from income transactions
-  const subcategories = useMemo(() => {
-    const subs = new Set();
-    incomeTransactions.forEach(tx => {
-      if (tx.subcategory) {
-        subs.add(tx.subcategory);
+  // Income subcategories for the filter buttons
+  useEffect(() => {
+    const fetchSubcategories = async () => {
+      try {
+        const categories = await getCategories();
+        const incomeCategory = Object.keys(categories).find(cat => cat.toLowerCase() === 'inntekt');
+        setSubcategories(incomeCategory ? categories[incomeCategory] : []);
+      } catch (error) {
+        console.error('Error fetching categories:', error);
       }
-    });
-    return Array.from(subs).sort();
-  }, [incomeTransactions]);
-
-  // Filter by selected subcategory
-  const filteredTransactions = useMemo(() => {
-    if (selectedSubcategory === 'All') return incomeTransactions;
-    return incomeTransactions.filter(tx => tx.subcategory === selectedSubcategory);
-  }, [incomeTransactions, selectedSubcategory]);
-
-  const groupedData = {};
-  const monthlyAverages = {};
-
-  // Group transactions by month and year
-  filteredTransactions.forEach((tx) => {
-    const date = new Date(tx.transaction_date);
-    const month = date.toLocaleString('default', { month: 'long' });
-    const year = date.getFullYear();
-    const key = `${month} ${year}`;
+    };
+    fetchSubcategories();
+  }, []);
 
-    groupedData[key] = (groupedData[key] || 0) + tx.amount;
-  });
+  // Month x year totals and averages are computed on the server
+  useEffect(() => {
+    let cancelled = false;
+    const fetchComparison = async () => {
+      try {
+        const params = { income: true };
+        if (selectedSubcategory !== 'All') {
+          params.subcategory = selectedSubcategory;
+        }
+        const data = await getMonthlyComparison(params);
+        if (!cancelled) {
+          setComparison(data);
+        }
+      } catch (error) {
+        console.error('Error fetching monthly comparison:', error);
+      }
+    };
+    fetchComparison();
+    return () => { cancelled = true; };
+  }, [selectedSubcategory]);
 
   // Create labels for months
   const allMonths = Array.from({ length: 12 }, (_, i) =>
     new Date(0, i).toLocaleString('default', { month: 'long' })
   );
 
-  // Extract years from the data
-  const years = Array.from(
-    new Set(incomeTransactions.map((tx) => new Date(tx.transaction_date).getFullYear()))
-  ).sort();
-
-  // Get current date for comparison
-  const currentDate = new Date();
-  const currentYear = currentDate.getFullYear();
-  const currentMonth = currentDate.getMonth();
-
-  // Calculate monthly averages across years, excluding future months
-  allMonths.forEach((month, monthIndex) => {
-    const monthValues = years
-      .filter(year => {
-        return year < currentYear || (year === currentYear && monthIndex <= currentMonth);
-      })
-      .map(year => groupedData[`${month} ${year}`] || 0);
-
-    const sum = monthValues.reduce((acc, val) => acc + val, 0);
-    monthlyAverages[month] = monthValues.length > 0 ? sum / monthValues.length : 0;
-  });
+  const { years } = comparison;
 
   // Define distinct colors for each year
   const colorPalette = [
@@ -143,7 +126,7 @@ const IncomeBarChartView = ({ transactions }) => {
     ...years.map((year) => ({
       type: 'bar',
       label: year.toString(),
-      data: allMonths.map((month) => groupedData[`${month} ${year}`] || 0),
+      data: comparison.matrix[year],
       backgroundColor: yearStyles[year].backgroundColor,
       borderColor: yearStyles[year].borderColor,
       borderWidth: 1,
@@ -151,7 +134,7 @@ const IncomeBarChartView = ({ transactions }) => {
     {
       type: 'line',
       label: 'Monthly Average',
-      data: allMonths.map((month) => monthlyAverages[month]),
+      data: comparison.averages,
       borderColor: 'rgba(34, 197, 94, 0.8)',  // Green line
       backgroundColor: 'rgba(34, 197, 94, 0.1)',
       borderWidth: 2,
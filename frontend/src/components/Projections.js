@@ -86,7 +86,7 @@ const Projections = () => {
 
   useEffect(() => {
     const loadTransactions = async () => {
-      const data = await getTransactions();
+      const data = await getTransactions({ fields: 'transaction_date,category,subcategory,amount' });
       setTransactions(data);
     };
     loadTransactions();
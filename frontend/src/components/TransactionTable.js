@@ -1,6 +1,9 @@
-import React, { useEffect, useState, useMemo } from 'react';
+import React, { useCallback, useEffect, useState, useMemo } from 'react';
 import ReactDOM from 'react-dom';
-import { getTransactions, deleteTransaction, updateTransaction } from '../api';
+import {
+  batchGet, queryTransactions, searchTransactions, getTransactionChanges, deleteTransaction, updateTransaction
+} from '../api';
+import { applyTransactionChanges } from '../transactionSync';
 import { DotsVerticalIcon } from '@heroicons/react/solid';
 
 const formatNumber = (num, isIncome = false) => {
@@ -108,9 +111,26 @@ const ActionMenu = ({ transaction, onEdit, onDelete }) => {
   );
 };
 
+const PAGE_SIZE = 100;
+
+// 'YYYY-MM' month value -> { start_date, end_date } for the API's date range filter
+const monthRange = (month) => {
+  if (!month) return {};
+  const [year, monthNumber] = month.split('-').map(Number);
+  const lastDay = new Date(year, monthNumber, 0).getDate();
+  return { start_date: `${month}-01`, end_date: `${month}-${String(lastDay).padStart(2, '0')}` };
+};
+
 const TransactionTable = () => {
   const [transactions, setTransactions] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [seq, setSeq] = useState(null);
+  const [page, setPage] = useState(1);
+  const [reloadCount, setReloadCount] = useState(0);
+  const [categories, setCategories] = useState([]);
+  const [dateRange, setDateRange] = useState(null);
   const [searchText, setSearchText] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
   const [categoryFilter, setCategoryFilter] = useState('');
   const [monthYearFilter, setMonthYearFilter] = useState('');
   const [transactionToDelete, setTransactionToDelete] = useState(null); // New state for modal
@@ -127,70 +147,138 @@ const TransactionTable = () => {
     Inntekt: ['Alders pensjon jan', 'EU pensjon jan', 'pensjon storebrand jan', 'Moss kommune jan', 'Div inntekter jan', 'Alders pensjon Bjørg', 'pensjon moss kommune bjørg', 'div inntekter']
   };
 
+  // Filter options: the category list plus the oldest and newest dates, in one round trip
+  useEffect(() => {
+    const fetchFilterOptions = async () => {
+      try {
+        const dateQuery = 'per_page=1&fields=transaction_date';
+        const [categoryResponse, oldest, newest] = await batchGet([
+          '/categories',
+          `/transactions?sort=transaction_date&${dateQuery}`,
+          `/transactions?sort=-transaction_date&${dateQuery}`
+        ]);
+        if (categoryResponse.status === 200) {
+          setCategories(Object.keys(categoryResponse.body).sort());
+        }
+        if (oldest.status === 200 && oldest.body.items.length > 0) {
+          setDateRange({
+            min: new Date(oldest.body.items[0].transaction_date),
+            max: new Date(newest.body.items[0].transaction_date)
+          });
+        }
+      } catch (error) {
+        console.error('Error fetching filter options:', error);
+      }
+    };
+
+    fetchFilterOptions();
+  }, []);
+
+  // Wait for a pause in typing before searching
   useEffect(() => {
+    const timer = setTimeout(() => {
+      setDebouncedSearch(searchText.trim());
+      setPage(1);
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [searchText]);
+
+  // Filtering, sorting and paging all happen on the server; only the current page is loaded
+  useEffect(() => {
+    let cancelled = false;
     const fetchTransactions = async () => {
+      const params = { ...monthRange(monthYearFilter), page, per_page: PAGE_SIZE };
+      if (categoryFilter) {
+        params.category = categoryFilter;
+      }
       try {
-        const data = await getTransactions();
-        // Sort transactions by date (newest first)
-        const sortedTransactions = data.sort((a, b) => new Date(b.transaction_date) - new Date(a.transaction_date));
-        setTransactions(sortedTransactions);
+        let data;
+        if (debouncedSearch) {
+          data = await searchTransactions(debouncedSearch, { ...params, mode: 'fuzzy' });
+          // The best matches, shown newest first so the week/month separators still apply
+          data.items.sort((a, b) => new Date(b.transaction_date) - new Date(a.transaction_date));
+        } else {
+          data = await queryTransactions({ ...params, sort: '-transaction_date' });
+        }
+        if (!cancelled) {
+          setTransactions(data.items);
+          setTotal(data.total);
+          // Search results carry no sequence; those pages are fetched again instead
+          setSeq(data.seq ?? null);
+        }
       } catch (error) {
         console.error('Error fetching transactions:', error);
+        if (!cancelled) {
+          setTransactions([]);
+          setTotal(0);
+          setSeq(null);
+        }
       }
     };
 
     fetchTransactions();
-  }, []);
-
-  // Compute unique categories
-  const categories = useMemo(() => {
-    const cats = transactions.map(tx => tx.category);
-    return Array.from(new Set(cats));
-  }, [transactions]);
+    return () => { cancelled = true; };
+  }, [debouncedSearch, categoryFilter, monthYearFilter, page, reloadCount]);
 
-  // Helper function to generate month-year options between two dates (latest first)
+  // Helper function to generate month options between two dates (latest first)
   const generateMonthYearOptions = (minDate, maxDate) => {
     let options = [];
     let current = new Date(maxDate.getFullYear(), maxDate.getMonth(), 1);
     let last = new Date(minDate.getFullYear(), minDate.getMonth(), 1);
     while (current >= last) {
-      const option = current.toLocaleString('en-US', { month: 'short', year: 'numeric' });
-      options.push(option);
+      const value = `${current.getFullYear()}-${String(current.getMonth() + 1).padStart(2, '0')}`;
+      const label = current.toLocaleString('en-US', { month: 'short', year: 'numeric' });
+      options.push({ value, label });
       current.setMonth(current.getMonth() - 1);
     }
     return options;
   };
 
-  // Compute month-year options based on transaction dates if available.
+  // Compute month options from the oldest and newest transaction dates if available.
   const monthYearOptions = useMemo(() => {
-    if (transactions.length === 0) return [];
-    const dates = transactions.map(tx => new Date(tx.transaction_date));
-    const minDate = new Date(Math.min(...dates));
-    const maxDate = new Date(Math.max(...dates));
-    return generateMonthYearOptions(minDate, maxDate);
-  }, [transactions]);
-
-  // Filter transactions based on the filters
-  const filteredTransactions = transactions.filter(tx => {
-    const matchesSearch =
-      searchText === '' ||
-      (tx.description && tx.description.toLowerCase().includes(searchText.toLowerCase())) ||
-      (tx.subcategory && tx.subcategory.toLowerCase().includes(searchText.toLowerCase()));
-    const matchesCategory = categoryFilter === '' || tx.category === categoryFilter;
-    let matchesMonthYear = true;
-    if (monthYearFilter !== '') {
-      const txDate = new Date(tx.transaction_date);
-      const txMonthYear = txDate.toLocaleString('en-US', { month: 'short', year: 'numeric' });
-      matchesMonthYear = txMonthYear === monthYearFilter;
+    if (!dateRange) return [];
+    return generateMonthYearOptions(dateRange.min, dateRange.max);
+  }, [dateRange]);
+
+  const pageCount = Math.max(1, Math.ceil(total / PAGE_SIZE));
+
+  // Bring the loaded page up to date from /transactions/changes instead of fetching it again.
+  // Rows added elsewhere (or a reset) could belong anywhere in the order, so then the page is reloaded.
+  const applyChanges = useCallback(async () => {
+    if (seq === null) {
+      setReloadCount((count) => count + 1);
+      return;
     }
-    return matchesSearch && matchesCategory && matchesMonthYear;
-  });
+    try {
+      const changes = await getTransactionChanges(seq);
+      const onPage = new Set(transactions.map((tx) => tx.id));
+      if (changes.reset || changes.upserts.some((tx) => !onPage.has(tx.id))) {
+        setReloadCount((count) => count + 1);
+        return;
+      }
+      setTransactions(applyTransactionChanges(transactions, changes));
+      setTotal(total - changes.deletes.filter((id) => onPage.has(id)).length);
+      setSeq(changes.seq);
+    } catch (error) {
+      console.error('Error syncing transactions:', error);
+    }
+  }, [seq, transactions, total]);
+
+  // Pick up changes made in other tabs when the window regains focus
+  useEffect(() => {
+    window.addEventListener('focus', applyChanges);
+    return () => window.removeEventListener('focus', applyChanges);
+  }, [applyChanges]);
 
   const handleConfirmDelete = async (id) => { // New function for confirmation action
     try {
       await deleteTransaction(id);
-      setTransactions(transactions.filter((tx) => tx.id !== id));
       setTransactionToDelete(null);
+      if (transactions.length === 1 && page > 1) {
+        setPage(page - 1);
+      } else {
+        await applyChanges();
+      }
     } catch (error) {
       console.error('Error deleting transaction:', error);
       alert('Failed to delete transaction.');
@@ -204,14 +292,14 @@ const TransactionTable = () => {
       <div className="flex gap-4 mb-6">
         <input
           type="text"
-          placeholder="Search description or subcategory..."
+          placeholder="Search description..."
           value={searchText}
           onChange={(e) => setSearchText(e.target.value)}
           className="input-field flex-1"
         />
         <select 
           value={categoryFilter} 
-          onChange={(e) => setCategoryFilter(e.target.value)}
+          onChange={(e) => { setCategoryFilter(e.target.value); setPage(1); }}
           className="input-field w-48"
         >
           <option value=''>All Categories</option>
@@ -221,12 +309,12 @@ const TransactionTable = () => {
         </select>
         <select 
           value={monthYearFilter} 
-          onChange={(e) => setMonthYearFilter(e.target.value)}
+          onChange={(e) => { setMonthYearFilter(e.target.value); setPage(1); }}
           className="input-field w-48"
         >
           <option value=''>All Months</option>
           {monthYearOptions.map((option) => (
-            <option key={option} value={option}>{option}</option>
+            <option key={option.value} value={option.value}>{option.label}</option>
           ))}
         </select>
       </div>
@@ -244,7 +332,7 @@ const TransactionTable = () => {
             </tr>
           </thead>
           <tbody className="divide-y divide-border">
-            {filteredTransactions.map((tx, index) => {
+            {transactions.map((tx, index) => {
               const isIncome = tx.category.toLowerCase() === 'inntekt';
               const currentDate = new Date(tx.transaction_date);
               const currentMonth = currentDate.getMonth();
@@ -263,7 +351,7 @@ const TransactionTable = () => {
                 showMonthSeparator = true;
                 showWeekSeparator = true;
               } else {
-                const prevDate = new Date(filteredTransactions[index - 1].transaction_date);
+                const prevDate = new Date(transactions[index - 1].transaction_date);
                 const prevMonth = prevDate.getMonth();
                 const prevYear = prevDate.getFullYear();
                 const prevWeek = getWeekNumber(prevDate);
@@ -325,7 +413,31 @@ const TransactionTable = () => {
           </tbody>
         </table>
       </div>
-      
+
+      {/* Pagination */}
+      <div className="flex items-center justify-between mt-4">
+        <span className="text-sm text-gray-600">
+          {total} transaction{total === 1 ? '' : 's'}
+        </span>
+        <div className="flex items-center gap-2">
+          <button
+            onClick={() => setPage(page - 1)}
+            disabled={page <= 1}
+            className="px-3 py-1 rounded-md border border-gray-300 disabled:opacity-50"
+          >
+            Previous
+          </button>
+          <span className="text-sm text-gray-600">Page {page} of {pageCount}</span>
+          <button
+            onClick={() => setPage(page + 1)}
+            disabled={page >= pageCount}
+            className="px-3 py-1 rounded-md border border-gray-300 disabled:opacity-50"
+          >
+            Next
+          </button>
+        </div>
+      </div>
+
       {/* Edit Modal */}
       {editingTransaction && (
         <div className="fixed inset-0 bg-black bg-opacity-50 flex items-center justify-center z-50">
@@ -380,12 +492,15 @@ const TransactionTable = () => {
                 onClick={async () => {
                   try {
                     await updateTransaction(editingTransaction.id, editingTransaction);
-                    setTransactions(transactions.map(t => 
-                      t.id === editingTransaction.id ? editingTransaction : t
-                    ));
                     setEditingTransaction(null);
+                    // The synced row carries the new version, needed for the next edit
+                    await applyChanges();
                   } catch (error) {
-                    alert('Failed to update transaction');
+                    if (error.response?.status === 409) {
+                      alert('This transaction was changed elsewhere. Reload to see the latest version.');
+                    } else {
+                      alert('Failed to update transaction');
+                    }
                   }
                 }}
                 className="px-4 py-2 bg-primary text-white rounded-md hover:bg-primary-dark transition-colors"
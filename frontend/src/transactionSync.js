@@ -0,0 +1,33 @@
+import { getTransactionChanges } from './api';
+
+// Apply a /transactions/changes response to a list of transactions: upserts replace
+// (or add) rows by id, deletes remove them, and reset: true replaces the whole list.
+export const applyTransactionChanges = (transactions, changes) => {
+  const byId = new Map(changes.reset ? [] : transactions.map((tx) => [tx.id, tx]));
+  changes.upserts.forEach((tx) => byId.set(tx.id, tx));
+  changes.deletes.forEach((id) => byId.delete(id));
+  return Array.from(byId.values());
+};
+
+// A local copy of the user's transactions kept current with delta syncs.
+// The first sync downloads everything; each later one only what changed since
+// the last 'seq'. Create one at module level so the copy outlives remounts.
+export const createTransactionSync = (fields) => {
+  let token = null;
+  let seq = 0;
+  let transactions = [];
+
+  return async () => {
+    // Start over if a different user has logged in since the last sync
+    const currentToken = localStorage.getItem('token');
+    if (currentToken !== token) {
+      token = currentToken;
+      seq = 0;
+      transactions = [];
+    }
+    const changes = await getTransactionChanges(seq, fields ? { fields } : {});
+    transactions = applyTransactionChanges(transactions, changes);
+    seq = changes.seq;
+    return transactions;
+  };
+};